@@ -0,0 +1,393 @@
+# Benchmarks extracting and installing modpacks against a local stand-in for the download hosts, so results don't depend on the real CDN.
+
+# IMPORTS
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from zipfile import ZipFile, ZIP_DEFLATED
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from typing import Optional, Callable
+import modpack_installer
+import tracemalloc
+import contextlib
+import statistics
+import threading
+import argparse
+import tempfile
+import requests
+import hashlib
+import random
+import json
+import time
+import os
+import io
+
+
+
+# CONSTANTS
+
+DEFAULT_HOSTNAME: str = 'cdn.modrinth.com'
+THROTTLE_CHUNK_SIZE: int = 64 * 1024
+PROFILE_VERSION: str = 'benchmark-version'
+
+
+
+# DEFINITIONS
+
+def generate_modpack(filename: str, files_folder: str, file_count: int = 100, file_size: int = 256 * 1024, size_jitter: float = 0.5, override_count: int = 50, override_size: int = 16 * 1024, hostname: str = DEFAULT_HOSTNAME, seed: int = 0) -> dict:
+    """
+    Generates a synthetic .mrpack file, and the files it downloads.
+    Half of the overrides are text that compresses well, and the other half are random data that doesn't.
+
+    :param filename: The path to write the .mrpack file to.
+    :type filename: str
+    :param files_folder: The folder to write the files the modpack downloads to.
+    :type files_folder: str
+    :param file_count: The number of files the modpack downloads.
+    :type file_count: int
+    :param file_size: The average size of each downloaded file, in bytes.
+    :type file_size: int
+    :param size_jitter: How much the size of each downloaded file varies, as a fraction of file_size.
+    :type size_jitter: float
+    :param override_count: The number of overrides in the modpack.
+    :type override_count: int
+    :param override_size: The size of each override, in bytes.
+    :type override_size: int
+    :param hostname: The hostname of the download URLs. It must be on the whitelist.
+    :type hostname: str
+    :param seed: The seed for the random contents, so the same arguments generate the same modpack.
+    :type seed: int
+    :return: The contents of the modpack index file as a dict.
+    :rtype: dict
+    """
+
+    rng: random.Random = random.Random(seed)
+    os.makedirs(files_folder, exist_ok=True)
+
+    # Generate downloaded files
+    files: list[dict] = []
+    for i in range(file_count):
+        size: int = max(1, int(file_size * (1 + rng.uniform(-size_jitter, size_jitter))))
+        data: bytes = rng.randbytes(size)
+        name: str = f'mod_{i}.jar'
+        with open(os.path.join(files_folder, name), 'wb') as f:
+            f.write(data)
+        files.append({
+            'path': f'mods/{name}',
+            'hashes': {'sha1': hashlib.sha1(data).hexdigest(), 'sha512': hashlib.sha512(data).hexdigest()},
+            'env': {'client': 'required', 'server': 'required'},
+            'downloads': [f'https://{hostname}/data/{name}'],
+            'fileSize': size
+        })
+
+    # Write mrpack file
+    index: dict = {
+        'formatVersion': 1,
+        'game': 'minecraft',
+        'versionId': f'{file_count}x{file_size}',
+        'name': 'Benchmark Pack',
+        'summary': 'A synthetic modpack generated for benchmarks.',
+        'files': files,
+        'dependencies': {'minecraft': '1.20.1', 'fabric-loader': '0.15.11'}
+    }
+    with ZipFile(filename, 'w', ZIP_DEFLATED) as zf:
+        zf.writestr('modrinth.index.json', json.dumps(index))
+        for i in range(override_count):
+            if i % 2 == 0:
+                text: str = ''.join(f'option_{j} = {rng.random()}\n' for j in range(override_size // 24 + 1))
+                zf.writestr(f'overrides/config/override_{i}.txt', text.encode()[:override_size])
+            else:
+                zf.writestr(f'overrides/data/override_{i}.dat', rng.randbytes(override_size))
+
+    return index
+
+class StandInAdapter(HTTPAdapter):
+    """
+    A transport adapter that sends every request to a local stand-in server instead of the host in its URL.
+    """
+
+    def __init__(self, port: int, **kwargs) -> None:
+        """
+        :param port: The port of the stand-in server on localhost.
+        :type port: int
+        """
+
+        self.port: int = port
+        super().__init__(**kwargs)
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        request.url = f'http://127.0.0.1:{self.port}{urlparse(request.url).path}'
+        return super().send(request, **kwargs)
+
+class StandInServer:
+    """
+    A local HTTP server that serves generated files in place of the download hosts, with simulated latency, bandwidth and failures.
+    Failed requests either get a 503 response or have their connection dropped halfway through the body.
+    """
+
+    def __init__(self, files_folder: str, latency: float = 0, bandwidth: Optional[int] = None, failure_rate: float = 0, seed: int = 0) -> None:
+        """
+        :param files_folder: The folder containing the files to serve.
+        :type files_folder: str
+        :param latency: The delay before each response, in seconds.
+        :type latency: float
+        :param bandwidth: The maximum speed of each connection, in bytes per second, or None for no limit.
+        :type bandwidth: Optional[int]
+        :param failure_rate: The fraction of requests that fail.
+        :type failure_rate: float
+        :param seed: The seed for choosing which requests fail.
+        :type seed: int
+        """
+
+        self.files_folder: str = files_folder
+        self.latency: float = latency
+        self.bandwidth: Optional[int] = bandwidth
+        self.failure_rate: float = failure_rate
+        self.requests: int = 0
+        self.failures: int = 0
+        self.bytes_sent: int = 0
+        self._rng: random.Random = random.Random(seed)
+        self._lock: threading.Lock = threading.Lock()
+        self._server: ThreadingHTTPServer = ThreadingHTTPServer(('127.0.0.1', 0), self._create_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        self.port: int = self._server.server_address[1]
+
+    def __enter__(self) -> 'StandInServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stand-in-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def create_session(self, pool_size: int = modpack_installer.DEFAULT_POOL_SIZE) -> requests.Session:
+        """
+        Creates an HTTP session like modpack_installer.create_session, that sends every request to this server.
+
+        :param pool_size: The maximum number of connections kept open to the server.
+        :type pool_size: int
+        :rtype: requests.Session
+        """
+
+        session: requests.Session = modpack_installer.create_session(pool_size=pool_size)
+        adapter: StandInAdapter = StandInAdapter(self.port, pool_maxsize=max(1, pool_size), max_retries=session.get_adapter('https://').max_retries)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _should_fail(self) -> Optional[str]:
+        with self._lock:
+            self.requests += 1
+            if self._rng.random() >= self.failure_rate:
+                return None
+            self.failures += 1
+            return self._rng.choice(('status', 'drop'))
+
+    def _create_handler(self) -> type:
+        server: StandInServer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version: str = 'HTTP/1.1'
+
+            def do_GET(self) -> None:
+                time.sleep(server.latency)
+
+                # Find file
+                path: str = os.path.join(server.files_folder, os.path.basename(urlparse(self.path).path))
+                if not os.path.isfile(path):
+                    self.send_error(404)
+                    return
+                with open(path, 'rb') as f:
+                    data: bytes = f.read()
+
+                # Fail with an error status
+                failure: Optional[str] = server._should_fail()
+                if failure == 'status':
+                    self.send_error(503)
+                    return
+
+                # Send headers
+                start: int = 0
+                range_header: Optional[str] = self.headers.get('Range')
+                if range_header is not None and range_header.startswith('bytes=') and range_header.endswith('-'):
+                    start = min(int(range_header[6:-1]), len(data))
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{len(data) - 1}/{len(data)}')
+                else:
+                    self.send_response(200)
+                body: bytes = data[start:]
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+
+                # Fail by dropping the connection halfway through
+                if failure == 'drop':
+                    body = body[:len(body) // 2]
+
+                # Send body at the limited speed
+                for offset in range(0, len(body), THROTTLE_CHUNK_SIZE):
+                    chunk: bytes = body[offset:offset + THROTTLE_CHUNK_SIZE]
+                    self.wfile.write(chunk)
+                    with server._lock:
+                        server.bytes_sent += len(chunk)
+                    if server.bandwidth is not None:
+                        time.sleep(len(chunk) / server.bandwidth)
+                if failure == 'drop':
+                    self.close_connection = True
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+def measure(name: str, function: Callable[[], None], byte_count: int, repeat: int = 1) -> dict:
+    """
+    Runs a function and measures its wall time, throughput and peak memory.
+    Peak memory is the peak of memory allocated by Python, measured with tracemalloc, which also slows the function down a little.
+
+    :param name: The name of the benchmark.
+    :type name: str
+    :param function: The function to run. Anything it prints is hidden.
+    :type function: Callable[[], None]
+    :param byte_count: The number of bytes the function processes each run, used to calculate throughput.
+    :type byte_count: int
+    :param repeat: The number of times to run the function.
+    :type repeat: int
+    :return: The name, the wall time of each run, the median wall time, the throughput of the median run and the highest peak memory.
+    :rtype: dict
+    """
+
+    wall_times: list[float] = []
+    peak_memory: int = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start_time: float = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            function()
+        wall_times.append(time.perf_counter() - start_time)
+        peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    median_wall_time: float = statistics.median(wall_times)
+    return {
+        'name': name,
+        'wall_times': wall_times,
+        'wall_time': median_wall_time,
+        'throughput': byte_count / median_wall_time if median_wall_time > 0 else 0,
+        'peak_memory': peak_memory
+    }
+
+def use_launcher_folder(folder: str) -> None:
+    """
+    Points the installer at a fake Minecraft folder, so installs don't touch the real launcher.
+
+    :param folder: The folder to create the fake Minecraft folder in.
+    :type folder: str
+    :rtype: None
+    """
+
+    modpack_installer.INSTALLATIONS_DIR = os.path.join(folder, 'installations')
+    modpack_installer.VERSIONS_DIR = os.path.join(folder, 'versions')
+    modpack_installer.LAUNCHER_PROFILES_FILE_PATH = os.path.join(folder, 'launcher_profiles.json')
+    os.makedirs(os.path.join(modpack_installer.VERSIONS_DIR, PROFILE_VERSION), exist_ok=True)
+    with open(modpack_installer.LAUNCHER_PROFILES_FILE_PATH, 'w') as f:
+        f.write(json.dumps({'profiles': {}}))
+
+def run_benchmarks(arguments: argparse.Namespace) -> list[dict]:
+    """
+    Generates a modpack, starts the stand-in server, and measures each operation.
+
+    :param arguments: The parsed command line arguments.
+    :type arguments: argparse.Namespace
+    :return: The results of each benchmark.
+    :rtype: list[dict]
+    """
+
+    results: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix='soup_mrpack_benchmark_') as folder:
+
+        # Generate modpack
+        filename: str = os.path.join(folder, 'benchmark.mrpack')
+        files_folder: str = os.path.join(folder, 'files')
+        data: dict = generate_modpack(filename, files_folder, arguments.files, arguments.file_size, arguments.size_jitter, arguments.overrides, arguments.override_size, seed=arguments.seed)
+        download_size: int = sum(download_metadata['fileSize'] for download_metadata in data['files'])
+        use_launcher_folder(os.path.join(folder, 'minecraft'))
+        output_folder: str = os.path.join(folder, 'output')
+        os.makedirs(output_folder)
+
+        with StandInServer(files_folder, arguments.latency, arguments.bandwidth, arguments.failure_rate, arguments.seed) as server:
+            session: requests.Session = server.create_session(pool_size=arguments.download_workers)
+            cache: Optional[modpack_installer.ArtifactCache] = modpack_installer.ArtifactCache(os.path.join(folder, 'cache')) if arguments.cache else None
+            # Keep the speeds of the stand-in server out of the host statistics used for real downloads
+            host_stats: modpack_installer.HostStats = modpack_installer.HostStats(os.path.join(folder, modpack_installer.HOST_STATS_FILENAME))
+            output_filenames: list[str] = []
+
+            # Modpack info
+            results.append(measure('print_modpack_info', lambda: modpack_installer.print_modpack_info(filename), os.path.getsize(filename), arguments.repeat))
+
+            # Extract
+            def extract() -> None:
+                output_filenames.append(modpack_installer.extract_modpack(filename, output_folder, wait_for_user=False, print_logs=False, download_workers=arguments.download_workers, cache=cache, session=session, host_stats=host_stats)[0])
+            results.append(measure('extract_modpack', extract, download_size, arguments.repeat))
+
+            # Install from extracted zip
+            extracted_size: int = os.path.getsize(output_filenames[-1])
+            results.append(measure('install_modpack', lambda: modpack_installer.install_modpack(output_filenames[-1], data, wait_for_user=False, print_logs=False, profile_version=PROFILE_VERSION), extracted_size, arguments.repeat))
+
+            # Install from mrpack
+            results.append(measure('install_modpack_from_mrpack', lambda: modpack_installer.install_modpack_from_mrpack(filename, wait_for_user=False, print_logs=False, download_workers=arguments.download_workers, cache=cache, session=session, host_stats=host_stats, profile_version=PROFILE_VERSION), download_size, arguments.repeat))
+
+            session.close()
+            for result in results:
+                result['server_requests'] = server.requests
+                result['server_failures'] = server.failures
+
+    return results
+
+def print_results(results: list[dict]) -> None:
+    """
+    Prints the results of the benchmarks as a table.
+
+    :param results: The results of each benchmark.
+    :type results: list[dict]
+    :rtype: None
+    """
+
+    print(f'{"Benchmark":<28} {"Wall time":>10} {"Throughput":>14} {"Peak memory":>12}')
+    for result in results:
+        print(f'{result["name"]:<28} {result["wall_time"]:>9.3f}s {result["throughput"] / (1024 * 1024):>9.2f} MiB/s {result["peak_memory"] / (1024 * 1024):>8.2f} MiB')
+    if len(results) > 0:
+        print(f'Stand-in server: {results[-1]["server_requests"]} requests, {results[-1]["server_failures"]} injected failures')
+
+def parse_arguments() -> argparse.Namespace:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Benchmarks extracting and installing a synthetic modpack against a local stand-in for the download hosts.')
+    parser.add_argument('--files', type=int, default=100, help='the number of files the modpack downloads (default: 100)')
+    parser.add_argument('--file-size', type=int, default=256 * 1024, help='the average size of each downloaded file, in bytes (default: 262144)')
+    parser.add_argument('--size-jitter', type=float, default=0.5, help='how much file sizes vary, as a fraction of --file-size (default: 0.5)')
+    parser.add_argument('--overrides', type=int, default=50, help='the number of overrides in the modpack (default: 50)')
+    parser.add_argument('--override-size', type=int, default=16 * 1024, help='the size of each override, in bytes (default: 16384)')
+    parser.add_argument('--latency', type=float, default=0, help='the delay before each response, in seconds (default: 0)')
+    parser.add_argument('--bandwidth', type=int, default=None, help='the maximum speed of each connection, in bytes per second (default: no limit)')
+    parser.add_argument('--failure-rate', type=float, default=0, help='the fraction of requests that fail (default: 0)')
+    parser.add_argument('--download-workers', type=int, default=modpack_installer.DEFAULT_DOWNLOAD_WORKERS, help=f'the number of files to download at the same time (default: {modpack_installer.DEFAULT_DOWNLOAD_WORKERS})')
+    parser.add_argument('--cache', action='store_true', help='use an artifact cache, so runs after the first are served from it')
+    parser.add_argument('--repeat', type=int, default=3, help='the number of runs of each benchmark; the median is reported (default: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='the seed for the generated modpack and injected failures (default: 0)')
+    parser.add_argument('--json', help='a file to write the results to as JSON, to compare between versions')
+    return parser.parse_args()
+
+
+
+# MAIN
+
+def main() -> None:
+    arguments: argparse.Namespace = parse_arguments()
+    results: list[dict] = run_benchmarks(arguments)
+    print_results(results)
+    if arguments.json is not None:
+        with open(arguments.json, 'w') as f:
+            f.write(json.dumps({'arguments': vars(arguments), 'results': results}, indent=4))
+
+if __name__ == '__main__':
+    main()
@@ -2,18 +2,17 @@
 
 # IMPORTS
 
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 from typing import Optional, Callable
 import subprocess
 import traceback
+import argparse
 import sys
 import os
 
 try:
     import modpack_installer
-except OSError as error:
-    print(error)
-    print('')
-    input('Press ENTER to close.')
+    modpack_installer.check_dependencies()
 except ModuleNotFoundError:
     print('Either PIL or requests is not installed!')
     input('Press ENTER to install them automatically.')
@@ -24,6 +23,7 @@ except ModuleNotFoundError:
         input('Success! Press ENTER to start the program.')
         try:
             import modpack_installer
+            modpack_installer.check_dependencies()
         except ModuleNotFoundError:
             print('Something went wrong.')
             input('Press ENTER to close.')
@@ -51,48 +51,123 @@ def print_title() -> None:
     print('----------------------------------')
     print('')
 
-def select_file(directory: str, file_extension: Optional[str] = None) -> Optional[str]:
+def select_modpack(catalog: 'modpack_installer.ModpackCatalog') -> Optional[str]:
     """
-    Asks the user to choose a file from a directory.
+    Asks the user to choose an .mrpack file from the modpack catalog.
 
-    :param directory: The directory to choose a file from.
-    :type directory: str
-    :param file_extension: The extension the selected file should have, or None.
-    :type file_extension: Optional[str]
+    :param catalog: The catalog of the modpacks folder.
+    :type catalog: modpack_installer.ModpackCatalog
     :return: The path to the selected file, or None if no file was chosen.
     :rtype: Optional[str]
     """
 
     # Get options to choose from
-    filenames: list[str] = os.listdir(directory)
-    options: list[str] = []
-    for filename in filenames:
-        path: str = os.path.join(directory, filename)
-        if os.path.isfile(path):
-            if file_extension is None:
-                options.append(filename)
-                continue
-            if filename.lower().endswith(f'.{file_extension.lower()}'):
-                options.append(filename)
+    entries: list[dict] = catalog.list(sort_by='filename', include_invalid=True)
 
     # Print options
-    if len(options) == 0:
+    if len(entries) == 0:
         print('No files available!')
-        if file_extension is not None:
-            print(f'Please add a .{file_extension} file to the "{directory}" folder.')
-        else:
-            print(f'Please add a file to the "{directory}" folder.')
+        print(f'Please add a .mrpack file to the "{catalog.directory}" folder.')
         print('')
         input('Press ENTER to continue.')
         return None
     print('Available files:')
-    for i, option in enumerate(options):
-        print(f'    [{i}] {option}')
+    for i, entry in enumerate(entries):
+        if entry['valid']:
+            print(f'    [{i}] {entry["filename"]} ({entry["name"]} - {entry["version_id"]})')
+        else:
+            print(f'    [{i}] {entry["filename"]} (unreadable)')
     print('')
 
     # Ask for user's choice
     choice_str: str = input('Choose a file: ').strip()
 
+    # Validate choice
+    choice_valid: bool = True
+    try:
+        choice_index: int = int(choice_str)
+    except ValueError:
+        choice_valid = False
+    else:
+        if not (0 <= choice_index < len(entries)):
+            choice_valid = False
+    if not choice_valid:
+        print('Invalid input!')
+        print('')
+        input('Press ENTER to continue.')
+        return None
+
+    # Return choice
+    # noinspection PyUnboundLocalVariable
+    return entries[choice_index]['path']
+
+def search_modpacks(catalog: 'modpack_installer.ModpackCatalog') -> None:
+    """
+    Asks the user for filters and prints the matching modpacks from the catalog.
+
+    :param catalog: The catalog of the modpacks folder.
+    :type catalog: modpack_installer.ModpackCatalog
+    :rtype: None
+    """
+
+    # Ask for filters
+    search: str = input('Name contains (leave empty for any): ').strip()
+    dependency: str = input('Requires dependency, e.g. "fabric-loader" or "minecraft=1.20.1" (leave empty for any): ').strip()
+    sort_by: str = input('Sort by [name/version/size/files/date]. Default: name. ').strip().lower()
+    print('')
+
+    dependency_version: Optional[str] = None
+    if '=' in dependency:
+        dependency, dependency_version = (part.strip() for part in dependency.split('=', 1))
+    sort_key: str = {'version': 'version_id', 'size': 'download_size', 'files': 'file_count', 'date': 'mtime_ns'}.get(sort_by, 'name')
+
+    # Print matching modpacks
+    entries: list[dict] = catalog.list(search or None, dependency or None, dependency_version, sort_by=sort_key, descending=sort_key in ('download_size', 'file_count', 'mtime_ns'))
+    if len(entries) == 0:
+        print('No modpacks found!')
+        return
+    for entry in entries:
+        dependencies: str = ', '.join(f'{modpack_installer.DEPENDENCY_NAMES.get(dependency_id, dependency_id)} {version}' for dependency_id, version in entry['dependencies'].items())
+        print(f'{entry["name"]} - {entry["version_id"]}')
+        print(f'    File:         {entry["filename"]}')
+        print(f'    Dependencies: {dependencies}')
+        print(f'    Files:        {entry["file_count"]} ({entry["download_size"] / (1024 * 1024):.2f} MiB)')
+
+def select_installation() -> Optional[str]:
+    """
+    Asks the user to choose an installation that can be upgraded or verified.
+
+    :return: The path to the game directory of the selected installation, or None if no installation was chosen.
+    :rtype: Optional[str]
+    """
+
+    # Get options to choose from
+    options: list[tuple[str, str]] = []
+    if os.path.isdir(modpack_installer.INSTALLATIONS_DIR):
+        for directory_name in sorted(os.listdir(modpack_installer.INSTALLATIONS_DIR)):
+            path: str = os.path.join(modpack_installer.INSTALLATIONS_DIR, directory_name)
+            if not os.path.isdir(path):
+                continue
+            manifest: Optional[dict] = modpack_installer.read_installation_manifest(path)
+            if manifest is None:
+                continue
+            options.append((path, f'{manifest["index"]["name"]} - {manifest["index"]["versionId"]} ({directory_name})'))
+
+    # Print options
+    if len(options) == 0:
+        print('No installations can be upgraded or verified!')
+        print('Only modpacks installed by this version of the program can be upgraded or verified.')
+        print('')
+        input('Press ENTER to continue.')
+        return None
+    print('Available installations:')
+    for i, (path, description) in enumerate(options):
+        print(f'    [{i}] {description}')
+    print('')
+
+    # Ask for user's choice
+    choice_str: str = input('Choose an installation: ').strip()
+
     # Validate choice
     choice_valid: bool = True
     try:
@@ -110,9 +185,7 @@ def select_file(directory: str, file_extension: Optional[str] = None) -> Optiona
 
     # Return choice
     # noinspection PyUnboundLocalVariable
-    filename: str = options[choice_index]
-    path: str = os.path.join(directory, filename)
-    return path
+    return options[choice_index][0]
 
 def catch_errors(function: Callable, *args) -> bool:
     # noinspection PyBroadException,PyShadowingNames
@@ -134,17 +207,351 @@ def catch_errors(function: Callable, *args) -> bool:
         return True # Success
     return False # Error
 
-def install(filename: str, do_optional: bool) -> None:
-    extracted_filename: str
-    modpack_data: dict
-    extracted_filename, modpack_data = modpack_installer.extract_modpack(filename, EXTRACTED_MODPACKS_DIR, is_server=False, download_optional_files=do_optional)
-    modpack_installer.install_modpack(extracted_filename, modpack_data)
+def install(filename: str, do_optional: bool, cache: 'modpack_installer.ArtifactCache', session: 'requests.Session', profile_store: 'modpack_installer.LauncherProfileStore') -> None:
+    modpack_installer.check_platform()
+    modpack_installer.install_modpack_from_mrpack(filename, download_optional_files=do_optional, cache=cache, session=session, profile_store=profile_store)
 
-def extract(filename: str, is_server: bool, do_optional: bool) -> None:
+def upgrade(filename: str, install_path: str, do_optional: bool, cache: 'modpack_installer.ArtifactCache', session: 'requests.Session', profile_store: 'modpack_installer.LauncherProfileStore') -> None:
+    modpack_installer.check_platform()
+    modpack_installer.upgrade_modpack(filename, install_path, download_optional_files=do_optional, cache=cache, session=session, profile_store=profile_store)
+
+def extract(filename: str, is_server: bool, do_optional: bool, cache: 'modpack_installer.ArtifactCache', session: 'requests.Session') -> None:
     directory: str = EXTRACTED_MODPACKS_DIR
     if is_server:
         directory = EXTRACTED_SERVER_PACKS_DIR
-    modpack_installer.extract_modpack(filename, directory, is_server=is_server, download_optional_files=do_optional)
+    modpack_installer.extract_modpack(filename, directory, is_server=is_server, download_optional_files=do_optional, cache=cache, session=session)
+
+def repair(install_path: str, cache: 'modpack_installer.ArtifactCache', session: 'requests.Session') -> None:
+    modpack_installer.repair_installation(install_path, cache=cache, session=session)
+
+def parse_bandwidth(text: str) -> float:
+    """
+    Parses a download speed limit like "500K" or "2.5M" into bytes per second.
+
+    :param text: The limit, in bytes per second with an optional K, M or G suffix.
+    :type text: str
+    :rtype: float
+    """
+
+    multipliers: dict[str, int] = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = text.strip().upper().removesuffix('/S').removesuffix('B')
+    multiplier: int = 1
+    if text[-1:] in multipliers:
+        multiplier = multipliers[text[-1]]
+        text = text[:-1]
+    try:
+        bytes_per_second: float = float(text) * multiplier
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid bandwidth "{text}"')
+    if bytes_per_second <= 0:
+        raise argparse.ArgumentTypeError('the bandwidth must be more than 0')
+    return bytes_per_second
+
+def parse_size(text: str) -> int:
+    """
+    Parses a size like "512M" or "1G" into bytes.
+
+    :param text: The size, in bytes with an optional K, M or G suffix.
+    :type text: str
+    :rtype: int
+    """
+
+    multipliers: dict[str, int] = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = text.strip().upper().removesuffix('B')
+    multiplier: int = 1
+    if text[-1:] in multipliers:
+        multiplier = multipliers[text[-1]]
+        text = text[:-1]
+    try:
+        size: int = int(float(text) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid size "{text}"')
+    if size <= 0:
+        raise argparse.ArgumentTypeError('the size must be more than 0')
+    return size
+
+def parse_arguments(argv: list[str]) -> argparse.Namespace:
+    """
+    Parses the command line arguments for batch mode.
+
+    :param argv: The command line arguments, without the program name.
+    :type argv: list[str]
+    :rtype: argparse.Namespace
+    """
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Extracts or installs many .mrpack files at once without asking any questions.')
+    parser.add_argument('paths', nargs='+', help='.mrpack files, or folders containing .mrpack files')
+    parser.add_argument('--install', action='store_true', help='install the modpacks into the Minecraft Launcher instead of extracting them')
+    parser.add_argument('--server', action='store_true', help='extract the modpacks for a server')
+    parser.add_argument('--no-optional', action='store_true', help='don\'t download optional files')
+    parser.add_argument('--output', help='the folder to place extracted modpacks into (default: extracted_modpacks or extracted_server_modpacks)')
+    parser.add_argument('--profile-version', help='the name of the Minecraft version folder installed modpacks use (required with --install)')
+    parser.add_argument('--jobs', type=int, default=4, help='the number of modpacks to process at the same time (default: 4)')
+    parser.add_argument('--download-workers', type=int, default=modpack_installer.DEFAULT_DOWNLOAD_WORKERS, help=f'the number of files to download at the same time for each modpack (default: {modpack_installer.DEFAULT_DOWNLOAD_WORKERS})')
+    parser.add_argument('--max-bandwidth', type=parse_bandwidth, help='the combined download speed limit of every modpack in bytes per second, with an optional K, M or G suffix (default: no limit)')
+    parser.add_argument('--max-in-flight', type=parse_size, default=modpack_installer.DEFAULT_MAX_IN_FLIGHT_BYTES, help=f'the combined size of downloaded files of every modpack that can wait to be written into extracted zip files, with an optional K, M or G suffix (default: {modpack_installer.DEFAULT_MAX_IN_FLIGHT_BYTES // (1024 * 1024)}M)')
+    parser.add_argument('--include', action='append', metavar='PATTERN', help='only extract the files and overrides whose path in the instance matches this glob pattern, such as "mods/*" or "config/" (can be repeated)')
+    parser.add_argument('--exclude', action='append', metavar='PATTERN', help='don\'t extract the files and overrides whose path in the instance matches this glob pattern (can be repeated)')
+    parser.add_argument('--record-skipped', action='store_true', help='save the files and overrides left out by --include and --exclude next to each extracted zip file, so they can be fetched later with --fetch-skipped')
+    parser.add_argument('--fetch-skipped', metavar='FOLDER', help='treat the paths as .skipped.json files saved by --record-skipped, and fetch the files they list into FOLDER, filtered by --include and --exclude')
+    parser.add_argument('--dry-run', action='store_true', help='only show what would be downloaded for each modpack, and how long it would take')
+    parser.add_argument('--verbose', action='store_true', help='print the logs of every modpack')
+    parser.add_argument('--report', help='a file to write the timing summary and progress events of the batch to as JSON')
+    arguments: argparse.Namespace = parser.parse_args(argv)
+
+    if arguments.install and arguments.server:
+        parser.error('--server can\'t be used with --install')
+    if arguments.install and arguments.profile_version is None:
+        parser.error('--profile-version is required with --install')
+    if arguments.install and (arguments.include is not None or arguments.exclude is not None or arguments.record_skipped):
+        parser.error('--include, --exclude and --record-skipped can\'t be used with --install')
+    if arguments.record_skipped and arguments.include is None and arguments.exclude is None:
+        parser.error('--record-skipped requires --include or --exclude')
+    if arguments.fetch_skipped is not None and (arguments.install or arguments.dry_run):
+        parser.error('--fetch-skipped can\'t be used with --install or --dry-run')
+    if arguments.jobs < 1 or arguments.download_workers < 1:
+        parser.error('--jobs and --download-workers must be at least 1')
+    return arguments
+
+def get_path_filter(arguments: argparse.Namespace) -> Optional['modpack_installer.PathFilter']:
+    """
+    Gets the path filter given with --include and --exclude.
+
+    :param arguments: The parsed command line arguments.
+    :type arguments: argparse.Namespace
+    :return: The path filter, or None if no patterns were given.
+    :rtype: Optional[modpack_installer.PathFilter]
+    """
+
+    if arguments.include is None and arguments.exclude is None:
+        return None
+    return modpack_installer.PathFilter(arguments.include, arguments.exclude)
+
+def find_modpack_files(paths: list[str]) -> list[str]:
+    """
+    Gets the .mrpack files from a list of files and folders.
+
+    :param paths: Paths to .mrpack files, or folders containing .mrpack files.
+    :type paths: list[str]
+    :return: The paths to the .mrpack files, without duplicates.
+    :rtype: list[str]
+    """
+
+    filenames: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for filename in sorted(os.listdir(path)):
+                if filename.lower().endswith('.mrpack') and os.path.isfile(os.path.join(path, filename)):
+                    filenames.append(os.path.join(path, filename))
+        else:
+            filenames.append(path)
+
+    unique_filenames: dict[str, str] = {}
+    for filename in filenames:
+        unique_filenames.setdefault(os.path.normcase(os.path.abspath(filename)), filename)
+    return list(unique_filenames.values())
+
+def process_batch_file(filename: str, arguments: argparse.Namespace, cache: 'modpack_installer.ArtifactCache', session: 'requests.Session', host_limiter: 'modpack_installer.HostLimiter', bandwidth_limiter: Optional['modpack_installer.BandwidthLimiter'], byte_budget: 'modpack_installer.ByteBudget', host_stats: 'modpack_installer.HostStats', reporter: 'modpack_installer.SummaryReporter', profile_store: 'modpack_installer.LauncherProfileStore') -> str:
+    """
+    Extracts or installs one .mrpack file in batch mode.
+
+    :param filename: The path to the .mrpack file.
+    :type filename: str
+    :param arguments: The parsed command line arguments.
+    :type arguments: argparse.Namespace
+    :param cache: The artifact cache shared by every modpack.
+    :type cache: modpack_installer.ArtifactCache
+    :param session: The HTTP session shared by every modpack.
+    :type session: requests.Session
+    :param host_limiter: The limiter for concurrent downloads per hostname shared by every modpack.
+    :type host_limiter: modpack_installer.HostLimiter
+    :param bandwidth_limiter: The limiter for the combined download speed of every modpack, or None for no limit.
+    :type bandwidth_limiter: Optional[modpack_installer.BandwidthLimiter]
+    :param byte_budget: The limit on bytes waiting to be written into extracted zip files, shared by every modpack.
+    :type byte_budget: modpack_installer.ByteBudget
+    :param host_stats: The download host statistics shared by every modpack.
+    :type host_stats: modpack_installer.HostStats
+    :param reporter: The reporter that collects the progress events of every modpack.
+    :type reporter: modpack_installer.SummaryReporter
+    :param profile_store: The store that collects the launcher profiles of every installed modpack, so they are saved together at the end.
+    :type profile_store: modpack_installer.LauncherProfileStore
+    :return: A description of the result.
+    :rtype: str
+    """
+
+    do_optional: bool = not arguments.no_optional
+
+    # Install modpack
+    if arguments.install:
+        modpack_installer.check_platform()
+        data: dict = modpack_installer.install_modpack_from_mrpack(filename, download_optional_files=do_optional, wait_for_user=False, print_logs=arguments.verbose, download_workers=arguments.download_workers, cache=cache, session=session, host_limiter=host_limiter, bandwidth_limiter=bandwidth_limiter, host_stats=host_stats, profile_version=arguments.profile_version, on_event=reporter.on_event, profile_store=profile_store)
+        return f'installed {data["name"]} - {data["versionId"]}'
+
+    # Extract modpack
+    directory: str = arguments.output
+    if directory is None:
+        directory = EXTRACTED_SERVER_PACKS_DIR if arguments.server else EXTRACTED_MODPACKS_DIR
+    os.makedirs(directory, exist_ok=True)
+    output_filename: str
+    output_filename, _ = modpack_installer.extract_modpack(filename, directory, is_server=arguments.server, download_optional_files=do_optional, wait_for_user=False, print_logs=arguments.verbose, download_workers=arguments.download_workers, cache=cache, session=session, host_limiter=host_limiter, bandwidth_limiter=bandwidth_limiter, host_stats=host_stats, on_event=reporter.on_event, byte_budget=byte_budget, path_filter=get_path_filter(arguments), record_skipped=arguments.record_skipped)
+    return f'extracted to "{output_filename}"'
+
+def plan_batch(filenames: list[str], arguments: argparse.Namespace) -> int:
+    """
+    Shows what batch mode would download for each .mrpack file, without downloading anything.
+
+    :param filenames: The paths to the .mrpack files.
+    :type filenames: list[str]
+    :param arguments: The parsed command line arguments.
+    :type arguments: argparse.Namespace
+    :return: The exit code: 0 if every modpack could be read, and 1 otherwise.
+    :rtype: int
+    """
+
+    cache: modpack_installer.ArtifactCache = modpack_installer.ArtifactCache()
+    host_stats: modpack_installer.HostStats = modpack_installer.HostStats()
+    host_limiter: modpack_installer.HostLimiter = modpack_installer.HostLimiter()
+    bandwidth_limiter: Optional[modpack_installer.BandwidthLimiter] = None
+    if arguments.max_bandwidth is not None:
+        bandwidth_limiter = modpack_installer.BandwidthLimiter(arguments.max_bandwidth)
+    directory: str = arguments.output
+    if directory is None:
+        directory = EXTRACTED_SERVER_PACKS_DIR if arguments.server else EXTRACTED_MODPACKS_DIR
+
+    # Plan each modpack
+    failures: int = 0
+    fetch_bytes: int = 0
+    for filename in filenames:
+        try:
+            data: dict
+            overrides: dict
+            data, overrides = modpack_installer.read_modpack(filename, arguments.server)
+            resume_folder: Optional[str] = None
+            if not arguments.install:
+                resume_folder = modpack_installer.get_resume_folder(directory, modpack_installer.get_output_filename(directory, data, arguments.server), data)
+            plan: dict = modpack_installer.plan_modpack(data, overrides, arguments.server, not arguments.no_optional, cache, resume_folder, host_stats, host_limiter, arguments.download_workers, bandwidth_limiter, get_path_filter(arguments))
+        except (modpack_installer.ModpackExtractorError, modpack_installer.ModpackInstallerError) as error:
+            failures += 1
+            print(f'FAILED  {filename}: {error}')
+            continue
+        except Exception:
+            failures += 1
+            print(f'FAILED  {filename}:')
+            traceback.print_exc()
+            continue
+        print(f'{filename}:')
+        modpack_installer.print_modpack_plan(plan)
+        print('')
+        fetch_bytes += plan['fetch_bytes']
+
+    print(f'{fetch_bytes / (1024 * 1024):.2f} MiB to download in total. Files shared between modpacks are counted once for each modpack.')
+    return 1 if failures > 0 else 0
+
+def fetch_skipped_batch(arguments: argparse.Namespace) -> int:
+    """
+    Fetches the files left out by filtered extracts, as recorded in the .skipped.json files given as paths.
+
+    :param arguments: The parsed command line arguments.
+    :type arguments: argparse.Namespace
+    :return: The exit code: 0 if every manifest was fetched, and 1 otherwise.
+    :rtype: int
+    """
+
+    cache: modpack_installer.ArtifactCache = modpack_installer.ArtifactCache()
+    session: 'requests.Session' = modpack_installer.create_session(pool_size=arguments.download_workers)
+    bandwidth_limiter: Optional[modpack_installer.BandwidthLimiter] = None
+    if arguments.max_bandwidth is not None:
+        bandwidth_limiter = modpack_installer.BandwidthLimiter(arguments.max_bandwidth)
+
+    # Fetch each manifest
+    failures: int = 0
+    for manifest_filename in arguments.paths:
+        try:
+            fetched_files: dict[str, str] = modpack_installer.fetch_skipped_files(manifest_filename, arguments.fetch_skipped, get_path_filter(arguments), print_logs=arguments.verbose, download_workers=arguments.download_workers, cache=cache, session=session, bandwidth_limiter=bandwidth_limiter)
+            print(f'OK      {manifest_filename}: fetched {len(fetched_files)} files into "{arguments.fetch_skipped}"')
+        except (modpack_installer.ModpackExtractorError, modpack_installer.ModpackInstallerError) as error:
+            failures += 1
+            print(f'FAILED  {manifest_filename}: {error}')
+        except Exception:
+            failures += 1
+            print(f'FAILED  {manifest_filename}:')
+            traceback.print_exc()
+    session.close()
+    return 1 if failures > 0 else 0
+
+def run_batch(argv: list[str]) -> int:
+    """
+    Extracts or installs many .mrpack files in parallel without asking any questions.
+    Every modpack shares one artifact cache, so each unique file is only downloaded once for the whole batch.
+
+    :param argv: The command line arguments, without the program name.
+    :type argv: list[str]
+    :return: The exit code: 0 if every modpack succeeded, and 1 otherwise.
+    :rtype: int
+    """
+
+    arguments: argparse.Namespace = parse_arguments(argv)
+    if arguments.fetch_skipped is not None:
+        return fetch_skipped_batch(arguments)
+    filenames: list[str] = find_modpack_files(arguments.paths)
+    if len(filenames) == 0:
+        print('No .mrpack files found!')
+        return 1
+    if arguments.dry_run:
+        return plan_batch(filenames, arguments)
+
+    # Share downloads between modpacks
+    cache: modpack_installer.ArtifactCache = modpack_installer.ArtifactCache()
+    session: 'requests.Session' = modpack_installer.create_session(pool_size=arguments.jobs * arguments.download_workers)
+    host_limiter: modpack_installer.HostLimiter = modpack_installer.HostLimiter()
+    bandwidth_limiter: Optional[modpack_installer.BandwidthLimiter] = None
+    if arguments.max_bandwidth is not None:
+        bandwidth_limiter = modpack_installer.BandwidthLimiter(arguments.max_bandwidth)
+    byte_budget: modpack_installer.ByteBudget = modpack_installer.ByteBudget(arguments.max_in_flight)
+    host_stats: modpack_installer.HostStats = modpack_installer.HostStats()
+    reporter: modpack_installer.SummaryReporter = modpack_installer.SummaryReporter()
+    profile_store: modpack_installer.LauncherProfileStore = modpack_installer.LauncherProfileStore(auto_flush=False)
+
+    # Process modpacks
+    print(f'Processing {len(filenames)} modpacks...')
+    failures: int = 0
+    with ThreadPoolExecutor(max_workers=arguments.jobs, thread_name_prefix='modpack') as executor:
+        futures: dict[Future, str] = {executor.submit(process_batch_file, filename, arguments, cache, session, host_limiter, bandwidth_limiter, byte_budget, host_stats, reporter, profile_store): filename for filename in filenames}
+        for future in as_completed(futures):
+            filename: str = futures[future]
+            try:
+                print(f'OK      {filename}: {future.result()}')
+            except (modpack_installer.ModpackExtractorError, modpack_installer.ModpackInstallerError) as error:
+                failures += 1
+                print(f'FAILED  {filename}: {error}')
+            except Exception:
+                failures += 1
+                print(f'FAILED  {filename}:')
+                traceback.print_exc()
+    session.close()
+    try:
+        host_stats.save()
+    except OSError:
+        pass
+
+    # Save the launcher profiles of every installed modpack at once
+    if arguments.install:
+        try:
+            saved_profiles: int = profile_store.flush()
+            print(f'Saved {saved_profiles} launcher profiles.')
+        except Exception as error:
+            failures += 1
+            print(f'FAILED  saving launcher profiles: {error}')
+
+    # Show summary
+    cache_stats: dict[str, int] = cache.get_stats()
+    print('')
+    print(f'{len(filenames) - failures} succeeded, {failures} failed.')
+    print(f'Artifact cache: {cache_stats["hits"]} hits, {cache_stats["misses"]} misses, {cache_stats["bytes_saved"] / (1024 * 1024):.2f} MiB saved')
+    reporter.print_summary()
+    if arguments.report is not None:
+        reporter.write_json(arguments.report)
+    return 0 if failures == 0 else 1
 
 
 
@@ -159,13 +566,29 @@ def main() -> None:
     if not os.path.isdir(EXTRACTED_SERVER_PACKS_DIR):
         os.mkdir(EXTRACTED_SERVER_PACKS_DIR)
 
+    # Open artifact cache
+    cache: modpack_installer.ArtifactCache = modpack_installer.ArtifactCache()
+
+    # Open HTTP session shared by all downloads
+    session: 'requests.Session' = modpack_installer.create_session()
+
+    # Open launcher profiles
+    profile_store: modpack_installer.LauncherProfileStore = modpack_installer.LauncherProfileStore()
+
+    # Open modpack catalog
+    catalog: modpack_installer.ModpackCatalog = modpack_installer.ModpackCatalog(MODPACKS_DIR)
+
     # Mainloop
     while True:
         print_title()
         print('Available actions:')
         print('    [I] Install Modpack')
+        print('    [U] Upgrade Modpack')
         print('    [E] Extract Modpack (Convert to ZIP)')
         print('    [M] Modpack Info')
+        print('    [S] Search Modpacks')
+        print('    [V] Verify/Repair Installation')
+        print('    [D] Deduplicate Installations')
         print('    [Q] Quit')
         print('')
         action: str = input('Choose an action: ').strip().lower()
@@ -175,7 +598,7 @@ def main() -> None:
         # Install Modpack
         if action == 'i':
             # Select modpack file
-            filename: Optional[str] = select_file(MODPACKS_DIR, 'mrpack')
+            filename: Optional[str] = select_modpack(catalog)
             if filename is None:
                 continue
             print_title()
@@ -184,7 +607,31 @@ def main() -> None:
             do_optional: bool = input('Should optional files be downloaded? Default: yes. [y/n] ').strip().lower() not in ('n', 'no')
 
             # Extract and install modpack
-            catch_errors(install, filename, do_optional)
+            catch_errors(install, filename, do_optional, cache, session, profile_store)
+
+            # Finish
+            print('')
+            input('Press ENTER to finish.')
+
+        # Upgrade Modpack
+        elif action == 'u':
+            # Select installation
+            install_path: Optional[str] = select_installation()
+            if install_path is None:
+                continue
+            print_title()
+
+            # Select modpack file
+            filename: Optional[str] = select_modpack(catalog)
+            if filename is None:
+                continue
+            print_title()
+
+            # Ask about optional files
+            do_optional: bool = input('Should optional files be downloaded? Default: yes. [y/n] ').strip().lower() not in ('n', 'no')
+
+            # Upgrade modpack
+            catch_errors(upgrade, filename, install_path, do_optional, cache, session, profile_store)
 
             # Finish
             print('')
@@ -193,7 +640,7 @@ def main() -> None:
         # Extract Modpack (Convert to ZIP)
         elif action == 'e':
             # Select modpack file
-            filename: Optional[str] = select_file(MODPACKS_DIR, 'mrpack')
+            filename: Optional[str] = select_modpack(catalog)
             if filename is None:
                 continue
             print_title()
@@ -203,7 +650,7 @@ def main() -> None:
             do_optional: bool = input('Should optional files be downloaded? Default: yes. [y/n] ').strip().lower() not in ('n', 'no')
 
             # Extract modpack
-            catch_errors(extract, filename, is_server, do_optional)
+            catch_errors(extract, filename, is_server, do_optional, cache, session)
 
             # Finish
             print('')
@@ -212,13 +659,47 @@ def main() -> None:
         # Modpack Info
         elif action == 'm':
             # Select modpack file
-            filename: Optional[str] = select_file(MODPACKS_DIR, 'mrpack')
+            filename: Optional[str] = select_modpack(catalog)
             if filename is None:
                 continue
             print_title()
 
             # Print modpack info
-            catch_errors(modpack_installer.print_modpack_info, filename)
+            catch_errors(modpack_installer.print_modpack_info, filename, catalog)
+
+            # Finish
+            print('')
+            input('Press ENTER to finish.')
+
+        # Search Modpacks
+        elif action == 's':
+            # Search modpacks
+            catch_errors(search_modpacks, catalog)
+
+            # Finish
+            print('')
+            input('Press ENTER to finish.')
+
+        # Verify/Repair Installation
+        elif action == 'v':
+            # Select installation
+            install_path: Optional[str] = select_installation()
+            if install_path is None:
+                continue
+            print_title()
+
+            # Verify installation and repair it if the user confirms
+            catch_errors(repair, install_path, cache, session)
+
+            # Finish
+            print('')
+            input('Press ENTER to finish.')
+
+        # Deduplicate Installations
+        elif action == 'd':
+            # Deduplicate installations
+            if catch_errors(modpack_installer.check_platform):
+                catch_errors(modpack_installer.dedupe_installations, cache)
 
             # Finish
             print('')
@@ -236,4 +717,6 @@ def main() -> None:
             input('Press ENTER to continue.')
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        sys.exit(run_batch(sys.argv[1:]))
     main()
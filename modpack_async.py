@@ -0,0 +1,440 @@
+# Documentation used: https://docs.python.org/3/library/asyncio.html
+
+# IMPORTS
+
+from modpack_installer import *
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Callable, Any
+import contextlib
+import functools
+import threading
+import tempfile
+import asyncio
+import shutil
+import os
+
+
+
+# CONSTANTS
+
+DEFAULT_ASYNC_DOWNLOADS: int = 16
+EXTRACT_OVERWRITE_POLICIES: tuple[str, ...] = ('replace', 'skip', 'error')
+INSTALL_OVERWRITE_POLICIES: tuple[str, ...] = ('new', 'replace', 'skip', 'error')
+
+
+
+# DEFINITIONS
+
+class AsyncLimits:
+    """
+    Limits and shared state for modpacks extracted or installed at the same time in one event loop.
+    Every download of every modpack shares one limit on concurrent downloads, the per-host limits, the bandwidth cap, the budget of bytes in flight, the host statistics, the hash workers and one HTTP session.
+    An instance must only be used from the event loop it was first used in.
+    """
+
+    def __init__(self, max_downloads: int = DEFAULT_ASYNC_DOWNLOADS, max_modpacks: Optional[int] = None, max_bandwidth: Optional[float] = None, max_in_flight_bytes: int = DEFAULT_MAX_IN_FLIGHT_BYTES, host_limiter: Optional[HostLimiter] = None, host_stats: Optional[HostStats] = None) -> None:
+        """
+        :param max_downloads: The maximum number of files downloaded at the same time, across all modpacks.
+        :type max_downloads: int
+        :param max_modpacks: The maximum number of modpacks extracted or installed at the same time, or None for no limit.
+        :type max_modpacks: Optional[int]
+        :param max_bandwidth: The maximum combined download speed, in bytes per second, or None for no limit.
+        :type max_bandwidth: Optional[float]
+        :param max_in_flight_bytes: The maximum number of bytes between the start of a download and an extracted .zip file, across all modpacks.
+        :type max_in_flight_bytes: int
+        :param host_limiter: The limiter for concurrent downloads per hostname, or None to use HOST_CONCURRENCY_LIMITS.
+        :type host_limiter: Optional[HostLimiter]
+        :param host_stats: The statistics used to rank download URLs and hedge slow downloads, or None to load them from CACHE_DIR and save them on close.
+        :type host_stats: Optional[HostStats]
+        """
+
+        self.download_semaphore: asyncio.Semaphore = asyncio.Semaphore(max(1, max_downloads))
+        self.modpack_semaphore: Optional[asyncio.Semaphore] = asyncio.Semaphore(max(1, max_modpacks)) if max_modpacks is not None else None
+        self.host_limiter: HostLimiter = host_limiter if host_limiter is not None else HostLimiter()
+        self.bandwidth_limiter: Optional[BandwidthLimiter] = BandwidthLimiter(max_bandwidth) if max_bandwidth is not None else None
+        self.byte_budget: ByteBudget = ByteBudget(max_in_flight_bytes)
+        self.owns_host_stats: bool = host_stats is None
+        self.host_stats: HostStats = host_stats if host_stats is not None else HostStats()
+        self.session: 'requests.Session' = create_session(pool_size=max(1, max_downloads))
+        self.hash_verifier: HashVerifier = HashVerifier()
+
+        # Downloads get their own threads, so a slow download never waits for reading or writing a modpack
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max(1, max_downloads), thread_name_prefix='async_download')
+
+    def modpack_slot(self) -> contextlib.AbstractAsyncContextManager:
+        """
+        Waits for a free modpack slot, if the number of modpacks is limited.
+
+        :rtype: contextlib.AbstractAsyncContextManager
+        """
+
+        return self.modpack_semaphore if self.modpack_semaphore is not None else contextlib.nullcontext()
+
+    def close(self) -> None:
+        """
+        Stops the download threads, closes the HTTP session and saves the host statistics if they were loaded by this instance.
+
+        :rtype: None
+        """
+
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.session.close()
+        self.hash_verifier.shutdown()
+        if self.owns_host_stats:
+            try:
+                self.host_stats.save()
+            except OSError:
+                pass
+
+    async def aclose(self) -> None:
+        """
+        Closes the limits without blocking the event loop. See close.
+
+        :rtype: None
+        """
+
+        await asyncio.to_thread(self.close)
+
+    async def __aenter__(self) -> 'AsyncLimits':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+async def fetch_file_async(download_metadata: dict, destination_path: str, limits: AsyncLimits, buffer_size: int = DEFAULT_BUFFER_SIZE, cache: Optional[ArtifactCache] = None, journal: Optional[DownloadJournal] = None, on_event: Optional[Callable[[dict], None]] = None, writer: Optional[ZipStreamWriter] = None) -> str:
+    """
+    Gets a file from a modpack index like fetch_file, or fetch_file_to_zip with a writer, on a download thread of the limits.
+    If the task is cancelled, the download is stopped, and the download slot is held until its thread has finished.
+
+    :param download_metadata: The entry for the file from the "files" list of the modpack index.
+    :type download_metadata: dict
+    :param destination_path: The path to save the file to if it has to be downloaded.
+    :type destination_path: str
+    :param limits: The limits shared by every modpack in the event loop.
+    :type limits: AsyncLimits
+    :param buffer_size: The size of each chunk read from the network, in bytes.
+    :type buffer_size: int
+    :param cache: The artifact cache to use, or None to always download.
+    :type cache: Optional[ArtifactCache]
+    :param journal: The journal of files finished by an earlier run to resume from and record to, or None.
+    :type journal: Optional[DownloadJournal]
+    :param on_event: A function called with a dict for each progress event, from download threads, or None. See SummaryReporter.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param writer: The writer to hand the file to as soon as it is downloaded, or None to keep it on disk.
+    :type writer: Optional[ZipStreamWriter]
+    :return: The path to the file on disk, which is already deleted if it was downloaded with a writer.
+    :rtype: str
+    """
+
+    cancel_event: threading.Event = threading.Event()
+    fetch: functools.partial
+    if writer is not None:
+        fetch = functools.partial(fetch_file_to_zip, download_metadata, destination_path, writer, limits.host_limiter, limits.session, buffer_size, cache, False, journal, limits.hash_verifier, on_event, limits.bandwidth_limiter, limits.host_stats, cancel_event)
+    else:
+        fetch = functools.partial(fetch_file, download_metadata, destination_path, limits.host_limiter, limits.session, buffer_size, cache, False, journal, limits.hash_verifier, on_event, limits.bandwidth_limiter, limits.host_stats, cancel_event)
+    async with limits.download_semaphore:
+        future: asyncio.Future = asyncio.get_running_loop().run_in_executor(limits.executor, fetch)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            cancel_event.set()
+            try:
+                await future
+            except Exception:
+                pass
+            raise
+
+async def download_files_async(downloads_metadata: list[dict], download_folder: str, limits: AsyncLimits, buffer_size: int = DEFAULT_BUFFER_SIZE, cache: Optional[ArtifactCache] = None, journal: Optional[DownloadJournal] = None, on_event: Optional[Callable[[dict], None]] = None, writer: Optional[ZipStreamWriter] = None) -> dict[str, str]:
+    """
+    Downloads files from a modpack index concurrently into a folder, within the limits shared with other modpacks.
+    The largest files are queued first, and the result keeps the order of downloads_metadata.
+    If any download fails or the task is cancelled, the other downloads are cancelled, and the error is raised once they have stopped.
+
+    :param downloads_metadata: The entries for the files to download from the "files" list of the modpack index.
+    :type downloads_metadata: list[dict]
+    :param download_folder: The folder to save the downloaded files to.
+    :type download_folder: str
+    :param limits: The limits shared by every modpack in the event loop.
+    :type limits: AsyncLimits
+    :param buffer_size: The size of each chunk read from the network, in bytes.
+    :type buffer_size: int
+    :param cache: The artifact cache to use, or None to always download.
+    :type cache: Optional[ArtifactCache]
+    :param journal: The journal of files finished by an earlier run to resume from and record to, or None.
+    :type journal: Optional[DownloadJournal]
+    :param on_event: A function called with a dict for each progress event, from download threads, or None. See SummaryReporter.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param writer: The writer to hand each file to as soon as it is downloaded, or None to keep every file in the folder.
+    :type writer: Optional[ZipStreamWriter]
+    :return: The path to each file on disk, keyed by path relative to the instance, in the same order as downloads_metadata. With a writer, downloaded files are already deleted.
+    :rtype: dict[str, str]
+    """
+
+    # Waiting tasks get the download semaphore in the order they were created, so the largest files start first
+    tasks: dict[str, asyncio.Task] = {}
+    for download_metadata in sorted(downloads_metadata, key=lambda download_metadata: download_metadata['fileSize'], reverse=True):
+        filename_relative_to_instance: str = download_metadata['path']
+        destination_path: str = os.path.join(download_folder, get_download_filename(filename_relative_to_instance))
+        tasks[filename_relative_to_instance] = asyncio.create_task(fetch_file_async(download_metadata, destination_path, limits, buffer_size, cache, journal, on_event, writer))
+
+    # Wait for downloads and raise the first error
+    try:
+        if len(tasks) > 0:
+            await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+        for task in tasks.values():
+            if task.done() and not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    # Keep the order of the modpack index
+    downloaded_files: dict[str, str] = {download_metadata['path']: tasks[download_metadata['path']].result() for download_metadata in downloads_metadata}
+    return downloaded_files
+
+async def extract_modpack_async(filename: str, destination_folder: str = '.', limits: Optional[AsyncLimits] = None, overwrite: str = 'replace', is_server: bool = False, download_optional_files: bool = True, buffer_size: int = DEFAULT_BUFFER_SIZE, cache: Optional[ArtifactCache] = None, compression_level: int = DEFAULT_COMPRESSION_LEVEL, compression_workers: int = DEFAULT_COMPRESSION_WORKERS, on_event: Optional[Callable[[dict], None]] = None, path_filter: Optional[PathFilter] = None, record_skipped: bool = False) -> tuple[str, dict]:
+    """
+    Converts an .mrpack file into a .zip file without blocking the event loop, like extract_modpack without prompts or logs.
+    Files are written into the .zip file as they are downloaded, within the budget of bytes in flight of the limits.
+    Downloaded files are kept in a resume folder until the .zip file is complete, so if the extract fails or is cancelled, extracting the modpack again resumes where it stopped.
+
+    :param filename: The path to the .mrpack file.
+    :type filename: str
+    :param destination_folder: The folder to save the .zip file to.
+    :type destination_folder: str
+    :param limits: The limits shared by every modpack in the event loop, or None to create limits for this modpack only.
+    :type limits: Optional[AsyncLimits]
+    :param overwrite: What to do if the .zip file already exists: "replace" it, "skip" the extract, or raise an "error".
+    :type overwrite: str
+    :param is_server: Whether to extract the server version of the modpack.
+    :type is_server: bool
+    :param download_optional_files: Whether to download optional files.
+    :type download_optional_files: bool
+    :param buffer_size: The size of each chunk read from the network and copied, in bytes.
+    :type buffer_size: int
+    :param cache: The artifact cache to use, or None to always download.
+    :type cache: Optional[ArtifactCache]
+    :param compression_level: The zlib compression level for compressed files in the .zip file.
+    :type compression_level: int
+    :param compression_workers: The maximum number of files compressed at the same time.
+    :type compression_workers: int
+    :param on_event: A function called with a dict for each progress event, possibly from worker threads, or None. See SummaryReporter.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param path_filter: The filter selecting which files and overrides are extracted, or None to extract all of them.
+    :type path_filter: Optional[PathFilter]
+    :param record_skipped: Whether to save the files and overrides left out by path_filter next to the .zip file for fetch_skipped_files.
+    :type record_skipped: bool
+    :return: The path to the .zip file, and the contents of the modpack index file as a dict.
+    :rtype: tuple[str, dict]
+    """
+
+    if overwrite not in EXTRACT_OVERWRITE_POLICIES:
+        raise ValueError(f'Invalid overwrite policy "{overwrite}"!')
+
+    owns_limits: bool = limits is None
+    if owns_limits:
+        limits = AsyncLimits()
+    try:
+        async with limits.modpack_slot():
+
+            # Read mrpack file
+            phase_start_time: float = start_phase(on_event, 'read')
+            data: dict
+            overrides: dict[str, ZipInfo]
+            data, overrides = await asyncio.to_thread(read_modpack, filename, is_server)
+            end_phase(on_event, 'read', phase_start_time)
+
+            # Check for an existing output file
+            output_filename: str = get_output_filename(destination_folder, data, is_server)
+            if os.path.exists(output_filename):
+                if overwrite == 'skip':
+                    return output_filename, data
+                if overwrite == 'error':
+                    raise ModpackExtractorError(f'"{output_filename}" already exists!')
+
+            # Leave out the files and overrides that don't match the path filter
+            required_downloads_metadata: list[dict] = [download_metadata for download_metadata in data['files'] if should_download_file(download_metadata, is_server, download_optional_files)]
+            skipped_downloads_metadata: list[dict]
+            skipped_overrides: dict[str, ZipInfo]
+            required_downloads_metadata, overrides, skipped_downloads_metadata, skipped_overrides = apply_path_filter(required_downloads_metadata, overrides, path_filter)
+
+            # Downloads are spilled to a folder next to the output file, which is kept if the extract stops
+            download_folder: str = get_resume_folder(destination_folder, output_filename, data)
+            os.makedirs(download_folder, exist_ok=True)
+            journal: DownloadJournal = await asyncio.to_thread(DownloadJournal, download_folder)
+            writer: ZipStreamWriter = ZipStreamWriter(output_filename, download_folder, limits.byte_budget, compression_level, buffer_size)
+            try:
+
+                # Download files and write them into the output zip file as they arrive
+                phase_start_time = start_phase(on_event, 'download')
+                await download_files_async(required_downloads_metadata, download_folder, limits, buffer_size, cache, journal, on_event, writer)
+                end_phase(on_event, 'download', phase_start_time)
+
+                # Write overrides and finish the output zip file
+                phase_start_time = start_phase(on_event, 'write_zip')
+                await asyncio.to_thread(writer.add_overrides, filename, overrides, compression_workers)
+                await asyncio.to_thread(writer.close)
+                end_phase(on_event, 'write_zip', phase_start_time)
+
+            except BaseException as error:
+                await asyncio.to_thread(writer.abort)
+                emit_event(on_event, 'error', error=str(error) or type(error).__name__)
+                raise
+            await asyncio.to_thread(shutil.rmtree, download_folder, ignore_errors=True)
+
+            # Record what was left out, replacing any record of an earlier extract
+            skipped_manifest_filename: str = get_skipped_manifest_filename(output_filename)
+            if record_skipped and (len(skipped_downloads_metadata) > 0 or len(skipped_overrides) > 0):
+                await asyncio.to_thread(write_skipped_manifest, skipped_manifest_filename, filename, data, is_server, skipped_downloads_metadata, skipped_overrides)
+            elif os.path.isfile(skipped_manifest_filename):
+                os.remove(skipped_manifest_filename)
+
+            return output_filename, data
+    finally:
+        if owns_limits:
+            await limits.aclose()
+
+async def install_modpack_async(filename: str, profile_version: str, limits: Optional[AsyncLimits] = None, overwrite: str = 'new', download_optional_files: bool = True, buffer_size: int = DEFAULT_BUFFER_SIZE, cache: Optional[ArtifactCache] = None, link_mode: str = DEFAULT_LINK_MODE, extract_workers: int = DEFAULT_EXTRACT_WORKERS, on_event: Optional[Callable[[dict], None]] = None, profile_store: Optional[LauncherProfileStore] = None) -> tuple[str, dict]:
+    """
+    Creates an installation in the Minecraft Launcher from an .mrpack file without blocking the event loop, like install_modpack_from_mrpack without prompts or logs.
+    A replaced installation is only swapped out once the new one is complete, and keeps its launcher profile.
+    If the install fails or is cancelled, nothing is left behind and an existing installation is kept.
+
+    :param filename: The path to the .mrpack file.
+    :type filename: str
+    :param profile_version: The name of the Minecraft version folder the launcher profile uses.
+    :type profile_version: str
+    :param limits: The limits shared by every modpack in the event loop, or None to create limits for this modpack only.
+    :type limits: Optional[AsyncLimits]
+    :param overwrite: What to do if the modpack is already installed: install a "new" copy with a numbered suffix, "replace" the installation, "skip" the install, or raise an "error".
+    :type overwrite: str
+    :param download_optional_files: Whether to download optional files.
+    :type download_optional_files: bool
+    :param buffer_size: The size of each chunk read from the network and copied, in bytes.
+    :type buffer_size: int
+    :param cache: The artifact cache to use, or None to always download.
+    :type cache: Optional[ArtifactCache]
+    :param link_mode: How cached files are placed in the game directory: "hardlink", "reflink" or "copy".
+    :type link_mode: str
+    :param extract_workers: The maximum number of overrides written at the same time.
+    :type extract_workers: int
+    :param on_event: A function called with a dict for each progress event, possibly from worker threads, or None. See SummaryReporter.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param profile_store: The store to add the launcher profile to, or None to write it to launcher_profiles.json immediately.
+    :type profile_store: Optional[LauncherProfileStore]
+    :return: The path to the game directory, and the contents of the modpack index file as a dict.
+    :rtype: tuple[str, dict]
+    """
+
+    if overwrite not in INSTALL_OVERWRITE_POLICIES:
+        raise ValueError(f'Invalid overwrite policy "{overwrite}"!')
+    await asyncio.to_thread(check_profile_version, profile_version)
+    if profile_store is None:
+        profile_store = LauncherProfileStore()
+
+    owns_limits: bool = limits is None
+    if owns_limits:
+        limits = AsyncLimits()
+    try:
+        async with limits.modpack_slot():
+
+            # Read mrpack file
+            phase_start_time: float = start_phase(on_event, 'read')
+            data: dict
+            overrides: dict[str, ZipInfo]
+            data, overrides = await asyncio.to_thread(read_modpack, filename, False)
+            end_phase(on_event, 'read', phase_start_time)
+
+            # Get installation path and name
+            # Nothing is awaited until the new game directory exists, so other installs in the event loop can't pick the same one
+            os.makedirs(INSTALLATIONS_DIR, exist_ok=True)
+            install_path: str
+            profile_name: str
+            install_path, profile_name = get_install_path(data, wait_for_user=False, print_logs=False, replace_existing=overwrite != 'new')
+            replacing: bool = os.path.isdir(install_path) and overwrite != 'new'
+            if replacing and overwrite == 'skip':
+                return install_path, data
+            if replacing and overwrite == 'error':
+                raise ModpackInstallerError(f'This modpack is already installed in "{install_path}"!')
+
+            # A replacement is built next to the existing installation and swapped in when it's complete
+            target_path: str
+            if replacing:
+                target_path = tempfile.mkdtemp(prefix='.soup_mrpack_replace_', dir=INSTALLATIONS_DIR)
+            else:
+                target_path = install_path
+                os.makedirs(target_path)
+
+            download_folder: Optional[str] = None
+            try:
+
+                # Get the icon URI
+                original_icon_data: Optional[bytes] = None
+                if 'icon.png' in overrides:
+                    with ZipFile(filename, 'r') as zf:
+                        original_icon_data = await asyncio.to_thread(zf.read, overrides['icon.png'])
+                profile_icon: str = await asyncio.to_thread(create_profile_icon, original_icon_data, False)
+
+                # Download files
+                # Downloads are moved into place from a temporary folder on the same drive as the game directory
+                download_folder = tempfile.mkdtemp(prefix='.soup_mrpack_', dir=INSTALLATIONS_DIR)
+                phase_start_time = start_phase(on_event, 'download')
+                required_downloads_metadata: list[dict] = [download_metadata for download_metadata in data['files'] if should_download_file(download_metadata, False, download_optional_files)]
+                for download_metadata in required_downloads_metadata:
+                    get_safe_path(target_path, download_metadata['path'])
+                downloaded_files: dict[str, str] = await download_files_async(required_downloads_metadata, download_folder, limits, buffer_size, cache, on_event=on_event)
+                end_phase(on_event, 'download', phase_start_time)
+
+                # Install downloaded files
+                phase_start_time = start_phase(on_event, 'install_files')
+                await asyncio.to_thread(install_downloaded_files, downloaded_files, download_folder, target_path, link_mode)
+                end_phase(on_event, 'install_files', phase_start_time)
+
+                # Install overrides
+                phase_start_time = start_phase(on_event, 'install_overrides')
+                await asyncio.to_thread(install_overrides, filename, overrides, target_path, buffer_size, extract_workers)
+                end_phase(on_event, 'install_overrides', phase_start_time)
+
+                # Save index for upgrades
+                await asyncio.to_thread(write_installation_manifest, target_path, data, list(downloaded_files), list(overrides))
+
+            # Don't leave a broken installation behind
+            except BaseException as error:
+                await asyncio.to_thread(shutil.rmtree, target_path, ignore_errors=True)
+                emit_event(on_event, 'error', error=str(error) or type(error).__name__)
+                raise
+            finally:
+                if download_folder is not None:
+                    await asyncio.to_thread(shutil.rmtree, download_folder, ignore_errors=True)
+
+            # Swap in the replacement
+            if replacing:
+                old_path: str = tempfile.mkdtemp(prefix='.soup_mrpack_old_', dir=INSTALLATIONS_DIR)
+                os.replace(install_path, os.path.join(old_path, 'installation'))
+                os.replace(target_path, install_path)
+                await asyncio.to_thread(shutil.rmtree, old_path, ignore_errors=True)
+
+            # Save launcher profile, updating the profile of a replaced installation instead of adding another one
+            phase_start_time = start_phase(on_event, 'profile')
+            profile_fields: dict[str, str] = {'name': profile_name, 'icon': profile_icon, 'lastVersionId': profile_version}
+            if not replacing or await asyncio.to_thread(profile_store.update_profiles, install_path, profile_fields) == 0:
+                await asyncio.to_thread(save_launcher_profile, profile_name, profile_icon, profile_version, install_path, False, profile_store)
+            end_phase(on_event, 'profile', phase_start_time)
+
+            return install_path, data
+    finally:
+        if owns_limits:
+            await limits.aclose()
+
+
+
+# MAIN
+
+if __name__ == '__main__':
+    # # Testing
+    # async def test() -> None:
+    #     async with AsyncLimits() as limits:
+    #         await asyncio.gather(*(install_modpack_async(filename, '1.20.1-fabric', limits) for filename in ('modpacks/a.mrpack', 'modpacks/b.mrpack')))
+    # asyncio.run(test())
+    pass
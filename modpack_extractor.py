@@ -0,0 +1,3261 @@
+# Documentation used: https://support.modrinth.com/en/articles/8802351-modrinth-modpack-format-mrpack
+
+# IMPORTS
+
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, as_completed, wait
+from zipfile import ZipFile, ZipInfo, BadZipFile, ZIP_STORED, ZIP_DEFLATED, ZIP64_LIMIT
+from typing import Optional, Callable, BinaryIO
+from urllib.parse import urlparse
+import collections
+import threading
+import tempfile
+import sqlite3
+import fnmatch
+import hashlib
+import shutil
+import struct
+import queue
+import zlib
+import json
+import time
+import re
+import os
+
+
+
+# CONSTANTS
+
+CACHE_DIR: str = os.path.join(os.getenv('APPDATA') or os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), '.soup_mc_modrinth_cache')
+RESUME_FOLDER_PREFIX: str = '.soup_mrpack_resume_'
+DOWNLOAD_JOURNAL_FILENAME: str = 'journal.jsonl'
+SKIPPED_MANIFEST_SUFFIX: str = '.skipped.json'
+FETCH_FOLDER_PREFIX: str = '.soup_mrpack_fetch_'
+CATALOG_FILENAME: str = '.soup_modpack_catalog.sqlite3'
+CATALOG_SCHEMA_VERSION: int = 1
+CATALOG_SORT_KEYS: tuple[str, ...] = ('name', 'version_id', 'filename', 'file_count', 'download_size', 'mtime_ns')
+FILENAME_UNSAFE_CHARACTERS: str = r'\/:*?"<>|'
+STRICT_FILENAME_ALLOWED_CHARACTERS: str = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_-'
+ALLOWED_HOSTNAMES: list[str] = ['cdn.modrinth.com', 'github.com', 'raw.githubusercontent.com', 'gitlab.com']
+
+DEFAULT_DOWNLOAD_WORKERS: int = 8
+DEFAULT_BUFFER_SIZE: int = 1024 * 1024
+DEFAULT_POOL_SIZE: int = DEFAULT_DOWNLOAD_WORKERS
+DEFAULT_TIMEOUT: tuple[float, float] = (10, 60)
+DEFAULT_RETRIES: int = 5
+DEFAULT_BACKOFF_FACTOR: float = 0.5
+RETRY_STATUS_CODES: tuple[int, ...] = (429, 500, 502, 503, 504)
+DEFAULT_CACHE_MAX_SIZE: int = 10 * 1024 * 1024 * 1024
+CACHE_VERIFY_POLICIES: tuple[str, ...] = ('never', 'size', 'always')
+LINK_MODES: tuple[str, ...] = ('copy', 'hardlink', 'reflink')
+DEFAULT_LINK_MODE: str = 'reflink'
+FICLONE: int = 0x40049409
+FSCTL_DUPLICATE_EXTENTS_TO_FILE: int = 0x00098344
+DUPLICATE_EXTENTS_CHUNK_SIZE: int = 1024 * 1024 * 1024
+ZIP_LOCAL_FILE_HEADER_STRUCT: str = '<4s2B4HL2L2H'
+ZIP_LOCAL_FILE_HEADER_SIGNATURE: bytes = b'PK\x03\x04'
+ZIP_FLAG_ENCRYPTED: int = 0x1
+ZIP_FLAG_DATA_DESCRIPTOR: int = 0x8
+ZIP_RAW_WRITE_ATTRIBUTES: tuple[str, ...] = ('_lock', '_writing', '_writecheck', '_didModify', 'fp', 'filelist', 'NameToInfo', 'start_dir')
+DEFAULT_COMPRESSION_LEVEL: int = 6
+DEFAULT_COMPRESSION_WORKERS: int = os.cpu_count() or 1
+DEFAULT_HASH_WORKERS: int = os.cpu_count() or 1
+HASH_QUEUE_CHUNKS: int = 4
+DEFAULT_MAX_IN_FLIGHT_BYTES: int = 256 * 1024 * 1024
+BANDWIDTH_BURST_SECONDS: float = 0.25
+BANDWIDTH_MIN_CHUNK_SIZE: int = 16 * 1024
+HOST_STATS_FILENAME: str = 'host_stats.json'
+HOST_STATS_SMOOTHING: float = 0.3
+HOST_STATS_MIN_THROUGHPUT_SIZE: int = 64 * 1024
+DEFAULT_HOST_LATENCY: float = 0.5
+DEFAULT_HOST_THROUGHPUT: float = 2 * 1024 * 1024
+HEDGE_DELAY_FACTOR: float = 3
+HEDGE_MIN_DELAY: float = 2
+CANCEL_POLL_INTERVAL: float = 0.1
+DEFAULT_EXTRACT_WORKERS: int = min(32, (os.cpu_count() or 1) + 4)
+PREALLOCATE_MIN_SIZE: int = 1024 * 1024
+STORED_FILE_EXTENSIONS: tuple[str, ...] = ('.jar', '.zip', '.png', '.jpg', '.jpeg', '.ogg', '.mp3', '.gz', '.xz', '.7z', '.mca', '.nbt', '.dat')
+DEFAULT_HOST_CONCURRENCY_LIMIT: int = 2
+HOST_CONCURRENCY_LIMITS: dict[str, int] = {
+    'cdn.modrinth.com': 8,
+    'github.com': 4,
+    'raw.githubusercontent.com': 4,
+    'gitlab.com': 2
+}
+
+DEPENDENCY_NAMES: dict[str, str] = {
+    'minecraft': 'Minecraft',
+    'forge': 'Forge',
+    'neoforge': 'NeoForge',
+    'fabric-loader': 'Fabric',
+    'quilt-loader': 'Quilt'
+}
+
+
+
+# DEFINITIONS
+
+class ModpackExtractorError(Exception):
+    pass
+
+class HostLimiter:
+    """
+    Limits how many downloads can run at the same time for each hostname.
+    """
+
+    def __init__(self, limits: Optional[dict[str, int]] = None, default_limit: int = DEFAULT_HOST_CONCURRENCY_LIMIT) -> None:
+        """
+        :param limits: The maximum number of concurrent downloads for each hostname, or None to use HOST_CONCURRENCY_LIMITS.
+        :type limits: Optional[dict[str, int]]
+        :param default_limit: The maximum number of concurrent downloads for hostnames not in limits.
+        :type default_limit: int
+        """
+
+        self.limits: dict[str, int] = HOST_CONCURRENCY_LIMITS if limits is None else limits
+        self.default_limit: int = default_limit
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def get_semaphore(self, hostname: str) -> threading.BoundedSemaphore:
+        """
+        Gets the semaphore that must be held while downloading from a hostname.
+
+        :param hostname: The hostname being downloaded from.
+        :type hostname: str
+        :rtype: threading.BoundedSemaphore
+        """
+
+        with self._lock:
+            if hostname not in self._semaphores:
+                self._semaphores[hostname] = threading.BoundedSemaphore(self.limits.get(hostname, self.default_limit))
+            return self._semaphores[hostname]
+
+class BandwidthLimiter:
+    """
+    Limits the combined download speed of every transfer that shares it to a number of bytes per second, with a token bucket.
+    Each chunk is paid for after it is received, and the thread that received it sleeps until the bucket has refilled, which slows down reading from the connection.
+    """
+
+    def __init__(self, bytes_per_second: float, burst_seconds: float = BANDWIDTH_BURST_SECONDS) -> None:
+        """
+        :param bytes_per_second: The maximum combined download speed, in bytes per second.
+        :type bytes_per_second: float
+        :param burst_seconds: How many seconds of unused bandwidth can be saved up and used at once.
+        :type burst_seconds: float
+        """
+
+        if bytes_per_second <= 0:
+            raise ValueError(f'Invalid bandwidth limit {bytes_per_second}!')
+
+        self.bytes_per_second: float = bytes_per_second
+        self.burst_size: float = bytes_per_second * burst_seconds
+        self.waited: float = 0
+        self._tokens: float = self.burst_size
+        self._last_refill: float = time.monotonic()
+        self._lock: threading.Lock = threading.Lock()
+
+    def get_chunk_size(self, buffer_size: int) -> int:
+        """
+        Gets the size of the chunks to read, so a single chunk never takes much longer than the burst size to pay for.
+
+        :param buffer_size: The size of the chunks read without a limit, in bytes.
+        :type buffer_size: int
+        :rtype: int
+        """
+
+        return max(BANDWIDTH_MIN_CHUNK_SIZE, min(buffer_size, int(self.burst_size)))
+
+    def consume(self, size: int) -> None:
+        """
+        Pays for a received chunk, sleeping until the combined download speed is back under the limit.
+
+        :param size: The size of the chunk, in bytes.
+        :type size: int
+        :rtype: None
+        """
+
+        with self._lock:
+            now: float = time.monotonic()
+            self._tokens = min(self.burst_size, self._tokens + (now - self._last_refill) * self.bytes_per_second)
+            self._last_refill = now
+            self._tokens -= size
+            delay: float = -self._tokens / self.bytes_per_second if self._tokens < 0 else 0
+            self.waited += delay
+        if delay > 0:
+            time.sleep(delay)
+
+class ByteBudget:
+    """
+    Limits the number of bytes in flight between the stages of a pipeline, so earlier stages wait when later ones fall behind.
+    A stage acquires the size of an item before working on it, and the last stage releases it.
+    An item larger than the whole budget is let through once nothing else is in flight, so it can't wait forever.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_IN_FLIGHT_BYTES) -> None:
+        """
+        :param max_bytes: The maximum number of bytes in flight.
+        :type max_bytes: int
+        """
+
+        self.max_bytes: int = max(1, max_bytes)
+        self.in_flight: int = 0
+        self.peak: int = 0
+        self.waited: float = 0
+        self._condition: threading.Condition = threading.Condition()
+
+    def acquire(self, size: int) -> None:
+        """
+        Waits until an item fits in the budget and adds it.
+
+        :param size: The size of the item, in bytes.
+        :type size: int
+        :rtype: None
+        """
+
+        with self._condition:
+            if self.in_flight > 0 and self.in_flight + size > self.max_bytes:
+                start_time: float = time.perf_counter()
+                self._condition.wait_for(lambda: self.in_flight == 0 or self.in_flight + size <= self.max_bytes)
+                self.waited += time.perf_counter() - start_time
+            self.in_flight += size
+            self.peak = max(self.peak, self.in_flight)
+
+    def release(self, size: int) -> None:
+        """
+        Removes an item from the budget.
+
+        :param size: The size the item was acquired with, in bytes.
+        :type size: int
+        :rtype: None
+        """
+
+        with self._condition:
+            self.in_flight -= size
+            self._condition.notify_all()
+
+class HostStats:
+    """
+    Measured latency, throughput and failure rate of each download host, kept across runs in a JSON file.
+    Each measurement is blended into a moving average, so hosts that speed up or slow down are noticed after a few downloads.
+    Used to try the fastest of a file's download URLs first, and to decide when a download is slow enough to hedge with another URL.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        :param path: The JSON file to load and save the statistics in, or None to use HOST_STATS_FILENAME in CACHE_DIR.
+        :type path: Optional[str]
+        """
+
+        if path is None:
+            path = os.path.join(CACHE_DIR, HOST_STATS_FILENAME)
+
+        self.path: str = path
+        self._hosts: dict[str, dict[str, float]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+        # Load statistics from earlier runs, ignoring a missing or damaged file
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    hosts: dict = json.loads(f.read())
+                for hostname, host in hosts.items():
+                    self._hosts[hostname] = {key: float(host[key]) for key in ('latency', 'throughput', 'failure_rate', 'samples')}
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                self._hosts = {}
+
+    def _blend(self, hostname: str, key: str, value: float) -> None:
+        """
+        Blends a measurement into the moving average of a host. Must be called while holding the lock.
+
+        :param hostname: The hostname.
+        :type hostname: str
+        :param key: The statistic: "latency", "throughput" or "failure_rate".
+        :type key: str
+        :param value: The measurement.
+        :type value: float
+        :rtype: None
+        """
+
+        host: dict[str, float] = self._hosts.setdefault(hostname, {'latency': DEFAULT_HOST_LATENCY, 'throughput': DEFAULT_HOST_THROUGHPUT, 'failure_rate': 0.0, 'samples': 0.0})
+        host[key] = value if host['samples'] == 0 and key != 'failure_rate' else host[key] + HOST_STATS_SMOOTHING * (value - host[key])
+
+    def record(self, hostname: str, latency: float, size: int, duration: float) -> None:
+        """
+        Records a download from a host, whether it finished or was cancelled.
+
+        :param hostname: The hostname.
+        :type hostname: str
+        :param latency: The time until the response headers arrived, in seconds.
+        :type latency: float
+        :param size: The number of bytes received.
+        :type size: int
+        :param duration: The time from sending the request until the last byte arrived, in seconds.
+        :type duration: float
+        :rtype: None
+        """
+
+        with self._lock:
+            self._blend(hostname, 'latency', latency)
+            if size >= HOST_STATS_MIN_THROUGHPUT_SIZE and duration > latency:
+                self._blend(hostname, 'throughput', size / (duration - latency))
+            self._blend(hostname, 'failure_rate', 0.0)
+            self._hosts[hostname]['samples'] += 1
+
+    def record_failure(self, hostname: str) -> None:
+        """
+        Records a download from a host that failed.
+
+        :param hostname: The hostname.
+        :type hostname: str
+        :rtype: None
+        """
+
+        with self._lock:
+            self._blend(hostname, 'failure_rate', 1.0)
+            self._hosts[hostname]['samples'] += 1
+
+    def estimate_duration(self, hostname: str, size: int) -> float:
+        """
+        Estimates how long downloading a file from a host takes, including the chance of having to try again.
+
+        :param hostname: The hostname.
+        :type hostname: str
+        :param size: The size of the file, in bytes.
+        :type size: int
+        :return: The estimated duration, in seconds.
+        :rtype: float
+        """
+
+        with self._lock:
+            host: Optional[dict[str, float]] = self._hosts.get(hostname)
+            if host is None:
+                return DEFAULT_HOST_LATENCY + size / DEFAULT_HOST_THROUGHPUT
+            return (host['latency'] + size / max(1.0, host['throughput'])) / max(0.05, 1 - host['failure_rate'])
+
+    def rank_urls(self, download_urls: list[str], size: int) -> list[str]:
+        """
+        Orders download URLs from fastest to slowest by their host's estimated duration.
+        URLs whose hosts are estimated to be equally fast keep their order.
+
+        :param download_urls: The download URLs of a file.
+        :type download_urls: list[str]
+        :param size: The size of the file, in bytes.
+        :type size: int
+        :rtype: list[str]
+        """
+
+        return sorted(download_urls, key=lambda download_url: self.estimate_duration(urlparse(download_url).hostname, size))
+
+    def get_hedge_delay(self, hostname: str, size: int) -> float:
+        """
+        Gets how long a download from a host can take before a hedged request is sent to the next URL.
+
+        :param hostname: The hostname.
+        :type hostname: str
+        :param size: The size of the file, in bytes.
+        :type size: int
+        :return: The delay, in seconds.
+        :rtype: float
+        """
+
+        return max(HEDGE_MIN_DELAY, self.estimate_duration(hostname, size) * HEDGE_DELAY_FACTOR)
+
+    def get_stats(self) -> dict[str, dict[str, float]]:
+        """
+        Gets the statistics of every host.
+
+        :return: The "latency" in seconds, "throughput" in bytes per second, "failure_rate" and number of "samples" of each host, keyed by hostname.
+        :rtype: dict[str, dict[str, float]]
+        """
+
+        with self._lock:
+            return {hostname: dict(host) for hostname, host in self._hosts.items()}
+
+    def save(self) -> None:
+        """
+        Writes the statistics to the JSON file, replacing it atomically.
+
+        :rtype: None
+        """
+
+        hosts: dict[str, dict[str, float]] = self.get_stats()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temporary_path: str = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(hosts))
+        os.replace(temporary_path, self.path)
+
+class HashJob:
+    """
+    Calculates the SHA1 and SHA512 hashes of one file as it is downloaded.
+    With a HashVerifier, chunks are hashed in order on its worker threads while the download continues, and at most HASH_QUEUE_CHUNKS chunks wait to be hashed at a time.
+    Without one, chunks are hashed immediately on the calling thread.
+    """
+
+    def __init__(self, verifier: Optional['HashVerifier'] = None) -> None:
+        """
+        :param verifier: The verifier whose worker threads hash the chunks, or None to hash them immediately.
+        :type verifier: Optional[HashVerifier]
+        """
+
+        self._verifier: Optional[HashVerifier] = verifier
+        self._sha1: hashlib.sha1 = hashlib.sha1()
+        self._sha512: hashlib.sha512 = hashlib.sha512()
+        self._pending: collections.deque[bytes] = collections.deque()
+        self._slots: threading.BoundedSemaphore = threading.BoundedSemaphore(HASH_QUEUE_CHUNKS)
+        self._idle: threading.Event = threading.Event()
+        self._idle.set()
+        self._scheduled: bool = False
+        self._lock: threading.Lock = threading.Lock()
+
+    def update(self, chunk: bytes) -> None:
+        """
+        Adds the next chunk of the file.
+
+        :param chunk: The chunk.
+        :type chunk: bytes
+        :rtype: None
+        """
+
+        if self._verifier is None:
+            self._hash(chunk)
+            return
+
+        # Queue the chunk, and start hashing if no worker is already hashing this file
+        self._slots.acquire()
+        with self._lock:
+            self._pending.append(chunk)
+            if self._scheduled:
+                return
+            self._scheduled = True
+            self._idle.clear()
+        self._verifier.submit(self._drain)
+
+    def hexdigests(self) -> tuple[str, str]:
+        """
+        Waits for every chunk to be hashed and gets the hashes.
+
+        :return: The SHA1 and SHA512 hashes of the file, as hexadecimal strings.
+        :rtype: tuple[str, str]
+        """
+
+        self._idle.wait()
+        return self._sha1.hexdigest(), self._sha512.hexdigest()
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                if len(self._pending) == 0:
+                    self._scheduled = False
+                    self._idle.set()
+                    return
+                chunk: bytes = self._pending.popleft()
+            self._hash(chunk)
+            self._slots.release()
+
+    def _hash(self, chunk: bytes) -> None:
+        start_time: float = time.perf_counter()
+        self._sha1.update(chunk)
+        self._sha512.update(chunk)
+        if self._verifier is not None:
+            self._verifier.record(len(chunk), time.perf_counter() - start_time)
+
+class HashVerifier:
+    """
+    A pool of worker threads that hash downloaded files while they are being downloaded, so hashing doesn't hold up the network.
+    hashlib releases the GIL while hashing, so the pool is sized to the number of cores.
+    """
+
+    def __init__(self, workers: int = DEFAULT_HASH_WORKERS) -> None:
+        """
+        :param workers: The number of worker threads.
+        :type workers: int
+        """
+
+        self.files_verified: int = 0
+        self.verification_failures: int = 0
+        self.bytes_hashed: int = 0
+        self.hash_time: float = 0
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='hash')
+        self._lock: threading.Lock = threading.Lock()
+
+    def start(self) -> HashJob:
+        """
+        Starts hashing a new file.
+
+        :rtype: HashJob
+        """
+
+        return HashJob(self)
+
+    def submit(self, function: Callable[[], None]) -> None:
+        """
+        Runs a function on a worker thread.
+
+        :param function: The function.
+        :type function: Callable[[], None]
+        :rtype: None
+        """
+
+        self._executor.submit(function)
+
+    def record(self, byte_count: int, hash_time: float) -> None:
+        """
+        Adds a hashed chunk to the throughput counters.
+
+        :param byte_count: The size of the chunk, in bytes.
+        :type byte_count: int
+        :param hash_time: The time spent hashing the chunk, in seconds.
+        :type hash_time: float
+        :rtype: None
+        """
+
+        with self._lock:
+            self.bytes_hashed += byte_count
+            self.hash_time += hash_time
+
+    def record_result(self, valid: bool) -> None:
+        """
+        Adds a verified file to the counters.
+
+        :param valid: Whether the hashes of the file matched.
+        :type valid: bool
+        :rtype: None
+        """
+
+        with self._lock:
+            if valid:
+                self.files_verified += 1
+            else:
+                self.verification_failures += 1
+
+    def get_stats(self) -> dict[str, float]:
+        """
+        Gets the throughput statistics of the verifier.
+        The throughput is the number of bytes hashed per second spent hashing, summed over the worker threads.
+
+        :rtype: dict[str, float]
+        """
+
+        with self._lock:
+            return {
+                'files_verified': self.files_verified,
+                'verification_failures': self.verification_failures,
+                'bytes_hashed': self.bytes_hashed,
+                'hash_time': self.hash_time,
+                'throughput': self.bytes_hashed / self.hash_time if self.hash_time > 0 else 0
+            }
+
+    def shutdown(self) -> None:
+        """
+        Waits for every queued chunk to be hashed and stops the worker threads.
+
+        :rtype: None
+        """
+
+        self._executor.shutdown(wait=True)
+
+class ArtifactCache:
+    """
+    A persistent content-addressed cache of downloaded files, keyed by their SHA512 hash.
+    When the cache grows past its maximum size, the least recently used files are evicted. Use is tracked by access time, so the modification time of a cached file never changes.
+    Files used since the cache was opened are never evicted, so they stay available to running extracts.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_size: int = DEFAULT_CACHE_MAX_SIZE, verify_policy: str = 'size') -> None:
+        """
+        :param directory: The folder to store cached files in.
+        :type directory: str
+        :param max_size: The maximum total size of the cache, in bytes.
+        :type max_size: int
+        :param verify_policy: How cached files are checked before being used. "never" trusts them, "size" checks the file size, and "always" checks the SHA512 hash.
+        :type verify_policy: str
+        """
+
+        if verify_policy not in CACHE_VERIFY_POLICIES:
+            raise ValueError(f'Invalid cache verify policy "{verify_policy}"!')
+
+        self.directory: str = directory
+        self.max_size: int = max_size
+        self.verify_policy: str = verify_policy
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.verification_failures: int = 0
+        self.bytes_saved: int = 0
+        self._size: Optional[int] = None
+        self._opened_at: float = time.time()
+        self._lock: threading.Lock = threading.Lock()
+        self._key_locks: dict[str, threading.Lock] = {}
+
+    def get_key_lock(self, sha512: str) -> threading.Lock:
+        """
+        Gets the lock that must be held while looking up and downloading a file, so each file is only downloaded once even if many extracts need it at the same time.
+
+        :param sha512: The SHA512 hash of the file.
+        :type sha512: str
+        :rtype: threading.Lock
+        """
+
+        with self._lock:
+            if sha512 not in self._key_locks:
+                self._key_locks[sha512] = threading.Lock()
+            return self._key_locks[sha512]
+
+    def get_path(self, sha512: str) -> str:
+        """
+        Gets the path a file is stored at in the cache.
+
+        :param sha512: The SHA512 hash of the file.
+        :type sha512: str
+        :rtype: str
+        """
+
+        sha512 = sha512.lower()
+        if len(sha512) != 128 or sha512.strip('0123456789abcdef') != '':
+            raise ValueError(f'Invalid SHA512 hash "{sha512}"!')
+        return os.path.join(self.directory, sha512[:2], sha512)
+
+    def contains(self, download_metadata: dict) -> bool:
+        """
+        Checks whether a file from a modpack index is in the cache with the right size, without verifying it, marking it as used or counting a hit.
+
+        :param download_metadata: The entry for the file from the "files" list of the modpack index.
+        :type download_metadata: dict
+        :rtype: bool
+        """
+
+        try:
+            return os.path.getsize(self.get_path(download_metadata['hashes']['sha512'])) == download_metadata['fileSize']
+        except (ValueError, OSError):
+            return False
+
+    def get(self, download_metadata: dict) -> Optional[str]:
+        """
+        Looks up a file from a modpack index in the cache.
+
+        :param download_metadata: The entry for the file from the "files" list of the modpack index.
+        :type download_metadata: dict
+        :return: The path to the cached file, or None if it isn't cached.
+        :rtype: Optional[str]
+        """
+
+        try:
+            path: str = self.get_path(download_metadata['hashes']['sha512'])
+        except ValueError:
+            path: str = ''
+        file_size: int = download_metadata['fileSize']
+
+        # Check for the file
+        if path == '' or not os.path.isfile(path):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Verify the file
+        valid: bool = True
+        if self.verify_policy == 'size':
+            valid = os.path.getsize(path) == file_size
+        elif self.verify_policy == 'always':
+            valid = hash_file(path)[1] == download_metadata['hashes']['sha512']
+        if not valid:
+            self._remove(path)
+            with self._lock:
+                self.verification_failures += 1
+                self.misses += 1
+            return None
+
+        # Mark as recently used through the access time only, since installations recognise files reflinked from the cache, and verify caches recognise files hardlinked to it, by their modification time
+        stat: os.stat_result = os.stat(path)
+        os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += file_size
+        return path
+
+    def put(self, sha512: str, source_path: str, move: bool = False) -> str:
+        """
+        Copies a verified file into the cache, evicting old files if the cache is too big.
+
+        :param sha512: The SHA512 hash of the file.
+        :type sha512: str
+        :param source_path: The path to the file to cache.
+        :type source_path: str
+        :param move: Whether to move the file into the cache instead of copying it, if it is on the same drive.
+        :type move: bool
+        :return: The path to the cached file.
+        :rtype: str
+        """
+
+        path: str = self.get_path(sha512)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Copy to a temporary file first so a partial copy is never used
+        temporary_path: str = f'{path}.{threading.get_ident()}.tmp'
+        moved: bool = False
+        if move:
+            try:
+                os.replace(source_path, temporary_path)
+                moved = True
+            except OSError:
+                pass
+        if not moved:
+            shutil.copyfile(source_path, temporary_path)
+        os.replace(temporary_path, path)
+
+        file_size: int = os.path.getsize(path)
+        with self._lock:
+            if self._size is not None:
+                self._size += file_size
+        self.evict()
+        return path
+
+    def get_size(self) -> int:
+        """
+        Gets the total size of the files in the cache, in bytes.
+
+        :rtype: int
+        """
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(os.path.getsize(path) for path, _ in self._list_entries())
+            return self._size
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used files until the cache is within its maximum size.
+
+        :rtype: None
+        """
+
+        if self.get_size() <= self.max_size:
+            return
+
+        with self._lock:
+            entries: list[tuple[str, os.stat_result]] = sorted(self._list_entries(), key=lambda entry: entry[1].st_atime)
+            for path, stat in entries:
+                if self._size <= self.max_size:
+                    break
+                if stat.st_atime >= self._opened_at:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                self._size -= stat.st_size
+                self.evictions += 1
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Gets the hit and miss statistics of the cache since it was opened.
+
+        :rtype: dict[str, int]
+        """
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'verification_failures': self.verification_failures,
+                'bytes_saved': self.bytes_saved
+            }
+
+    def discard(self, sha512: str) -> None:
+        """
+        Removes a file from the cache, such as when its contents no longer match its hash.
+        Hardlinks to the file in game directories are not affected.
+
+        :param sha512: The SHA512 hash of the file.
+        :type sha512: str
+        :rtype: None
+        """
+
+        self._remove(self.get_path(sha512))
+
+    def _list_entries(self) -> list[tuple[str, os.stat_result]]:
+        entries: list[tuple[str, os.stat_result]] = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for prefix in os.listdir(self.directory):
+            prefix_path: str = os.path.join(self.directory, prefix)
+            if not os.path.isdir(prefix_path):
+                continue
+            for entry in os.scandir(prefix_path):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    entries.append((entry.path, entry.stat()))
+        return entries
+
+    def _remove(self, path: str) -> None:
+        try:
+            file_size: int = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size -= file_size
+
+class DownloadJournal:
+    """
+    An append-only record of the files that have been downloaded and verified for an extract, stored next to the downloads.
+    If the extract fails, rerunning it with the same journal skips the files that were already finished.
+    """
+
+    def __init__(self, folder: str) -> None:
+        """
+        :param folder: The folder the journal file is stored in.
+        :type folder: str
+        """
+
+        self.folder: str = folder
+        self.path: str = os.path.join(folder, DOWNLOAD_JOURNAL_FILENAME)
+        self.resumed: int = 0
+        self._entries: dict[str, dict] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+        # Load entries from an earlier run, ignoring a line cut off by a crash
+        if os.path.isfile(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry: dict = json.loads(line)
+                        self._entries[entry['path']] = entry
+                    except (ValueError, KeyError, TypeError):
+                        continue
+
+    def get(self, download_metadata: dict) -> Optional[str]:
+        """
+        Looks up a finished file from a modpack index in the journal.
+
+        :param download_metadata: The entry for the file from the "files" list of the modpack index.
+        :type download_metadata: dict
+        :return: The path to the finished file, or None if it hasn't been finished or has changed since.
+        :rtype: Optional[str]
+        """
+
+        with self._lock:
+            entry: Optional[dict] = self._entries.get(download_metadata['path'])
+        if entry is None or entry['sha512'] != download_metadata['hashes']['sha512']:
+            return None
+        location: str = entry['location']
+        if not os.path.isfile(location) or os.path.getsize(location) != download_metadata['fileSize']:
+            return None
+        with self._lock:
+            self.resumed += 1
+        return location
+
+    def record(self, download_metadata: dict, location: str) -> None:
+        """
+        Records that a file from a modpack index has been downloaded and verified.
+
+        :param download_metadata: The entry for the file from the "files" list of the modpack index.
+        :type download_metadata: dict
+        :param location: The path to the verified file on disk.
+        :type location: str
+        :rtype: None
+        """
+
+        entry: dict = {'path': download_metadata['path'], 'sha512': download_metadata['hashes']['sha512'], 'location': os.path.abspath(location)}
+        with self._lock:
+            self._entries[entry['path']] = entry
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+class PathFilter:
+    """
+    Selects files by their path relative to the instance with glob patterns, such as "mods/*.jar" or "config/".
+    A path is selected if it matches any include pattern, or there are none, and doesn't match any exclude pattern.
+    "*" also matches "/", and a pattern ending in "/" matches everything inside that folder.
+    """
+
+    def __init__(self, include: Optional[list[str]] = None, exclude: Optional[list[str]] = None) -> None:
+        """
+        :param include: The patterns of the paths to select, or None to select every path.
+        :type include: Optional[list[str]]
+        :param exclude: The patterns of the paths to leave out, even if they match an include pattern, or None.
+        :type exclude: Optional[list[str]]
+        """
+
+        self.include: list[str] = list(include or [])
+        self.exclude: list[str] = list(exclude or [])
+
+        # Compile all patterns into one regex each, so a path is matched once instead of once per pattern
+        include_regexes: list[str] = [fnmatch.translate(pattern.lstrip('/') + ('*' if pattern.endswith('/') else '')) for pattern in self.include]
+        exclude_regexes: list[str] = [fnmatch.translate(pattern.lstrip('/') + ('*' if pattern.endswith('/') else '')) for pattern in self.exclude]
+        self._include_pattern: Optional[re.Pattern] = re.compile('|'.join(include_regexes)) if len(include_regexes) > 0 else None
+        self._exclude_pattern: Optional[re.Pattern] = re.compile('|'.join(exclude_regexes)) if len(exclude_regexes) > 0 else None
+
+    def matches(self, filename_relative_to_instance: str) -> bool:
+        """
+        Checks whether a path is selected by the filter.
+
+        :param filename_relative_to_instance: The path relative to the instance, with "/" as the separator.
+        :type filename_relative_to_instance: str
+        :rtype: bool
+        """
+
+        if self._include_pattern is not None and self._include_pattern.match(filename_relative_to_instance) is None:
+            return False
+        return self._exclude_pattern is None or self._exclude_pattern.match(filename_relative_to_instance) is None
+
+class ZipStreamWriter:
+    """
+    Writes members into a zip file on a writer thread as soon as they are ready, so downloading, compressing and writing overlap.
+    Members are compressed by the threads that add them and spilled to disk until they are written, and a ByteBudget limits how many bytes are between the start of a download and the zip file at once.
+    The zip file is written to a partial file that close() moves into place, so a failed extract never leaves a broken zip file behind.
+    """
+
+    def __init__(self, output_filename: str, spill_folder: str, budget: Optional[ByteBudget] = None, compression_level: int = DEFAULT_COMPRESSION_LEVEL, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        """
+        :param output_filename: The path to the output zip file.
+        :type output_filename: str
+        :param spill_folder: The folder to write compressed data to before it is appended to the zip file.
+        :type spill_folder: str
+        :param budget: The limit on bytes in flight, which may be shared with other writers, or None for no limit.
+        :type budget: Optional[ByteBudget]
+        :param compression_level: The zlib compression level to deflate with.
+        :type compression_level: int
+        :param buffer_size: The size of each chunk compressed or copied, in bytes.
+        :type buffer_size: int
+        """
+
+        self.output_filename: str = output_filename
+        self.partial_filename: str = output_filename + '.part'
+        self.spill_folder: str = spill_folder
+        self.budget: Optional[ByteBudget] = budget
+        self.compression_level: int = compression_level
+        self.buffer_size: int = buffer_size
+        self.members_written: int = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._aborted: bool = False
+        self._spill_count: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._source_files: list[tuple[BinaryIO, ZipFile]] = []
+        self._zf: ZipFile = ZipFile(self.partial_filename, 'w')
+        self._thread: threading.Thread = threading.Thread(target=self._write_members, name='zip_writer', daemon=True)
+        self._thread.start()
+
+    def acquire(self, size: int) -> None:
+        """
+        Waits until an item fits in the budget. Every acquired size must be passed to add_file or release.
+
+        :param size: The size of the item, in bytes.
+        :type size: int
+        :rtype: None
+        """
+
+        self._check_error()
+        if self.budget is not None:
+            self.budget.acquire(size)
+
+    def release(self, size: int) -> None:
+        """
+        Gives back an acquired size without writing anything, for an item that failed.
+
+        :param size: The size the item was acquired with, in bytes.
+        :type size: int
+        :rtype: None
+        """
+
+        if self.budget is not None:
+            self.budget.release(size)
+
+    def add_file(self, arcname: str, path: str, size: int = 0) -> None:
+        """
+        Compresses a file on the calling thread and queues it to be written.
+        The acquired size is released once the file is written, or if compressing it fails.
+
+        :param arcname: The name of the member in the zip file.
+        :type arcname: str
+        :param path: The path to the file on disk.
+        :type path: str
+        :param size: The size acquired for the file, in bytes.
+        :type size: int
+        :rtype: None
+        """
+
+        try:
+            zinfo: ZipInfo = ZipInfo.from_file(path, arcname)
+        except BaseException:
+            self.release(size)
+            raise
+        zinfo.compress_type = get_compress_type(arcname)
+        self._compress_and_queue(zinfo, lambda: open(path, 'rb'), path, size)
+
+    def add_overrides(self, filename: str, overrides: dict[str, ZipInfo], compression_workers: int = DEFAULT_COMPRESSION_WORKERS) -> None:
+        """
+        Queues overrides from an .mrpack file to be written, and waits until they are queued.
+        Overrides are copied without recompressing them, unless they are stored in the .mrpack file but should be deflated.
+        Those are deflated in a pool of worker threads, within the budget.
+        The writer thread reads copied overrides through one handle to the .mrpack file, which stays open until the zip file is closed, and each worker thread reads through its own.
+
+        :param filename: The path to the .mrpack file.
+        :type filename: str
+        :param overrides: The info of each override in the .mrpack file, keyed by path relative to the instance.
+        :type overrides: dict[str, ZipInfo]
+        :param compression_workers: The maximum number of overrides to compress at the same time.
+        :type compression_workers: int
+        :rtype: None
+        """
+
+        futures: list[Future] = []
+        open_zip_files: dict[int, ZipFile] = {}
+        source_file: Optional[BinaryIO] = None
+        source_zf: Optional[ZipFile] = None
+
+        def open_override(info: ZipInfo) -> BinaryIO:
+            zf: Optional[ZipFile] = open_zip_files.get(threading.get_ident())
+            if zf is None:
+                zf = ZipFile(filename, 'r')
+                open_zip_files[threading.get_ident()] = zf
+            return zf.open(info, 'r')
+
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max(1, compression_workers), thread_name_prefix='compress')
+        try:
+            for compressed_filename, compressed_file_info in overrides.items():
+
+                # Copy compressed overrides as they are
+                if compressed_file_info.compress_type != ZIP_STORED or compressed_file_info.is_dir() or get_compress_type(compressed_filename) == ZIP_STORED:
+                    if source_file is None:
+                        source_file = open(filename, 'rb')
+                        source_zf = ZipFile(source_file, 'r')
+                        self._source_files.append((source_file, source_zf))
+
+                    def copy_override(zf: ZipFile, info: ZipInfo = compressed_file_info, arcname: str = compressed_filename, source_file: BinaryIO = source_file, source_zf: ZipFile = source_zf) -> None:
+                        copy_zip_member_raw(source_file, info, zf, arcname, self.buffer_size, source_zf)
+                    self._check_error()
+                    self._queue.put((copy_override, 0, None))
+                    continue
+
+                # Deflate stored overrides
+                zinfo: ZipInfo = ZipInfo(compressed_filename, date_time=compressed_file_info.date_time)
+                zinfo.compress_type = ZIP_DEFLATED
+                zinfo.external_attr = compressed_file_info.external_attr
+                self.acquire(compressed_file_info.file_size)
+                futures.append(executor.submit(self._compress_and_queue, zinfo, lambda info=compressed_file_info: open_override(info), None, compressed_file_info.file_size))
+
+            for future in as_completed(futures):
+                future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for zf in open_zip_files.values():
+                zf.close()
+
+    def close(self) -> None:
+        """
+        Waits for every queued member to be written and moves the zip file into place.
+        Raises the error of the writer thread if writing failed.
+
+        :rtype: None
+        """
+
+        self._queue.put(None)
+        self._thread.join()
+        self._zf.close()
+        self._close_source_files()
+        if self._error is not None:
+            os.remove(self.partial_filename)
+            raise self._error
+        os.replace(self.partial_filename, self.output_filename)
+
+    def abort(self) -> None:
+        """
+        Stops writing and deletes the partial zip file. The files that were added are left alone.
+
+        :rtype: None
+        """
+
+        self._aborted = True
+        self._queue.put(None)
+        self._thread.join()
+        self._zf.close()
+        self._close_source_files()
+        try:
+            os.remove(self.partial_filename)
+        except OSError:
+            pass
+
+    def _check_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _close_source_files(self) -> None:
+        for source_file, source_zf in self._source_files:
+            source_zf.close()
+            source_file.close()
+        self._source_files.clear()
+
+    def _compress_and_queue(self, zinfo: ZipInfo, open_source: Callable[[], BinaryIO], source_path: Optional[str], size: int) -> None:
+        with self._lock:
+            self._spill_count += 1
+            spill_path: str = os.path.join(self.spill_folder, f'{self._spill_count}.deflated')
+        try:
+            self._check_error()
+            compressed_path: Optional[str] = compress_zip_member(open_source, zinfo, spill_path, self.compression_level, self.buffer_size)
+        except BaseException:
+            if os.path.isfile(spill_path):
+                os.remove(spill_path)
+            self.release(size)
+            raise
+
+        # Stored members are read from the source file
+        data_path: str = compressed_path if compressed_path is not None else source_path
+
+        def write_member(zf: ZipFile) -> None:
+            with open(data_path, 'rb') as raw_stream:
+                write_raw_zip_member(zf, zinfo, raw_stream, self.buffer_size)
+
+        self._queue.put((write_member, size, compressed_path))
+
+    def _write_members(self) -> None:
+        while True:
+            item: Optional[tuple[Callable[[ZipFile], None], int, Optional[str]]] = self._queue.get()
+            if item is None:
+                return
+            write_member, size, spill_path = item
+            try:
+                if self._error is None and not self._aborted:
+                    write_member(self._zf)
+                    self.members_written += 1
+            except BaseException as error:
+                self._error = error
+            finally:
+                if spill_path is not None:
+                    try:
+                        os.remove(spill_path)
+                    except OSError:
+                        pass
+                self.release(size)
+
+class ModpackCatalog:
+    """
+    A persistent SQLite index of the .mrpack files in a folder, so they can be listed, filtered and sorted without opening every file.
+    A file is only read again when its modification time or size changes.
+    """
+
+    def __init__(self, directory: str, database_path: Optional[str] = None) -> None:
+        """
+        :param directory: The folder containing the .mrpack files.
+        :type directory: str
+        :param database_path: The path to the SQLite database, or None to store it in the folder as CATALOG_FILENAME.
+        :type database_path: Optional[str]
+        """
+
+        self.directory: str = directory
+        self.database_path: str = os.path.join(directory, CATALOG_FILENAME) if database_path is None else database_path
+        self._lock: threading.Lock = threading.Lock()
+        self._connection: sqlite3.Connection = sqlite3.connect(self.database_path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute('PRAGMA foreign_keys = ON')
+
+        # Create tables, starting over if they are from an older version
+        with self._connection:
+            if self._connection.execute('PRAGMA user_version').fetchone()[0] != CATALOG_SCHEMA_VERSION:
+                self._connection.execute('DROP TABLE IF EXISTS dependencies')
+                self._connection.execute('DROP TABLE IF EXISTS modpacks')
+                self._connection.execute(f'PRAGMA user_version = {CATALOG_SCHEMA_VERSION}')
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS modpacks (
+                    filename TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    valid INTEGER NOT NULL,
+                    name TEXT,
+                    version_id TEXT,
+                    summary TEXT,
+                    dependencies TEXT,
+                    file_count INTEGER,
+                    download_size INTEGER
+                )
+            ''')
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS dependencies (
+                    filename TEXT NOT NULL REFERENCES modpacks(filename) ON DELETE CASCADE,
+                    dependency TEXT NOT NULL,
+                    version TEXT NOT NULL
+                )
+            ''')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS dependencies_by_dependency ON dependencies (dependency, version)')
+
+    def refresh(self) -> None:
+        """
+        Indexes new and changed .mrpack files in the folder, and removes deleted ones.
+
+        :rtype: None
+        """
+
+        with self._lock, self._connection:
+            known: dict[str, tuple[int, int]] = {row['filename']: (row['mtime_ns'], row['size']) for row in self._connection.execute('SELECT filename, mtime_ns, size FROM modpacks')}
+            found: set[str] = set()
+            if os.path.isdir(self.directory):
+                for entry in os.scandir(self.directory):
+                    if not entry.name.lower().endswith('.mrpack') or not entry.is_file():
+                        continue
+                    found.add(entry.name)
+                    stat: os.stat_result = entry.stat()
+                    if known.get(entry.name) != (stat.st_mtime_ns, stat.st_size):
+                        self._index(entry.name, stat)
+            for filename in known.keys() - found:
+                self._connection.execute('DELETE FROM modpacks WHERE filename = ?', (filename,))
+
+    def list(self, search: Optional[str] = None, dependency: Optional[str] = None, dependency_version: Optional[str] = None, sort_by: str = 'name', descending: bool = False, include_invalid: bool = False) -> list[dict]:
+        """
+        Lists the .mrpack files in the folder, refreshing the catalog first.
+
+        :param search: Text the modpack name or filename must contain, ignoring case, or None.
+        :type search: Optional[str]
+        :param dependency: The ID of a dependency the modpack must have, such as "fabric-loader", or None.
+        :type dependency: Optional[str]
+        :param dependency_version: The exact version of the dependency the modpack must have, or None for any version.
+        :type dependency_version: Optional[str]
+        :param sort_by: The field to sort by, from CATALOG_SORT_KEYS.
+        :type sort_by: str
+        :param descending: Whether to sort in descending order.
+        :type descending: bool
+        :param include_invalid: Whether to include files that couldn't be read as modpacks.
+        :type include_invalid: bool
+        :return: An entry for each matching file.
+        :rtype: list[dict]
+        """
+
+        if sort_by not in CATALOG_SORT_KEYS:
+            raise ValueError(f'Invalid catalog sort key "{sort_by}"!')
+        self.refresh()
+
+        # Build query
+        conditions: list[str] = []
+        parameters: list = []
+        if not include_invalid:
+            conditions.append('valid = 1')
+        if search is not None:
+            conditions.append('(name LIKE ? OR filename LIKE ?)')
+            parameters += [f'%{search}%', f'%{search}%']
+        if dependency is not None:
+            if dependency_version is None:
+                conditions.append('EXISTS (SELECT 1 FROM dependencies WHERE dependencies.filename = modpacks.filename AND dependency = ?)')
+                parameters.append(dependency)
+            else:
+                conditions.append('EXISTS (SELECT 1 FROM dependencies WHERE dependencies.filename = modpacks.filename AND dependency = ? AND version = ?)')
+                parameters += [dependency, dependency_version]
+        where: str = f'WHERE {" AND ".join(conditions)}' if len(conditions) > 0 else ''
+        order: str = 'DESC' if descending else 'ASC'
+
+        with self._lock:
+            rows: list[sqlite3.Row] = self._connection.execute(f'SELECT * FROM modpacks {where} ORDER BY {sort_by} COLLATE NOCASE {order}, filename', parameters).fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    def get(self, filename: str) -> Optional[dict]:
+        """
+        Gets the entry for one .mrpack file in the folder, indexing it first if it is new or has changed.
+
+        :param filename: The path to the .mrpack file, or its name in the folder.
+        :type filename: str
+        :return: The entry for the file, or None if it doesn't exist.
+        :rtype: Optional[dict]
+        """
+
+        name: str = os.path.basename(filename)
+        path: str = os.path.join(self.directory, name)
+        if not os.path.isfile(path):
+            return None
+        stat: os.stat_result = os.stat(path)
+        with self._lock, self._connection:
+            row: Optional[sqlite3.Row] = self._connection.execute('SELECT * FROM modpacks WHERE filename = ?', (name,)).fetchone()
+            if row is None or (row['mtime_ns'], row['size']) != (stat.st_mtime_ns, stat.st_size):
+                self._index(name, stat)
+                row = self._connection.execute('SELECT * FROM modpacks WHERE filename = ?', (name,)).fetchone()
+        return self._to_entry(row)
+
+    def close(self) -> None:
+        """
+        Closes the database.
+
+        :rtype: None
+        """
+
+        with self._lock:
+            self._connection.close()
+
+    def _index(self, filename: str, stat: os.stat_result) -> None:
+        self._connection.execute('DELETE FROM modpacks WHERE filename = ?', (filename,))
+
+        # Read index file
+        try:
+            with ZipFile(os.path.join(self.directory, filename), 'r') as zf:
+                data: dict = json.loads(zf.read('modrinth.index.json').decode())
+            dependencies: dict[str, str] = dict(data['dependencies'])
+            values: tuple = (data['name'], data['versionId'], data.get('summary'), json.dumps(dependencies), len(data['files']), sum(download_metadata['fileSize'] for download_metadata in data['files']))
+        except (OSError, BadZipFile, KeyError, TypeError, ValueError):
+            self._connection.execute('INSERT INTO modpacks (filename, mtime_ns, size, valid) VALUES (?, ?, ?, 0)', (filename, stat.st_mtime_ns, stat.st_size))
+            return
+
+        # Save entry
+        self._connection.execute('INSERT INTO modpacks VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?)', (filename, stat.st_mtime_ns, stat.st_size) + values)
+        self._connection.executemany('INSERT INTO dependencies VALUES (?, ?, ?)', [(filename, dependency, str(dependency_version)) for dependency, dependency_version in dependencies.items()])
+
+    def _to_entry(self, row: sqlite3.Row) -> dict:
+        return {
+            'filename': row['filename'],
+            'path': os.path.join(self.directory, row['filename']),
+            'valid': bool(row['valid']),
+            'name': row['name'],
+            'version_id': row['version_id'],
+            'summary': row['summary'],
+            'dependencies': json.loads(row['dependencies']) if row['dependencies'] is not None else {},
+            'file_count': row['file_count'],
+            'download_size': row['download_size'],
+            'mtime_ns': row['mtime_ns']
+        }
+
+class SummaryReporter:
+    """
+    Collects the progress events of extracts, installs and upgrades, and summarizes where the time went.
+    Pass its on_event method as the on_event argument. It can be called from multiple threads at the same time.
+
+    Every event is a dict with a "type" and a "time" from time.time(). The types are:
+    "phase_start" and "phase_end" with "phase", and "duration" in seconds for the end;
+    "file_progress" with "path", "bytes_done" and "size";
+    "file_done" with "path", "size", "source" ("download", "cache" or "journal"), "duration" in seconds and "rate" in bytes per second;
+    "cache_hit" and "cache_miss" with "path" and "sha512";
+    "retry" with "path", "url", "attempt", "delay" and "error";
+    "url_failed" with "path", "url" and "error";
+    "hedge" with "path", "url" and "delay" when a slow download is also sent to the next URL;
+    "extract_stats" with "files", "bytes", "seconds" and "throughput" in MiB/s after files are extracted into an installation;
+    and "error" with "error" when the whole operation fails. Upgrades add "phase", the step that failed, and "removed", the number of files removed before it.
+    """
+
+    def __init__(self, keep_progress_events: bool = False) -> None:
+        """
+        :param keep_progress_events: Whether to keep "file_progress" events in the event list, which there is one of per chunk downloaded.
+        :type keep_progress_events: bool
+        """
+
+        self.keep_progress_events: bool = keep_progress_events
+        self.events: list[dict] = []
+        self.phase_durations: dict[str, float] = {}
+        self.file_counts: dict[str, int] = {}
+        self.byte_counts: dict[str, int] = {}
+        self.download_time: float = 0
+        self.retries: int = 0
+        self.failed_urls: int = 0
+        self.hedges: int = 0
+        self.errors: int = 0
+        self.slowest_files: list[dict] = []
+        self._lock: threading.Lock = threading.Lock()
+
+    def on_event(self, event: dict) -> None:
+        """
+        Adds an event to the summary.
+
+        :param event: The event.
+        :type event: dict
+        :rtype: None
+        """
+
+        with self._lock:
+            if event['type'] != 'file_progress' or self.keep_progress_events:
+                self.events.append(event)
+
+            if event['type'] == 'phase_end':
+                self.phase_durations[event['phase']] = self.phase_durations.get(event['phase'], 0) + event['duration']
+            elif event['type'] == 'file_done':
+                self.file_counts[event['source']] = self.file_counts.get(event['source'], 0) + 1
+                self.byte_counts[event['source']] = self.byte_counts.get(event['source'], 0) + event['size']
+                if event['source'] == 'download':
+                    self.download_time += event['duration']
+                    self.slowest_files.append(event)
+                    self.slowest_files.sort(key=lambda file_event: file_event['duration'], reverse=True)
+                    del self.slowest_files[5:]
+            elif event['type'] == 'retry':
+                self.retries += 1
+            elif event['type'] == 'url_failed':
+                self.failed_urls += 1
+            elif event['type'] == 'hedge':
+                self.hedges += 1
+            elif event['type'] == 'error':
+                self.errors += 1
+
+    def get_summary(self) -> dict:
+        """
+        Gets the totals of the events so far.
+
+        :rtype: dict
+        """
+
+        with self._lock:
+            downloaded_bytes: int = self.byte_counts.get('download', 0)
+            return {
+                'phase_durations': dict(self.phase_durations),
+                'file_counts': dict(self.file_counts),
+                'byte_counts': dict(self.byte_counts),
+                'download_rate': downloaded_bytes / self.download_time if self.download_time > 0 else 0,
+                'retries': self.retries,
+                'failed_urls': self.failed_urls,
+                'hedges': self.hedges,
+                'errors': self.errors,
+                'slowest_files': [{'path': event['path'], 'size': event['size'], 'duration': event['duration']} for event in self.slowest_files]
+            }
+
+    def print_summary(self) -> None:
+        """
+        Prints the summary.
+
+        :rtype: None
+        """
+
+        summary: dict = self.get_summary()
+        print('Time per phase:')
+        for phase, duration in summary['phase_durations'].items():
+            print(f'    {phase:<20} {duration:.2f}s')
+        print('Files:')
+        for source, file_count in summary['file_counts'].items():
+            print(f'    {source:<20} {file_count} files, {summary["byte_counts"][source] / (1024 * 1024):.2f} MiB')
+        print(f'Average download rate per file: {summary["download_rate"] / (1024 * 1024):.2f} MiB/s')
+        print(f'Retries: {summary["retries"]}, failed URLs: {summary["failed_urls"]}, hedged requests: {summary["hedges"]}')
+        if len(summary['slowest_files']) > 0:
+            print('Slowest downloads:')
+            for file_summary in summary['slowest_files']:
+                print(f'    {file_summary["duration"]:.2f}s {file_summary["path"]} ({file_summary["size"] / (1024 * 1024):.2f} MiB)')
+
+    def write_json(self, path: str) -> None:
+        """
+        Writes the summary and the events to a JSON file.
+
+        :param path: The path to the JSON file.
+        :type path: str
+        :rtype: None
+        """
+
+        summary: dict = self.get_summary()
+        with self._lock:
+            events: list[dict] = list(self.events)
+        with open(path, 'w') as f:
+            f.write(json.dumps({'summary': summary, 'events': events}, indent=4))
+
+def emit_event(on_event: Optional[Callable[[dict], None]], event_type: str, **fields) -> None:
+    """
+    Sends a progress event to a callback, if there is one.
+
+    :param on_event: The callback, or None.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param event_type: The type of the event.
+    :type event_type: str
+    :rtype: None
+    """
+
+    if on_event is not None:
+        on_event({'type': event_type, 'time': time.time(), **fields})
+
+def start_phase(on_event: Optional[Callable[[dict], None]], phase: str) -> float:
+    """
+    Sends a "phase_start" event.
+
+    :param on_event: The callback, or None.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param phase: The name of the phase.
+    :type phase: str
+    :return: The start time of the phase, to pass to end_phase.
+    :rtype: float
+    """
+
+    emit_event(on_event, 'phase_start', phase=phase)
+    return time.perf_counter()
+
+def end_phase(on_event: Optional[Callable[[dict], None]], phase: str, start_time: float) -> None:
+    """
+    Sends a "phase_end" event.
+
+    :param on_event: The callback, or None.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param phase: The name of the phase.
+    :type phase: str
+    :param start_time: The start time returned by start_phase.
+    :type start_time: float
+    :rtype: None
+    """
+
+    emit_event(on_event, 'phase_end', phase=phase, duration=time.perf_counter() - start_time)
+
+def escape_filename(filename: str, strict: bool = False) -> str:
+    escaped_filename: str = ''
+
+    for character in filename:
+        if character in FILENAME_UNSAFE_CHARACTERS:
+            escaped_filename += '_'
+        elif ord(character) < 32:
+            escaped_filename += '_'
+        elif strict:
+            if character in STRICT_FILENAME_ALLOWED_CHARACTERS:
+                escaped_filename += character.lower()
+            else:
+                escaped_filename += '_'
+        else:
+            escaped_filename += character
+
+    return escaped_filename
+
+def hash_file(path: str, buffer_size: int = DEFAULT_BUFFER_SIZE) -> tuple[str, str]:
+    """
+    Calculates the SHA1 and SHA512 hashes of a file in a single pass.
+
+    :param path: The path to the file.
+    :type path: str
+    :param buffer_size: The size of each chunk read from the file, in bytes.
+    :type buffer_size: int
+    :return: The SHA1 and SHA512 hashes as hex strings.
+    :rtype: tuple[str, str]
+    """
+
+    sha1: hashlib.sha1 = hashlib.sha1()
+    sha512: hashlib.sha512 = hashlib.sha512()
+    with open(path, 'rb') as f:
+        while chunk := f.read(buffer_size):
+            sha1.update(chunk)
+            sha512.update(chunk)
+    return sha1.hexdigest(), sha512.hexdigest()
+
+def can_write_raw_zip_member(zf: ZipFile) -> bool:
+    """
+    Checks whether a zip file has the private state of ZipFile that write_raw_zip_member relies on.
+    That state isn't part of the public zipfile API, so it may change between Python versions.
+
+    :param zf: The zip file to write to.
+    :type zf: ZipFile
+    :rtype: bool
+    """
+
+    return all(hasattr(zf, name) for name in ZIP_RAW_WRITE_ATTRIBUTES) and hasattr(ZipInfo, 'FileHeader')
+
+def write_raw_zip_member(zf: ZipFile, zinfo: ZipInfo, raw_stream: BinaryIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+    """
+    Writes a member to a zip file from data that is already compressed, without recompressing it.
+    The CRC, compressed size, uncompressed size and compression type must already be set on zinfo.
+    This writes the local header and registers the member through the private state of ZipFile (its lock, file object and member lists), which the public API has no way to do.
+    If can_write_raw_zip_member finds that state missing, stored and deflated data is decompressed and written through ZipFile.open instead.
+
+    :param zf: The zip file to write to. Must be open for writing.
+    :type zf: ZipFile
+    :param zinfo: The info of the member to write.
+    :type zinfo: ZipInfo
+    :param raw_stream: A stream positioned at the start of the compressed data. Exactly zinfo.compress_size bytes are read from it.
+    :type raw_stream: BinaryIO
+    :param buffer_size: The size of each chunk copied, in bytes.
+    :type buffer_size: int
+    :rtype: None
+    """
+
+    # Fall back to the public API if the private state of ZipFile has changed
+    if not can_write_raw_zip_member(zf):
+        write_zip_member_streamed(zf, zinfo, raw_stream, buffer_size)
+        return
+
+    zip64: bool = zinfo.file_size > ZIP64_LIMIT or zinfo.compress_size > ZIP64_LIMIT
+    zinfo.flag_bits &= ~ZIP_FLAG_DATA_DESCRIPTOR
+
+    with zf._lock:
+        if zf._writing:
+            raise ValueError('Can\'t write to a zip file while another member is being written!')
+        zinfo.header_offset = zf.fp.tell()
+        zf._writecheck(zinfo)
+        zf._didModify = True
+
+        # Write header and data
+        zf.fp.write(zinfo.FileHeader(zip64))
+        remaining_size: int = zinfo.compress_size
+        while remaining_size > 0:
+            chunk: bytes = raw_stream.read(min(buffer_size, remaining_size))
+            if len(chunk) == 0:
+                raise EOFError('Unexpected end of compressed data!')
+            zf.fp.write(chunk)
+            remaining_size -= len(chunk)
+
+        # Register member
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[zinfo.filename] = zinfo
+        zf.start_dir = zf.fp.tell()
+
+def write_zip_member_streamed(zf: ZipFile, zinfo: ZipInfo, raw_stream: BinaryIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+    """
+    Writes a member to a zip file from data that is already compressed, by decompressing it and compressing it again through ZipFile.open.
+    Used by write_raw_zip_member when the private state of ZipFile it needs is missing.
+
+    :param zf: The zip file to write to. Must be open for writing.
+    :type zf: ZipFile
+    :param zinfo: The info of the member to write. Its compression type must be ZIP_STORED or ZIP_DEFLATED.
+    :type zinfo: ZipInfo
+    :param raw_stream: A stream positioned at the start of the compressed data. Exactly zinfo.compress_size bytes are read from it.
+    :type raw_stream: BinaryIO
+    :param buffer_size: The size of each chunk copied, in bytes.
+    :type buffer_size: int
+    :rtype: None
+    """
+
+    if zinfo.compress_type not in (ZIP_STORED, ZIP_DEFLATED):
+        raise ValueError(f'Invalid compression type "{zinfo.compress_type}"!')
+
+    # ZipFile.open resets the sizes of zinfo, so read them first
+    decompressor: Optional[zlib.decompressobj] = zlib.decompressobj(-zlib.MAX_WBITS) if zinfo.compress_type == ZIP_DEFLATED else None
+    remaining_size: int = zinfo.compress_size
+    with zf.open(zinfo, 'w', force_zip64=zinfo.file_size > ZIP64_LIMIT) as destination_stream:
+        while remaining_size > 0:
+            chunk: bytes = raw_stream.read(min(buffer_size, remaining_size))
+            if len(chunk) == 0:
+                raise EOFError('Unexpected end of compressed data!')
+            remaining_size -= len(chunk)
+            destination_stream.write(decompressor.decompress(chunk) if decompressor is not None else chunk)
+        if decompressor is not None:
+            destination_stream.write(decompressor.flush())
+
+def copy_zip_member_raw(source_file: BinaryIO, source_info: ZipInfo, zf: ZipFile, arcname: str, buffer_size: int = DEFAULT_BUFFER_SIZE, source_zf: Optional[ZipFile] = None) -> None:
+    """
+    Copies a member from one zip file into another as a raw compressed stream, without decompressing it.
+    Encrypted members, and every member if write_raw_zip_member can't be used on the destination, are decompressed and recompressed instead.
+
+    :param source_file: The source zip file, opened in binary mode.
+    :type source_file: BinaryIO
+    :param source_info: The info of the member in the source zip file.
+    :type source_info: ZipInfo
+    :param zf: The zip file to copy the member into. Must be open for writing.
+    :type zf: ZipFile
+    :param arcname: The name of the member in the destination zip file.
+    :type arcname: str
+    :param buffer_size: The size of each chunk copied, in bytes.
+    :type buffer_size: int
+    :param source_zf: The source zip file opened on source_file, to decompress members with, or None to open it again for each member.
+    :type source_zf: Optional[ZipFile]
+    :rtype: None
+    """
+
+    zinfo: ZipInfo = ZipInfo(arcname, date_time=source_info.date_time)
+    zinfo.compress_type = source_info.compress_type
+    zinfo.external_attr = source_info.external_attr
+
+    # Encrypted members can't be copied raw
+    if source_info.flag_bits & ZIP_FLAG_ENCRYPTED or not can_write_raw_zip_member(zf):
+        opened_zf: Optional[ZipFile] = ZipFile(source_file, 'r') if source_zf is None else None
+        try:
+            with (source_zf or opened_zf).open(source_info, 'r') as source_stream, zf.open(zinfo, 'w', force_zip64=source_info.file_size > ZIP64_LIMIT) as destination_stream:
+                shutil.copyfileobj(source_stream, destination_stream, buffer_size)
+        finally:
+            if opened_zf is not None:
+                opened_zf.close()
+        return
+
+    # Find the start of the compressed data
+    source_file.seek(source_info.header_offset)
+    header: bytes = source_file.read(struct.calcsize(ZIP_LOCAL_FILE_HEADER_STRUCT))
+    header_fields: tuple = struct.unpack(ZIP_LOCAL_FILE_HEADER_STRUCT, header)
+    if header_fields[0] != ZIP_LOCAL_FILE_HEADER_SIGNATURE:
+        raise ModpackExtractorError(f'Invalid modpack file: Bad header for "{source_info.filename}"!')
+    source_file.seek(header_fields[10] + header_fields[11], os.SEEK_CUR)
+
+    # Copy the compressed data
+    zinfo.flag_bits = source_info.flag_bits
+    zinfo.CRC = source_info.CRC
+    zinfo.compress_size = source_info.compress_size
+    zinfo.file_size = source_info.file_size
+    write_raw_zip_member(zf, zinfo, source_file, buffer_size)
+
+def duplicate_file_extents(source_path: str, destination_path: str) -> bool:
+    """
+    Creates a block clone of a file on Windows with FSCTL_DUPLICATE_EXTENTS_TO_FILE. Used by reflink_file.
+    Only some volumes support it, such as ReFS volumes and Dev Drives. NTFS doesn't.
+
+    :param source_path: The path to the file to clone.
+    :type source_path: str
+    :param destination_path: The path to create the clone at.
+    :type destination_path: str
+    :return: Whether the clone was created.
+    :rtype: bool
+    """
+
+    import ctypes
+    import msvcrt
+    from ctypes import wintypes
+
+    class DuplicateExtentsData(ctypes.Structure):
+        _fields_ = [('FileHandle', wintypes.HANDLE), ('SourceFileOffset', ctypes.c_longlong), ('TargetFileOffset', ctypes.c_longlong), ('ByteCount', ctypes.c_longlong)]
+
+    kernel32: ctypes.WinDLL = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.DeviceIoControl.argtypes = (wintypes.HANDLE, wintypes.DWORD, wintypes.LPVOID, wintypes.DWORD, wintypes.LPVOID, wintypes.DWORD, ctypes.POINTER(wintypes.DWORD), wintypes.LPVOID)
+    kernel32.DeviceIoControl.restype = wintypes.BOOL
+
+    # Get the cluster size, since clones must cover whole clusters
+    volume_path: ctypes.Array = ctypes.create_unicode_buffer(wintypes.MAX_PATH + 1)
+    sectors_per_cluster: wintypes.DWORD = wintypes.DWORD()
+    bytes_per_sector: wintypes.DWORD = wintypes.DWORD()
+    free_clusters: wintypes.DWORD = wintypes.DWORD()
+    total_clusters: wintypes.DWORD = wintypes.DWORD()
+    if not kernel32.GetVolumePathNameW(os.path.abspath(destination_path), volume_path, len(volume_path)):
+        return False
+    if not kernel32.GetDiskFreeSpaceW(volume_path, ctypes.byref(sectors_per_cluster), ctypes.byref(bytes_per_sector), ctypes.byref(free_clusters), ctypes.byref(total_clusters)):
+        return False
+    cluster_size: int = sectors_per_cluster.value * bytes_per_sector.value
+
+    # Clone in chunks, rounding the last one up to a whole cluster
+    file_size: int = os.path.getsize(source_path)
+    clone_size: int = -(-file_size // cluster_size) * cluster_size
+    with open(source_path, 'rb') as source_file, open(destination_path, 'wb') as destination_file:
+        destination_file.truncate(file_size)
+        offset: int = 0
+        while offset < clone_size:
+            data: DuplicateExtentsData = DuplicateExtentsData(msvcrt.get_osfhandle(source_file.fileno()), offset, offset, min(DUPLICATE_EXTENTS_CHUNK_SIZE, clone_size - offset))
+            bytes_returned: wintypes.DWORD = wintypes.DWORD()
+            if not kernel32.DeviceIoControl(msvcrt.get_osfhandle(destination_file.fileno()), FSCTL_DUPLICATE_EXTENTS_TO_FILE, ctypes.byref(data), ctypes.sizeof(data), None, 0, ctypes.byref(bytes_returned), None):
+                return False
+            offset += data.ByteCount
+    return True
+
+def reflink_file(source_path: str, destination_path: str) -> bool:
+    """
+    Creates a copy-on-write clone of a file, if the filesystem supports it.
+    Uses FICLONE where it exists, such as on Btrfs and XFS, and duplicate_file_extents on Windows.
+
+    :param source_path: The path to the file to clone.
+    :type source_path: str
+    :param destination_path: The path to create the clone at.
+    :type destination_path: str
+    :return: Whether the clone was created.
+    :rtype: bool
+    """
+
+    if os.name == 'nt':
+        return duplicate_file_extents(source_path, destination_path)
+
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    with open(source_path, 'rb') as source_file, open(destination_path, 'wb') as destination_file:
+        try:
+            fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+        except OSError:
+            return False
+    return True
+
+def clone_file(source_path: str, destination_path: str, link_mode: str = DEFAULT_LINK_MODE) -> str:
+    """
+    Places a file at a new path by hardlinking, reflinking or copying it, replacing any existing file.
+    The existing file is replaced rather than written to, so other hardlinks to it are never modified.
+    If the link mode isn't supported on the filesystem, the file is copied instead. Reflinks and copies keep the modification time of the source file.
+
+    :param source_path: The path to the file.
+    :type source_path: str
+    :param destination_path: The path to place the file at.
+    :type destination_path: str
+    :param link_mode: "hardlink", "reflink" or "copy".
+    :type link_mode: str
+    :return: The link mode that was actually used.
+    :rtype: str
+    """
+
+    if link_mode not in LINK_MODES:
+        raise ValueError(f'Invalid link mode "{link_mode}"!')
+
+    temporary_path: str = f'{destination_path}.{threading.get_ident()}.tmp'
+    used_link_mode: str = 'copy'
+    try:
+        if link_mode == 'hardlink':
+            try:
+                os.link(source_path, temporary_path)
+                used_link_mode = 'hardlink'
+            except OSError:
+                pass
+        elif link_mode == 'reflink':
+            if reflink_file(source_path, temporary_path):
+                used_link_mode = 'reflink'
+        if used_link_mode == 'copy':
+            shutil.copyfile(source_path, temporary_path)
+
+        # Keep the modification time of reflinks and copies, so files placed from the same source can be recognized
+        if used_link_mode != 'hardlink':
+            source_stat: os.stat_result = os.stat(source_path)
+            os.utime(temporary_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        os.replace(temporary_path, destination_path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    return used_link_mode
+
+def break_hardlink(path: str) -> None:
+    """
+    Gives a hardlinked file its own copy of its contents, so changes to it no longer affect the other links.
+
+    :param path: The path to the file.
+    :type path: str
+    :rtype: None
+    """
+
+    clone_file(path, path, 'copy')
+
+def get_compress_type(filename: str) -> int:
+    """
+    Gets the compression method to use for a file in an output zip file.
+    Files that are already compressed, such as jars and images, are stored, and everything else is deflated.
+
+    :param filename: The name of the file.
+    :type filename: str
+    :return: ZIP_STORED or ZIP_DEFLATED.
+    :rtype: int
+    """
+
+    if filename.lower().endswith(STORED_FILE_EXTENSIONS):
+        return ZIP_STORED
+    return ZIP_DEFLATED
+
+def compress_zip_member(open_source: Callable[[], BinaryIO], zinfo: ZipInfo, spill_path: str, compression_level: int = DEFAULT_COMPRESSION_LEVEL, buffer_size: int = DEFAULT_BUFFER_SIZE) -> Optional[str]:
+    """
+    Compresses the data of a zip member ahead of time so it can be written with write_raw_zip_member.
+    Sets the CRC and compressed size of zinfo. Stored members are only read to calculate their CRC.
+
+    :param open_source: A function that opens the uncompressed data as a binary stream.
+    :type open_source: Callable[[], BinaryIO]
+    :param zinfo: The info of the member. Its compression type must be ZIP_STORED or ZIP_DEFLATED.
+    :type zinfo: ZipInfo
+    :param spill_path: The path to write the compressed data to, if it is deflated.
+    :type spill_path: str
+    :param compression_level: The zlib compression level to deflate with.
+    :type compression_level: int
+    :param buffer_size: The size of each chunk compressed, in bytes.
+    :type buffer_size: int
+    :return: The path to the compressed data, or None if the member is stored and its data should be read from the source.
+    :rtype: Optional[str]
+    """
+
+    crc: int = 0
+    file_size: int = 0
+
+    # Stored members only need a CRC
+    if zinfo.compress_type == ZIP_STORED:
+        with open_source() as source_stream:
+            while chunk := source_stream.read(buffer_size):
+                crc = zlib.crc32(chunk, crc)
+                file_size += len(chunk)
+        zinfo.CRC = crc
+        zinfo.file_size = file_size
+        zinfo.compress_size = file_size
+        return None
+
+    # Deflate into the spill file
+    compressor: zlib.compressobj = zlib.compressobj(compression_level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    with open_source() as source_stream, open(spill_path, 'wb') as f:
+        while chunk := source_stream.read(buffer_size):
+            crc = zlib.crc32(chunk, crc)
+            file_size += len(chunk)
+            f.write(compressor.compress(chunk))
+        f.write(compressor.flush())
+        compress_size: int = f.tell()
+    zinfo.CRC = crc
+    zinfo.file_size = file_size
+    zinfo.compress_size = compress_size
+    return spill_path
+
+def write_output_zip(output_filename: str, downloaded_files: dict[str, str], filename: str, overrides: dict[str, ZipInfo], spill_folder: str, compression_level: int = DEFAULT_COMPRESSION_LEVEL, compression_workers: int = DEFAULT_COMPRESSION_WORKERS, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+    """
+    Writes downloaded files and overrides into an output zip file with a ZipStreamWriter.
+    Members are compressed according to get_compress_type in a pool of worker threads and appended to the zip file as they finish, followed by the overrides.
+    Overrides are copied without recompressing them, unless they are stored in the .mrpack file but should be deflated.
+
+    :param output_filename: The path to the output zip file.
+    :type output_filename: str
+    :param downloaded_files: The path to each downloaded file on disk, keyed by path relative to the instance.
+    :type downloaded_files: dict[str, str]
+    :param filename: The path to the .mrpack file.
+    :type filename: str
+    :param overrides: The info of each override in the .mrpack file, keyed by path relative to the instance.
+    :type overrides: dict[str, ZipInfo]
+    :param spill_folder: The folder to write compressed data to before it is appended to the zip file.
+    :type spill_folder: str
+    :param compression_level: The zlib compression level to deflate with.
+    :type compression_level: int
+    :param compression_workers: The maximum number of members to compress at the same time.
+    :type compression_workers: int
+    :param buffer_size: The size of each chunk compressed or copied, in bytes.
+    :type buffer_size: int
+    :rtype: None
+    """
+
+    writer: ZipStreamWriter = ZipStreamWriter(output_filename, spill_folder, compression_level=compression_level, buffer_size=buffer_size)
+    executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max(1, compression_workers), thread_name_prefix='compress')
+    try:
+
+        # Write downloaded files
+        futures: list[Future] = [executor.submit(writer.add_file, compressed_filename, downloaded_filename) for compressed_filename, downloaded_filename in downloaded_files.items()]
+        for future in as_completed(futures):
+            future.result()
+
+        # Write overrides
+        writer.add_overrides(filename, overrides, compression_workers)
+        writer.close()
+
+    except BaseException:
+        executor.shutdown(wait=True, cancel_futures=True)
+        writer.abort()
+        raise
+    executor.shutdown(wait=True)
+
+def preallocate_file(f: BinaryIO, size: int) -> None:
+    """
+    Reserves disk space for a file before it is written, so large files are less fragmented and running out of space is noticed early.
+    Files smaller than PREALLOCATE_MIN_SIZE aren't preallocated, since the extra system call costs more than it saves.
+
+    :param f: The file, opened for writing.
+    :type f: BinaryIO
+    :param size: The final size of the file, in bytes.
+    :type size: int
+    :rtype: None
+    """
+
+    if size < PREALLOCATE_MIN_SIZE:
+        return
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+            return
+        except OSError:
+            pass
+    f.truncate(size)
+
+def extract_zip_member(zip_filename: str, zinfo: ZipInfo, destination_path: str, replace_existing: bool, buffer_size: int, open_zip_files: dict[int, ZipFile]) -> int:
+    """
+    Extracts one member of a zip file to a path. Used by extract_zip_members on its worker threads.
+
+    :param zip_filename: The path to the zip file.
+    :type zip_filename: str
+    :param zinfo: The info of the member.
+    :type zinfo: ZipInfo
+    :param destination_path: The path to write the member to. Its folder must already exist.
+    :type destination_path: str
+    :param replace_existing: Whether to write to a new file that replaces any existing file, so hardlinks to the existing file aren't modified.
+    :type replace_existing: bool
+    :param buffer_size: The size of each chunk copied, in bytes.
+    :type buffer_size: int
+    :param open_zip_files: The zip file opened by each worker thread, keyed by thread ID, so members are read without sharing a file handle.
+    :type open_zip_files: dict[int, ZipFile]
+    :return: The number of bytes written.
+    :rtype: int
+    """
+
+    # Open zip file once per thread
+    zf: Optional[ZipFile] = open_zip_files.get(threading.get_ident())
+    if zf is None:
+        zf = ZipFile(zip_filename, 'r')
+        open_zip_files[threading.get_ident()] = zf
+
+    # Write member
+    output_path: str = destination_path + '.tmp' if replace_existing else destination_path
+    written: int = 0
+    try:
+        with zf.open(zinfo, 'r') as source_stream, open(output_path, 'wb') as f:
+            preallocate_file(f, zinfo.file_size)
+            while True:
+                chunk: bytes = source_stream.read(buffer_size)
+                if not chunk:
+                    break
+                f.write(chunk)
+                written += len(chunk)
+            if written != zinfo.file_size:
+                f.truncate(written)
+    except BaseException:
+        if os.path.isfile(output_path):
+            os.remove(output_path)
+        raise
+    if replace_existing:
+        os.replace(output_path, destination_path)
+    return written
+
+def extract_zip_members(zip_filename: str, members: dict[str, ZipInfo], destination_folder: str, replace_existing: bool = False, extract_workers: int = DEFAULT_EXTRACT_WORKERS, buffer_size: int = DEFAULT_BUFFER_SIZE, print_logs: bool = True) -> dict[str, float]:
+    """
+    Extracts members of a zip file into a folder in a pool of worker threads, starting with the largest members so a few large files don't finish last.
+    Members smaller than PREALLOCATE_MIN_SIZE are extracted in zip order after the large ones.
+    Every path is checked with get_safe_path before anything is written, and each file's disk space is reserved with preallocate_file.
+
+    :param zip_filename: The path to the zip file.
+    :type zip_filename: str
+    :param members: The info of each member to extract, keyed by path relative to destination_folder.
+    :type members: dict[str, ZipInfo]
+    :param destination_folder: The folder to extract into.
+    :type destination_folder: str
+    :param replace_existing: Whether to write each file to a new file that replaces any existing file, so hardlinks to existing files aren't modified.
+    :type replace_existing: bool
+    :param extract_workers: The maximum number of members to extract at the same time.
+    :type extract_workers: int
+    :param buffer_size: The size of each chunk copied, in bytes.
+    :type buffer_size: int
+    :param print_logs: Whether to print the extraction throughput.
+    :type print_logs: bool
+    :return: The number of files and bytes extracted, the time taken in seconds, and the throughput in MiB/s.
+    :rtype: dict[str, float]
+    """
+
+    start_time: float = time.perf_counter()
+
+    # Check every path and create folders before extracting anything
+    file_jobs: list[tuple[ZipInfo, str]] = []
+    folders: set[str] = set()
+    for filename_relative_to_folder, zinfo in members.items():
+        destination_path: str = get_safe_path(destination_folder, filename_relative_to_folder)
+        if zinfo.is_dir():
+            folders.add(destination_path)
+            continue
+        folders.add(os.path.dirname(destination_path))
+        file_jobs.append((zinfo, destination_path))
+    for folder in sorted(folders):
+        os.makedirs(folder, exist_ok=True)
+
+    # Extract large files first, largest first, and keep small files in zip order since creating them in order is faster
+    file_jobs.sort(key=lambda job: -job[0].file_size if job[0].file_size >= PREALLOCATE_MIN_SIZE else 0)
+    open_zip_files: dict[int, ZipFile] = {}
+    futures: list[Future] = []
+    executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max(1, extract_workers), thread_name_prefix='extract')
+    try:
+        for zinfo, destination_path in file_jobs:
+            futures.append(executor.submit(extract_zip_member, zip_filename, zinfo, destination_path, replace_existing, buffer_size, open_zip_files))
+
+        # Wait for files and raise the first error
+        for future in as_completed(futures):
+            future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        for zf in open_zip_files.values():
+            zf.close()
+
+    # Report throughput
+    seconds: float = time.perf_counter() - start_time
+    extracted_bytes: int = sum(future.result() for future in futures)
+    stats: dict[str, float] = {
+        'files': len(file_jobs),
+        'bytes': extracted_bytes,
+        'seconds': seconds,
+        'throughput': extracted_bytes / (1024 * 1024) / seconds if seconds > 0 else 0.0
+    }
+    if print_logs:
+        print(f'Extracted {stats["files"]} files ({extracted_bytes / (1024 * 1024):.2f} MiB) in {seconds:.2f}s ({stats["throughput"]:.2f} MiB/s)')
+    return stats
+
+def print_modpack_metadata(data: dict) -> None:
+    """
+    Prints the name, version, summary and dependencies of a modpack.
+
+    :param data: The contents of the modpack index file as a dict.
+    :type data: dict
+    :rtype: None
+    """
+
+    # Get metadata
+    modpack_version: str = data['versionId']
+    modpack_name: str = data['name']
+    modpack_summary: Optional[str] = data.get('summary')
+    modpack_dependencies: dict[str, str] = data['dependencies']
+
+    # Print info
+    print(f'Modpack name:    {modpack_name}')
+    print(f'Modpack version: {modpack_version}')
+    if modpack_summary is not None:
+        indented_modpack_summary: str = modpack_summary.replace('\n', '\n                 ')
+        print(f'Modpack summary: {indented_modpack_summary}')
+    print('Dependencies:')
+    for dependency, dependency_version in modpack_dependencies.items():
+        print(f'    {DEPENDENCY_NAMES.get(dependency, dependency)} {dependency_version}')
+
+def print_modpack_info(filename: str, catalog: Optional[ModpackCatalog] = None) -> None:
+    """
+    Prints info about an .mrpack file.
+
+    :param filename: The path to the .mrpack file.
+    :type filename: str
+    :param catalog: The catalog of the folder containing the file, to avoid reading it again if it hasn't changed, or None.
+    :type catalog: Optional[ModpackCatalog]
+    :rtype: None
+    """
+
+    # Get info from catalog
+    entry: Optional[dict] = catalog.get(filename) if catalog is not None else None
+    if entry is not None and not entry['valid']:
+        raise ModpackExtractorError(f'Invalid modpack file: "{os.path.basename(filename)}" couldn\'t be read!')
+    data: dict
+    if entry is not None:
+        data = {'name': entry['name'], 'versionId': entry['version_id'], 'dependencies': entry['dependencies']}
+        if entry['summary'] is not None:
+            data['summary'] = entry['summary']
+        file_count: int = entry['file_count']
+        download_size: int = entry['download_size']
+
+    # Read mrpack file
+    else:
+        with ZipFile(filename, 'r') as zf:
+
+            # Read index file
+            data: bytes = zf.read('modrinth.index.json')
+            data: dict = json.loads(data.decode())
+        file_count: int = len(data['files'])
+        download_size: int = sum(download_metadata['fileSize'] for download_metadata in data['files'])
+
+    # Print info
+    print(f'Filename:        {os.path.basename(filename)}')
+    print_modpack_metadata(data)
+    print(f'Files:           {file_count} ({download_size / (1024 * 1024):.2f} MiB to download)')
+
+def read_modpack(filename: str, is_server: bool = False) -> tuple[dict, dict[str, ZipInfo]]:
+    """
+    Reads the index file of an .mrpack file and finds the overrides that apply to the given environment.
+    Overrides are not decompressed.
+
+    :param filename: The path to the .mrpack file.
+    :type filename: str
+    :param is_server: Whether the modpack is being read for a server.
+    :type is_server: bool
+    :return: The contents of the modpack index file as a dict, and the info of each override in the .mrpack file keyed by path relative to the instance.
+    :rtype: tuple[dict, dict[str, ZipInfo]]
+    """
+
+    with ZipFile(filename, 'r') as zf:
+
+        # Read index file
+        data: bytes = zf.read('modrinth.index.json')
+        data: dict = json.loads(data.decode())
+
+        # Find overrides
+        base_overrides: dict[str, ZipInfo] = {}
+        one_sided_overrides: dict[str, ZipInfo] = {}
+        for compressed_file_info in zf.infolist():
+            compressed_filename: str = compressed_file_info.filename
+
+            # Get override type
+            override_type: str = 'none'
+            if compressed_filename.startswith('overrides/'):
+                override_type = 'base'
+            elif compressed_filename.startswith('server-overrides/'):
+                override_type = 'server'
+            elif compressed_filename.startswith('client-overrides/'):
+                override_type = 'client'
+
+            # Find override
+            filename_relative_to_instance: str = '/'.join(compressed_filename.split('/')[1:])
+            if filename_relative_to_instance == '':
+                continue
+            if override_type == 'base':
+                base_overrides[filename_relative_to_instance] = compressed_file_info
+            elif (override_type == 'server' and is_server) or (override_type == 'client' and not is_server):
+                one_sided_overrides[filename_relative_to_instance] = compressed_file_info
+
+    # Merge overrides
+    overrides: dict[str, ZipInfo] = base_overrides | one_sided_overrides
+    return data, overrides
+
+def get_safe_path(folder: str, filename_relative_to_instance: str) -> str:
+    """
+    Joins a path from a modpack onto a folder, making sure it can't point outside of that folder.
+
+    :param folder: The folder the path is relative to.
+    :type folder: str
+    :param filename_relative_to_instance: The path relative to the instance.
+    :type filename_relative_to_instance: str
+    :rtype: str
+    """
+
+    folder = os.path.abspath(folder)
+    path: str = os.path.abspath(os.path.join(folder, filename_relative_to_instance))
+    try:
+        is_inside_folder: bool = os.path.commonpath([folder, path]) == folder and path != folder
+    except ValueError:
+        is_inside_folder: bool = False
+    if os.path.isabs(filename_relative_to_instance) or not is_inside_folder:
+        raise ModpackExtractorError(f'Invalid modpack file: Path "{filename_relative_to_instance}" is outside of the instance folder!')
+    return path
+
+def should_download_file(download_metadata: dict, is_server: bool, download_optional_files: bool) -> bool:
+    """
+    Checks whether a file from a modpack index is needed in the given environment.
+
+    :param download_metadata: The entry for the file from the "files" list of the modpack index.
+    :type download_metadata: dict
+    :param is_server: Whether the modpack is being extracted for a server.
+    :type is_server: bool
+    :param download_optional_files: Whether optional files should be downloaded.
+    :type download_optional_files: bool
+    :rtype: bool
+    """
+
+    environment: dict = download_metadata.get('env', {'client': 'required', 'server': 'required'})
+    file_support: str = environment['server'] if is_server else environment['client']
+    return (file_support == 'required') or (file_support == 'optional' and download_optional_files)
+
+def get_download_filename(filename_relative_to_instance: str) -> str:
+    """
+    Gets the name of the temporary file a download is saved to while extracting.
+
+    :param filename_relative_to_instance: The path of the file relative to the instance.
+    :type filename_relative_to_instance: str
+    :rtype: str
+    """
+
+    return hashlib.sha1(filename_relative_to_instance.encode()).hexdigest() + '.download'
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE, retries: int = DEFAULT_RETRIES, backoff_factor: float = DEFAULT_BACKOFF_FACTOR) -> 'requests.Session':
+    """
+    Creates an HTTP session that keeps connections alive and retries responses with a status in RETRY_STATUS_CODES with exponential backoff.
+    The session can be shared between all downloads of a run, including downloads on different threads.
+
+    :param pool_size: The maximum number of connections kept open to each host.
+    :type pool_size: int
+    :param retries: The maximum number of times a request is retried after a response with a status in RETRY_STATUS_CODES. Connection errors aren't retried by the session, since download_from_url retries them and resumes with a Range request.
+    :type retries: int
+    :param backoff_factor: The delay before the first retry, in seconds. The delay doubles after each retry.
+    :type backoff_factor: float
+    :rtype: requests.Session
+    """
+
+    # Import requests only when a session is needed
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    import requests
+
+    retry: Retry = Retry(
+        total=retries,
+        connect=0,
+        read=0,
+        other=0,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=('GET', 'HEAD'),
+        respect_retry_after_header=True,
+    )
+    adapter: HTTPAdapter = HTTPAdapter(pool_connections=len(ALLOWED_HOSTNAMES), pool_maxsize=max(1, pool_size), max_retries=retry)
+    session: requests.Session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_output_filename(destination_folder: str, data: dict, is_server: bool = False) -> str:
+    """
+    Gets the path of the .zip file a modpack is extracted to.
+
+    :param destination_folder: The folder the .zip file is saved in.
+    :type destination_folder: str
+    :param data: The contents of the modpack index file as a dict.
+    :type data: dict
+    :param is_server: Whether the server version of the modpack is extracted.
+    :type is_server: bool
+    :rtype: str
+    """
+
+    server_suffix: str = ' - Server' if is_server else ''
+    escaped_output_name: str = escape_filename(f'{data["name"]} - {data["versionId"]}{server_suffix}')
+    return os.path.join(destination_folder, escaped_output_name + '.zip')
+
+def get_resume_folder(destination_folder: str, output_filename: str, data: dict) -> str:
+    """
+    Gets the folder an extract keeps its downloads and journal in until it succeeds.
+    The folder depends on the output file and the modpack index, so rerunning the same extract finds the same folder.
+
+    :param destination_folder: The folder the output .zip file is placed into.
+    :type destination_folder: str
+    :param output_filename: The path to the output .zip file.
+    :type output_filename: str
+    :param data: The contents of the modpack index file as a dict.
+    :type data: dict
+    :rtype: str
+    """
+
+    key: str = hashlib.sha1((os.path.basename(output_filename) + json.dumps(data, sort_keys=True)).encode()).hexdigest()[:16]
+    return os.path.join(destination_folder, RESUME_FOLDER_PREFIX + key)
+
+def apply_path_filter(downloads_metadata: list[dict], overrides: dict[str, ZipInfo], path_filter: Optional[PathFilter]) -> tuple[list[dict], dict[str, ZipInfo], list[dict], dict[str, ZipInfo]]:
+    """
+    Splits the files and overrides of a modpack into those selected by a path filter and those left out.
+    Folders left out aren't returned, since there is nothing to fetch for them.
+
+    :param downloads_metadata: The entries for the files from the "files" list of the modpack index.
+    :type downloads_metadata: list[dict]
+    :param overrides: The info of each override in the .mrpack file, keyed by path relative to the instance.
+    :type overrides: dict[str, ZipInfo]
+    :param path_filter: The filter selecting which files and overrides to keep, or None to keep all of them.
+    :type path_filter: Optional[PathFilter]
+    :return: The selected files and overrides, and the files and overrides left out.
+    :rtype: tuple[list[dict], dict[str, ZipInfo], list[dict], dict[str, ZipInfo]]
+    """
+
+    if path_filter is None:
+        return downloads_metadata, overrides, [], {}
+
+    selected_downloads_metadata: list[dict] = []
+    skipped_downloads_metadata: list[dict] = []
+    for download_metadata in downloads_metadata:
+        if path_filter.matches(download_metadata['path']):
+            selected_downloads_metadata.append(download_metadata)
+        else:
+            skipped_downloads_metadata.append(download_metadata)
+    selected_overrides: dict[str, ZipInfo] = {}
+    skipped_overrides: dict[str, ZipInfo] = {}
+    for filename_relative_to_instance, zinfo in overrides.items():
+        if path_filter.matches(filename_relative_to_instance):
+            selected_overrides[filename_relative_to_instance] = zinfo
+        elif not zinfo.is_dir():
+            skipped_overrides[filename_relative_to_instance] = zinfo
+    return selected_downloads_metadata, selected_overrides, skipped_downloads_metadata, skipped_overrides
+
+def get_skipped_manifest_filename(output_filename: str) -> str:
+    """
+    Gets the path of the manifest that records the files a filtered extract left out.
+
+    :param output_filename: The path to the output .zip file.
+    :type output_filename: str
+    :rtype: str
+    """
+
+    return os.path.splitext(output_filename)[0] + SKIPPED_MANIFEST_SUFFIX
+
+def write_skipped_manifest(manifest_filename: str, filename: str, data: dict, is_server: bool, skipped_downloads: list[dict], skipped_overrides: dict[str, ZipInfo]) -> None:
+    """
+    Saves the files a filtered extract left out, so they can be fetched later with fetch_skipped_files without reading the modpack index again.
+    The .mrpack file's size and modification time are saved too, so overrides aren't read from a file that has changed since.
+
+    :param manifest_filename: The path to save the manifest to.
+    :type manifest_filename: str
+    :param filename: The path to the .mrpack file.
+    :type filename: str
+    :param data: The contents of the modpack index file as a dict.
+    :type data: dict
+    :param is_server: Whether the modpack was extracted for a server.
+    :type is_server: bool
+    :param skipped_downloads: The entries from the "files" list of the modpack index that were left out.
+    :type skipped_downloads: list[dict]
+    :param skipped_overrides: The info of each override that was left out, keyed by path relative to the instance.
+    :type skipped_overrides: dict[str, ZipInfo]
+    :rtype: None
+    """
+
+    stat: os.stat_result = os.stat(filename)
+    manifest: dict = {
+        'source': os.path.abspath(filename),
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'name': data['name'],
+        'versionId': data['versionId'],
+        'is_server': is_server,
+        'files': skipped_downloads,
+        'overrides': {filename_relative_to_instance: zinfo.filename for filename_relative_to_instance, zinfo in skipped_overrides.items()}
+    }
+    with open(manifest_filename + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(json.dumps(manifest))
+    os.replace(manifest_filename + '.tmp', manifest_filename)
+
+def plan_modpack(data: dict, overrides: dict[str, ZipInfo], is_server: bool = False, download_optional_files: bool = True, cache: Optional[ArtifactCache] = None, resume_folder: Optional[str] = None, host_stats: Optional[HostStats] = None, host_limiter: Optional[HostLimiter] = None, download_workers: int = DEFAULT_DOWNLOAD_WORKERS, bandwidth_limiter: Optional[BandwidthLimiter] = None, path_filter: Optional[PathFilter] = None) -> dict:
+    """
+    Works out what extracting or installing a modpack would transfer, without downloading anything.
+    Only file sizes, hashes and URLs from the index are used, and files already present locally are found with one stat each, so planning takes milliseconds even for large modpacks.
+    The estimated time uses the measured speed of each host, the per-host limits, the number of download workers and the bandwidth cap, whichever is slowest.
+
+    :param data: The contents of the modpack index file as a dict.
+    :type data: dict
+    :param overrides: The info of each override in the .mrpack file, keyed by path relative to the instance.
+    :type overrides: dict[str, ZipInfo]
+    :param is_server: Whether the modpack would be extracted for a server.
+    :type is_server: bool
+    :param download_optional_files: Whether optional files would be downloaded.
+    :type download_optional_files: bool
+    :param cache: The artifact cache to look for files in, or None.
+    :type cache: Optional[ArtifactCache]
+    :param resume_folder: The resume folder of an earlier extract to look for finished files in, or None.
+    :type resume_folder: Optional[str]
+    :param host_stats: The measured speed of each host, or None to load them from CACHE_DIR.
+    :type host_stats: Optional[HostStats]
+    :param host_limiter: The limiter for concurrent downloads per hostname, or None to use HOST_CONCURRENCY_LIMITS.
+    :type host_limiter: Optional[HostLimiter]
+    :param download_workers: The maximum number of files that would be downloaded at the same time.
+    :type download_workers: int
+    :param bandwidth_limiter: The limiter for the combined download speed, or None for no limit.
+    :type bandwidth_limiter: Optional[BandwidthLimiter]
+    :param path_filter: The filter selecting which files and overrides would be extracted, or None to extract all of them.
+    :type path_filter: Optional[PathFilter]
+    :return: The "files" and "bytes" needed, the "excluded_files" and "excluded_bytes" filtered out, the "local_files" and "local_bytes" already present, the "fetch_files" and "fetch_bytes" to download, the "files", "bytes", "seconds" and whether speed was "measured" for each of the "hosts", the "files", "bytes" and "compressed_bytes" of the "overrides", and the "eta" in seconds.
+    :rtype: dict
+    """
+
+    if host_stats is None:
+        host_stats = HostStats()
+    if host_limiter is None:
+        host_limiter = HostLimiter()
+    measured_hosts: dict[str, dict[str, float]] = host_stats.get_stats()
+    journal: Optional[DownloadJournal] = DownloadJournal(resume_folder) if resume_folder is not None and os.path.isdir(resume_folder) else None
+    if path_filter is not None:
+        overrides = {filename_relative_to_instance: zinfo for filename_relative_to_instance, zinfo in overrides.items() if path_filter.matches(filename_relative_to_instance)}
+
+    plan: dict = {
+        'files': 0,
+        'bytes': 0,
+        'excluded_files': 0,
+        'excluded_bytes': 0,
+        'local_files': 0,
+        'local_bytes': 0,
+        'fetch_files': 0,
+        'fetch_bytes': 0,
+        'hosts': {},
+        'overrides': {
+            'files': sum(1 for zinfo in overrides.values() if not zinfo.is_dir()),
+            'bytes': sum(zinfo.file_size for zinfo in overrides.values()),
+            'compressed_bytes': sum(zinfo.compress_size for zinfo in overrides.values())
+        },
+        'eta': 0.0
+    }
+
+    # Parse each scheme and host once instead of every URL
+    hostnames: dict[str, str] = {}
+
+    def get_hostname(download_url: str) -> str:
+        prefix_end: int = download_url.find('/', download_url.find('//') + 2)
+        prefix: str = download_url[:prefix_end] if prefix_end >= 0 else download_url
+        if prefix not in hostnames:
+            hostnames[prefix] = urlparse(prefix).hostname
+        return hostnames[prefix]
+
+    # The estimated duration is linear in the file size, so each host only needs to be estimated twice
+    host_estimates: dict[str, tuple[float, float]] = {}
+
+    def estimate_duration(hostname: str, size: int) -> float:
+        if hostname not in host_estimates:
+            fixed_seconds: float = host_stats.estimate_duration(hostname, 0)
+            host_estimates[hostname] = (fixed_seconds, (host_stats.estimate_duration(hostname, 1024 * 1024) - fixed_seconds) / (1024 * 1024))
+        fixed_seconds, seconds_per_byte = host_estimates[hostname]
+        return fixed_seconds + size * seconds_per_byte
+
+    # Sort files into excluded, already present and to fetch from the host that would be tried first
+    total_seconds: float = 0
+    longest_seconds: float = 0
+    for download_metadata in data['files']:
+        file_size: int = download_metadata['fileSize']
+        if not should_download_file(download_metadata, is_server, download_optional_files) or (path_filter is not None and not path_filter.matches(download_metadata['path'])):
+            plan['excluded_files'] += 1
+            plan['excluded_bytes'] += file_size
+            continue
+        plan['files'] += 1
+        plan['bytes'] += file_size
+        if (cache is not None and cache.contains(download_metadata)) or (journal is not None and journal.get(download_metadata) is not None):
+            plan['local_files'] += 1
+            plan['local_bytes'] += file_size
+            continue
+        if len(download_metadata['downloads']) == 0:
+            raise ModpackExtractorError('Invalid modpack file: No download URLs were provided!')
+        url_hostnames: list[str] = [get_hostname(download_url) for download_url in download_metadata['downloads']]
+        for hostname in url_hostnames:
+            if hostname not in ALLOWED_HOSTNAMES:
+                raise ModpackExtractorError(f'Invalid modpack file: Hostname "{hostname}" isn\'t on the whitelist!')
+        hostname: str = url_hostnames[0]
+        seconds: float = estimate_duration(hostname, file_size)
+        for url_hostname in url_hostnames[1:]:
+            url_seconds: float = estimate_duration(url_hostname, file_size)
+            if url_seconds < seconds:
+                hostname, seconds = url_hostname, url_seconds
+        host: dict = plan['hosts'].setdefault(hostname, {'files': 0, 'bytes': 0, 'seconds': 0.0, 'measured': hostname in measured_hosts})
+        host['files'] += 1
+        host['bytes'] += file_size
+        host['seconds'] += seconds
+        plan['fetch_files'] += 1
+        plan['fetch_bytes'] += file_size
+        total_seconds += seconds
+        longest_seconds = max(longest_seconds, seconds)
+
+    # The slowest of the bottlenecks decides the estimate
+    eta: float = max(longest_seconds, total_seconds / max(1, download_workers))
+    for hostname, host in plan['hosts'].items():
+        eta = max(eta, host['seconds'] / max(1, min(download_workers, host_limiter.limits.get(hostname, host_limiter.default_limit))))
+    if bandwidth_limiter is not None:
+        eta = max(eta, plan['fetch_bytes'] / bandwidth_limiter.bytes_per_second)
+    plan['eta'] = eta
+    return plan
+
+def print_modpack_plan(plan: dict) -> None:
+    """
+    Prints what extracting or installing a modpack would transfer.
+
+    :param plan: The plan returned by plan_modpack.
+    :type plan: dict
+    :rtype: None
+    """
+
+    print(f'Files needed:    {plan["files"]} ({plan["bytes"] / (1024 * 1024):.2f} MiB, {plan["excluded_files"]} more excluded)')
+    print(f'Already present: {plan["local_files"]} ({plan["local_bytes"] / (1024 * 1024):.2f} MiB)')
+    print(f'To download:     {plan["fetch_files"]} ({plan["fetch_bytes"] / (1024 * 1024):.2f} MiB)')
+    for hostname, host in sorted(plan['hosts'].items(), key=lambda item: item[1]['bytes'], reverse=True):
+        measured: str = '' if host['measured'] else ', not measured yet'
+        print(f'    {hostname}: {host["files"]} files, {host["bytes"] / (1024 * 1024):.2f} MiB{measured}')
+    print(f'Overrides:       {plan["overrides"]["files"]} ({plan["overrides"]["bytes"] / (1024 * 1024):.2f} MiB)')
+    print(f'Estimated time:  {plan["eta"]:.1f}s')
+
+def download_from_url(download_metadata: dict, download_url: str, partial_path: str, host_limiter: HostLimiter, session: 'requests.Session', buffer_size: int = DEFAULT_BUFFER_SIZE, print_logs: bool = True, timeout: tuple[float, float] = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES, backoff_factor: float = DEFAULT_BACKOFF_FACTOR, hash_verifier: Optional[HashVerifier] = None, on_event: Optional[Callable[[dict], None]] = None, bandwidth_limiter: Optional[BandwidthLimiter] = None, host_stats: Optional[HostStats] = None, cancel_event: Optional[threading.Event] = None) -> Optional[tuple[str, str]]:
+    """
+    Downloads a file from a modpack index from one of its download URLs into a partial file, hashing it as it arrives. Used by download_file.
+    Connection errors and downloads that drop in the middle are retried with exponential backoff, up to retries attempts in total.
+    If a partial file is left over from an earlier attempt, only the rest of the file is requested with an HTTP Range header.
+
+    :param download_metadata: The entry for the file from the "files" list of the modpack index.
+    :type download_metadata: dict
+    :param download_url: The URL to download from. Its hostname must already be checked against ALLOWED_HOSTNAMES.
+    :type download_url: str
+    :param partial_path: The path to download to.
+    :type partial_path: str
+    :param host_limiter: The limiter for concurrent downloads per hostname.
+    :type host_limiter: HostLimiter
+    :param session: The HTTP session to download with.
+    :type session: requests.Session
+    :param buffer_size: The size of each chunk read from the network, in bytes.
+    :type buffer_size: int
+    :param print_logs: Whether to print logs while downloading.
+    :type print_logs: bool
+    :param timeout: The connect and read timeouts, in seconds.
+    :type timeout: tuple[float, float]
+    :param retries: The maximum number of attempts to download from the URL, including the first one.
+    :type retries: int
+    :param backoff_factor: The delay before the first retry, in seconds. The delay doubles after each retry.
+    :type backoff_factor: float
+    :param hash_verifier: The verifier that hashes the file on its worker threads while it downloads, or None to hash it on this thread.
+    :type hash_verifier: Optional[HashVerifier]
+    :param on_event: A function called with a dict for each progress event, possibly from worker threads, or None. See SummaryReporter.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param bandwidth_limiter: The limiter for the combined download speed, or None for no limit.
+    :type bandwidth_limiter: Optional[BandwidthLimiter]
+    :param host_stats: The statistics to record the speed of the host in, or None.
+    :type host_stats: Optional[HostStats]
+    :param cancel_event: An event that stops the download and deletes the partial file when set, or None.
+    :type cancel_event: Optional[threading.Event]
+    :return: The SHA1 and SHA512 hashes of the downloaded file, or None if the download failed or was cancelled.
+    :rtype: Optional[tuple[str, str]]
+    """
+
+    # Import requests only when a file is downloaded
+    import requests
+
+    filename_relative_to_instance: str = download_metadata['path']
+    file_size: int = download_metadata['fileSize']
+    hostname: str = urlparse(download_url).hostname
+    if print_logs:
+        print(f'Using {download_url}')
+
+    # Download from URL, resuming if the connection drops
+    hash_job: HashJob
+    for attempt in range(max(1, retries)):
+        hash_job = hash_verifier.start() if hash_verifier is not None else HashJob()
+        start_time: float = time.perf_counter()
+        latency: float = 0
+        received: int = 0
+        try:
+            offset: int = os.path.getsize(partial_path) if os.path.isfile(partial_path) else 0
+            if offset >= file_size:
+                offset = 0
+            headers: dict[str, str] = {'Range': f'bytes={offset}-'} if offset > 0 else {}
+            with host_limiter.get_semaphore(hostname):
+                with session.get(download_url, headers=headers, stream=True, timeout=timeout) as r:
+                    r.raise_for_status()
+                    latency = time.perf_counter() - start_time
+                    if r.status_code != 206:
+                        offset = 0
+                    with open(partial_path, 'r+b' if offset > 0 else 'wb') as f:
+
+                        # Hash the part that was already downloaded
+                        while f.tell() < offset:
+                            chunk: bytes = f.read(min(buffer_size, offset - f.tell()))
+                            hash_job.update(chunk)
+                        f.truncate()
+
+                        # Download the rest
+                        for chunk in r.iter_content(chunk_size=buffer_size if bandwidth_limiter is None else bandwidth_limiter.get_chunk_size(buffer_size)):
+                            if cancel_event is not None and cancel_event.is_set():
+                                break
+                            if bandwidth_limiter is not None:
+                                bandwidth_limiter.consume(len(chunk))
+                            hash_job.update(chunk)
+                            f.write(chunk)
+                            received += len(chunk)
+                            emit_event(on_event, 'file_progress', path=filename_relative_to_instance, bytes_done=f.tell(), size=file_size)
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            if host_stats is not None:
+                host_stats.record(hostname, latency, received, time.perf_counter() - start_time)
+            return hash_job.hexdigests()
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError, requests.exceptions.Timeout) as e:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            if attempt >= retries - 1:
+                if print_logs:
+                    print(f'Error during download: {e}')
+                emit_event(on_event, 'url_failed', path=filename_relative_to_instance, url=download_url, error=str(e))
+                break
+            delay: float = backoff_factor * (2 ** attempt)
+            if print_logs:
+                print(f'Error during download: {e} (retrying in {delay:.1f}s)')
+            emit_event(on_event, 'retry', path=filename_relative_to_instance, url=download_url, attempt=attempt + 1, delay=delay, error=str(e))
+            if cancel_event is not None:
+                cancel_event.wait(delay)
+            else:
+                time.sleep(delay)
+        except Exception as e:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            if print_logs:
+                print(f'Error during download: {e}')
+            emit_event(on_event, 'url_failed', path=filename_relative_to_instance, url=download_url, error=str(e))
+            break
+
+    # A cancelled download was only slower than the one that was used, so record how far it got and throw away its partial file
+    if cancel_event is not None and cancel_event.is_set():
+        if host_stats is not None:
+            elapsed: float = time.perf_counter() - start_time
+            host_stats.record(hostname, latency if latency > 0 else elapsed, received, elapsed)
+        try:
+            os.remove(partial_path)
+        except OSError:
+            pass
+        return None
+
+    if host_stats is not None:
+        host_stats.record_failure(hostname)
+    return None
+
+def check_download_hashes(download_metadata: dict, partial_path: str, sha1: str, sha512: str, hash_verifier: Optional[HashVerifier] = None) -> None:
+    """
+    Checks the hashes of a downloaded file against the modpack index, deleting the file if they don't match.
+
+    :param download_metadata: The entry for the file from the "files" list of the modpack index.
+    :type download_metadata: dict
+    :param partial_path: The path the file was downloaded to.
+    :type partial_path: str
+    :param sha1: The SHA1 hash of the downloaded file.
+    :type sha1: str
+    :param sha512: The SHA512 hash of the downloaded file.
+    :type sha512: str
+    :param hash_verifier: The verifier to record the result in, or None.
+    :type hash_verifier: Optional[HashVerifier]
+    :rtype: None
+    """
+
+    hashes: dict = download_metadata['hashes']
+    valid: bool = sha1 == hashes['sha1'] and sha512 == hashes['sha512']
+    if hash_verifier is not None:
+        hash_verifier.record_result(valid)
+    if not valid:
+        os.remove(partial_path)
+    if sha1 != hashes['sha1']:
+        raise ModpackExtractorError(f'SHA1 hashes don\'t match for "{download_metadata["path"]}"!')
+    if sha512 != hashes['sha512']:
+        raise ModpackExtractorError(f'SHA512 hashes don\'t match for "{download_metadata["path"]}"!')
+
+def download_file(download_metadata: dict, destination_path: str, host_limiter: HostLimiter, session: 'requests.Session', buffer_size: int = DEFAULT_BUFFER_SIZE, print_logs: bool = True, timeout: tuple[float, float] = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES, backoff_factor: float = DEFAULT_BACKOFF_FACTOR, hash_verifier: Optional[HashVerifier] = None, on_event: Optional[Callable[[dict], None]] = None, bandwidth_limiter: Optional[BandwidthLimiter] = None, host_stats: Optional[HostStats] = None, cancel_event: Optional[threading.Event] = None) -> None:
+    """
+    Downloads a file from a modpack index, trying each of its download URLs until one succeeds, and verifies its hashes.
+    Every URL's hostname is checked against ALLOWED_HOSTNAMES before anything is downloaded.
+    With host_stats, the URLs are tried fastest first, and if a download takes longer than its host's hedge delay, a hedged request is sent to the next URL at the same time.
+    The first download to finish is used. The others are cancelled, and waited for before this returns. Their partial files are then deleted.
+    Each URL downloads to its own partial file next to destination_path, which is resumed with an HTTP Range header if it is left over from an earlier attempt.
+
+    :param download_metadata: The entry for the file from the "files" list of the modpack index.
+    :type download_metadata: dict
+    :param destination_path: The path to save the file to.
+    :type destination_path: str
+    :param host_limiter: The limiter for concurrent downloads per hostname.
+    :type host_limiter: HostLimiter
+    :param session: The HTTP session to download with.
+    :type session: requests.Session
+    :param buffer_size: The size of each chunk read from the network, in bytes.
+    :type buffer_size: int
+    :param print_logs: Whether to print logs while downloading.
+    :type print_logs: bool
+    :param timeout: The connect and read timeouts, in seconds.
+    :type timeout: tuple[float, float]
+    :param retries: The maximum number of attempts to download from each URL, including the first one.
+    :type retries: int
+    :param backoff_factor: The delay before the first retry, in seconds. The delay doubles after each retry.
+    :type backoff_factor: float
+    :param hash_verifier: The verifier that hashes the file on its worker threads while it downloads, or None to hash it on this thread.
+    :type hash_verifier: Optional[HashVerifier]
+    :param on_event: A function called with a dict for each progress event, possibly from worker threads, or None. See SummaryReporter.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param bandwidth_limiter: The limiter for the combined download speed, or None for no limit.
+    :type bandwidth_limiter: Optional[BandwidthLimiter]
+    :param host_stats: The statistics used to rank the URLs and hedge slow downloads, which are updated with each download, or None to try the URLs in order one at a time.
+    :type host_stats: Optional[HostStats]
+    :param cancel_event: An event that stops the download and raises ModpackExtractorError when set, or None.
+    :type cancel_event: Optional[threading.Event]
+    :rtype: None
+    """
+
+    # Get metadata
+    filename_relative_to_instance: str = download_metadata['path']
+    file_size: int = download_metadata['fileSize']
+    download_urls: list[str] = list(dict.fromkeys(download_metadata['downloads']))
+    if len(download_urls) == 0:
+        raise ModpackExtractorError('Invalid modpack file: No download URLs were provided!')
+
+    # Check every hostname
+    for download_url in download_urls:
+        hostname: str = urlparse(download_url).hostname
+        if hostname not in ALLOWED_HOSTNAMES:
+            raise ModpackExtractorError(f'Invalid modpack file: Hostname "{hostname}" isn\'t on the whitelist!')
+
+    # Give each URL its own partial file, so hedged requests don't write to the same file
+    partial_paths: dict[str, str] = {download_url: destination_path + ('.part' if i == 0 else f'.{i}.part') for i, download_url in enumerate(download_urls)}
+
+    # Try the fastest URLs first
+    if host_stats is not None:
+        download_urls = host_stats.rank_urls(download_urls, file_size)
+
+    if print_logs:
+        print(f'Downloading [{file_size / (1024 * 1024):.2f} MiB] {filename_relative_to_instance}')
+
+    # Try URLs one at a time
+    winning_url: Optional[str] = None
+    if host_stats is None or len(download_urls) == 1:
+        for download_url in download_urls:
+            result: Optional[tuple[str, str]] = download_from_url(download_metadata, download_url, partial_paths[download_url], host_limiter, session, buffer_size, print_logs, timeout, retries, backoff_factor, hash_verifier, on_event, bandwidth_limiter, host_stats, cancel_event)
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            if result is not None:
+                check_download_hashes(download_metadata, partial_paths[download_url], result[0], result[1], hash_verifier)
+                winning_url = download_url
+                break
+
+    # Try URLs in order, sending a hedged request to the next URL whenever the running ones are too slow
+    else:
+        remaining_urls: list[str] = list(download_urls)
+        running: dict[Future, tuple[str, threading.Event]] = {}
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=len(download_urls), thread_name_prefix='hedge')
+        try:
+            while winning_url is None and (len(running) > 0 or len(remaining_urls) > 0):
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+
+                # Start the next URL if nothing is running
+                if len(running) == 0:
+                    download_url: str = remaining_urls.pop(0)
+                    url_cancel_event: threading.Event = threading.Event()
+                    running[executor.submit(download_from_url, download_metadata, download_url, partial_paths[download_url], host_limiter, session, buffer_size, print_logs, timeout, retries, backoff_factor, hash_verifier, on_event, bandwidth_limiter, host_stats, url_cancel_event)] = (download_url, url_cancel_event)
+                    hedge_delay: float = host_stats.get_hedge_delay(urlparse(download_url).hostname, file_size)
+                    hedge_time: float = time.monotonic() + hedge_delay
+
+                # Wait for a download to finish, or hedge if it takes too long
+                # With a cancel event, wake up regularly to check it
+                wait_timeout: Optional[float] = max(0, hedge_time - time.monotonic()) if len(remaining_urls) > 0 else None
+                if cancel_event is not None:
+                    wait_timeout = CANCEL_POLL_INTERVAL if wait_timeout is None else min(wait_timeout, CANCEL_POLL_INTERVAL)
+                done: set[Future]
+                done, _ = wait(running, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+                if len(done) == 0:
+                    if len(remaining_urls) == 0 or time.monotonic() < hedge_time:
+                        continue
+                    download_url: str = remaining_urls.pop(0)
+                    if print_logs:
+                        print(f'Download is slow, also trying {download_url}')
+                    emit_event(on_event, 'hedge', path=filename_relative_to_instance, url=download_url, delay=hedge_delay)
+                    url_cancel_event: threading.Event = threading.Event()
+                    running[executor.submit(download_from_url, download_metadata, download_url, partial_paths[download_url], host_limiter, session, buffer_size, print_logs, timeout, retries, backoff_factor, hash_verifier, on_event, bandwidth_limiter, host_stats, url_cancel_event)] = (download_url, url_cancel_event)
+                    hedge_delay = host_stats.get_hedge_delay(urlparse(download_url).hostname, file_size)
+                    hedge_time = time.monotonic() + hedge_delay
+                    continue
+
+                # Use the first download that succeeds
+                for future in done:
+                    download_url, _ = running.pop(future)
+                    result: Optional[tuple[str, str]] = future.result()
+                    if result is not None and winning_url is None:
+                        winning_url = download_url
+                        for _, url_cancel_event in running.values():
+                            url_cancel_event.set()
+                        check_download_hashes(download_metadata, partial_paths[download_url], result[0], result[1], hash_verifier)
+        finally:
+
+            # Wait for the cancelled downloads to stop, so none of them writes a partial file, records host stats or emits events after this returns
+            for _, url_cancel_event in running.values():
+                url_cancel_event.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    # Delete the partial files of the other URLs once one has been used. Without a winner, they are kept to resume from
+    if winning_url is not None:
+        for download_url, partial_path in partial_paths.items():
+            if download_url != winning_url:
+                try:
+                    os.remove(partial_path)
+                except OSError:
+                    pass
+
+    # The download was cancelled, or all URLs failed
+    if cancel_event is not None and cancel_event.is_set():
+        raise ModpackExtractorError(f'Download of "{filename_relative_to_instance}" was cancelled!')
+    if winning_url is None:
+        raise ModpackExtractorError('All provided download URLs failed! Check your internet connection.')
+
+    os.replace(partial_paths[winning_url], destination_path)
+
+def fetch_file(download_metadata: dict, destination_path: str, host_limiter: HostLimiter, session: 'requests.Session', buffer_size: int = DEFAULT_BUFFER_SIZE, cache: Optional[ArtifactCache] = None, print_logs: bool = True, journal: Optional[DownloadJournal] = None, hash_verifier: Optional[HashVerifier] = None, on_event: Optional[Callable[[dict], None]] = None, bandwidth_limiter: Optional[BandwidthLimiter] = None, host_stats: Optional[HostStats] = None, cancel_event: Optional[threading.Event] = None) -> str:
+    """
+    Gets a file from a modpack index from the journal or the cache, or downloads it and adds it to the cache once its hashes are verified.
+
+    :param download_metadata: The entry for the file from the "files" list of the modpack index.
+    :type download_metadata: dict
+    :param destination_path: The path to save the file to if it has to be downloaded.
+    :type destination_path: str
+    :param host_limiter: The limiter for concurrent downloads per hostname.
+    :type host_limiter: HostLimiter
+    :param session: The HTTP session to download with.
+    :type session: requests.Session
+    :param buffer_size: The size of each chunk read from the network, in bytes.
+    :type buffer_size: int
+    :param cache: The artifact cache to use, or None to always download.
+    :type cache: Optional[ArtifactCache]
+    :param print_logs: Whether to print logs while downloading.
+    :type print_logs: bool
+    :param journal: The journal of files finished by an earlier run to resume from and record to, or None.
+    :type journal: Optional[DownloadJournal]
+    :param hash_verifier: The verifier that hashes the file while it downloads, or None to hash it on this thread.
+    :type hash_verifier: Optional[HashVerifier]
+    :param on_event: A function called with a dict for each progress event, possibly from worker threads, or None. See SummaryReporter.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param bandwidth_limiter: The limiter for the combined download speed, or None for no limit.
+    :type bandwidth_limiter: Optional[BandwidthLimiter]
+    :param host_stats: The statistics used to rank download URLs and hedge slow downloads, or None to try the URLs in order one at a time.
+    :type host_stats: Optional[HostStats]
+    :param cancel_event: An event that stops the download and raises ModpackExtractorError when set, or None.
+    :type cancel_event: Optional[threading.Event]
+    :return: The path to the file on disk.
+    :rtype: str
+    """
+
+    filename_relative_to_instance: str = download_metadata['path']
+    sha512: str = download_metadata['hashes']['sha512']
+    file_size: int = download_metadata['fileSize']
+    start_time: float = time.perf_counter()
+
+    # Check journal
+    if journal is not None:
+        finished_path: Optional[str] = journal.get(download_metadata)
+        if finished_path is not None:
+            if print_logs:
+                print(f'Already downloaded {filename_relative_to_instance}')
+            emit_event(on_event, 'file_done', path=filename_relative_to_instance, size=file_size, source='journal', duration=time.perf_counter() - start_time, rate=0)
+            return finished_path
+
+    # Without a cache, just download the file
+    if cache is None:
+        download_file(download_metadata, destination_path, host_limiter, session, buffer_size, print_logs, hash_verifier=hash_verifier, on_event=on_event, bandwidth_limiter=bandwidth_limiter, host_stats=host_stats, cancel_event=cancel_event)
+        path: str = destination_path
+
+    # Only one thread looks up and downloads each file, and the others wait and get it from the cache
+    else:
+        with cache.get_key_lock(sha512):
+
+            # Check cache
+            cached_path: Optional[str] = cache.get(download_metadata)
+            if cached_path is not None:
+                if print_logs:
+                    print(f'Using cached {filename_relative_to_instance}')
+                emit_event(on_event, 'cache_hit', path=filename_relative_to_instance, sha512=sha512)
+                emit_event(on_event, 'file_done', path=filename_relative_to_instance, size=file_size, source='cache', duration=time.perf_counter() - start_time, rate=0)
+                return cached_path
+            emit_event(on_event, 'cache_miss', path=filename_relative_to_instance, sha512=sha512)
+
+            # Download file
+            download_file(download_metadata, destination_path, host_limiter, session, buffer_size, print_logs, hash_verifier=hash_verifier, on_event=on_event, bandwidth_limiter=bandwidth_limiter, host_stats=host_stats, cancel_event=cancel_event)
+            path: str = cache.put(sha512, destination_path, move=True)
+
+    if journal is not None:
+        journal.record(download_metadata, path)
+    duration: float = time.perf_counter() - start_time
+    emit_event(on_event, 'file_done', path=filename_relative_to_instance, size=file_size, source='download', duration=duration, rate=file_size / duration if duration > 0 else 0)
+    return path
+
+def fetch_file_to_zip(download_metadata: dict, destination_path: str, writer: ZipStreamWriter, host_limiter: HostLimiter, session: 'requests.Session', buffer_size: int = DEFAULT_BUFFER_SIZE, cache: Optional[ArtifactCache] = None, print_logs: bool = True, journal: Optional[DownloadJournal] = None, hash_verifier: Optional[HashVerifier] = None, on_event: Optional[Callable[[dict], None]] = None, bandwidth_limiter: Optional[BandwidthLimiter] = None, host_stats: Optional[HostStats] = None, cancel_event: Optional[threading.Event] = None) -> str:
+    """
+    Gets a file from a modpack index like fetch_file and hands it to a zip writer, waiting for room in the writer's budget before it starts.
+    The file is kept after it is written, so the journal can point a rerun of a failed extract at it.
+
+    :param download_metadata: The entry for the file from the "files" list of the modpack index.
+    :type download_metadata: dict
+    :param destination_path: The path to save the file to if it has to be downloaded.
+    :type destination_path: str
+    :param writer: The writer of the output zip file.
+    :type writer: ZipStreamWriter
+    :param host_limiter: The limiter for concurrent downloads per hostname.
+    :type host_limiter: HostLimiter
+    :param session: The HTTP session to download with.
+    :type session: requests.Session
+    :param buffer_size: The size of each chunk read from the network, in bytes.
+    :type buffer_size: int
+    :param cache: The artifact cache to use, or None to always download.
+    :type cache: Optional[ArtifactCache]
+    :param print_logs: Whether to print logs while downloading.
+    :type print_logs: bool
+    :param journal: The journal of files finished by an earlier run to resume from and record to, or None.
+    :type journal: Optional[DownloadJournal]
+    :param hash_verifier: The verifier that hashes the file while it downloads, or None to hash it on this thread.
+    :type hash_verifier: Optional[HashVerifier]
+    :param on_event: A function called with a dict for each progress event, possibly from worker threads, or None. See SummaryReporter.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param bandwidth_limiter: The limiter for the combined download speed, or None for no limit.
+    :type bandwidth_limiter: Optional[BandwidthLimiter]
+    :param host_stats: The statistics used to rank download URLs and hedge slow downloads, or None to try the URLs in order one at a time.
+    :type host_stats: Optional[HostStats]
+    :param cancel_event: An event that stops the download and raises ModpackExtractorError when set, or None.
+    :type cancel_event: Optional[threading.Event]
+    :return: The path the file was fetched to, which may already be deleted.
+    :rtype: str
+    """
+
+    file_size: int = download_metadata['fileSize']
+    writer.acquire(file_size)
+    try:
+        path: str = fetch_file(download_metadata, destination_path, host_limiter, session, buffer_size, cache, print_logs, journal, hash_verifier, on_event, bandwidth_limiter, host_stats, cancel_event)
+    except BaseException:
+        writer.release(file_size)
+        raise
+    writer.add_file(download_metadata['path'], path, file_size)
+    return path
+
+def download_files(downloads_metadata: list[dict], download_folder: str, download_workers: int = DEFAULT_DOWNLOAD_WORKERS, host_limiter: Optional[HostLimiter] = None, bandwidth_limiter: Optional[BandwidthLimiter] = None, host_stats: Optional[HostStats] = None, buffer_size: int = DEFAULT_BUFFER_SIZE, cache: Optional[ArtifactCache] = None, print_logs: bool = True, session: Optional['requests.Session'] = None, journal: Optional[DownloadJournal] = None, hash_verifier: Optional[HashVerifier] = None, on_event: Optional[Callable[[dict], None]] = None, writer: Optional[ZipStreamWriter] = None) -> dict[str, str]:
+    """
+    Downloads files from a modpack index concurrently into a folder.
+    Files found in the cache are used directly instead of being downloaded, and downloaded files are added to the cache.
+    The largest files are started first to shorten the total time, and the result keeps the order of downloads_metadata.
+    If any download fails, the downloads that haven't started yet are cancelled and the error is raised.
+
+    :param downloads_metadata: The entries for the files to download from the "files" list of the modpack index.
+    :type downloads_metadata: list[dict]
+    :param download_folder: The folder to save the downloaded files to.
+    :type download_folder: str
+    :param download_workers: The maximum number of files to download at the same time.
+    :type download_workers: int
+    :param host_limiter: The limiter for concurrent downloads per hostname, or None to use HOST_CONCURRENCY_LIMITS.
+    :type host_limiter: Optional[HostLimiter]
+    :param bandwidth_limiter: The limiter for the combined download speed, or None for no limit.
+    :type bandwidth_limiter: Optional[BandwidthLimiter]
+    :param host_stats: The statistics used to rank download URLs and hedge slow downloads, or None to load them from CACHE_DIR and save them when done.
+    :type host_stats: Optional[HostStats]
+    :param buffer_size: The size of each chunk read from the network, in bytes.
+    :type buffer_size: int
+    :param cache: The artifact cache to use, or None to always download.
+    :type cache: Optional[ArtifactCache]
+    :param print_logs: Whether to print logs while downloading.
+    :type print_logs: bool
+    :param session: The HTTP session to download with, or None to create one for these downloads.
+    :type session: Optional[requests.Session]
+    :param journal: The journal of files finished by an earlier run to resume from and record to, or None.
+    :type journal: Optional[DownloadJournal]
+    :param hash_verifier: The verifier that hashes files while they download, or None to create one for these downloads.
+    :type hash_verifier: Optional[HashVerifier]
+    :param on_event: A function called with a dict for each progress event, possibly from worker threads, or None. See SummaryReporter.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param writer: The writer to hand each file to as soon as it is downloaded, which also limits the bytes in flight, or None to keep every file in the folder.
+    :type writer: Optional[ZipStreamWriter]
+    :return: The path to each file on disk, keyed by path relative to the instance, in the same order as downloads_metadata.
+    :rtype: dict[str, str]
+    """
+
+    if host_limiter is None:
+        host_limiter = HostLimiter()
+    owns_session: bool = session is None
+    if owns_session:
+        session = create_session(pool_size=download_workers)
+    owns_hash_verifier: bool = hash_verifier is None
+    if owns_hash_verifier:
+        hash_verifier = HashVerifier()
+    owns_host_stats: bool = host_stats is None
+    if owns_host_stats:
+        host_stats = HostStats()
+
+    # Start the largest downloads first, so a large file listed last doesn't finish long after everything else
+    futures: dict[str, Future] = {}
+    executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max(1, download_workers), thread_name_prefix='download')
+    try:
+        for download_metadata in sorted(downloads_metadata, key=lambda download_metadata: download_metadata['fileSize'], reverse=True):
+            filename_relative_to_instance: str = download_metadata['path']
+            destination_path: str = os.path.join(download_folder, get_download_filename(filename_relative_to_instance))
+            if writer is not None:
+                futures[filename_relative_to_instance] = executor.submit(fetch_file_to_zip, download_metadata, destination_path, writer, host_limiter, session, buffer_size, cache, print_logs, journal, hash_verifier, on_event, bandwidth_limiter, host_stats)
+            else:
+                futures[filename_relative_to_instance] = executor.submit(fetch_file, download_metadata, destination_path, host_limiter, session, buffer_size, cache, print_logs, journal, hash_verifier, on_event, bandwidth_limiter, host_stats)
+
+        # Wait for downloads and raise the first error
+        for future in as_completed(futures.values()):
+            future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if owns_session:
+            session.close()
+        if owns_hash_verifier:
+            hash_verifier.shutdown()
+        if owns_host_stats:
+            try:
+                host_stats.save()
+            except OSError:
+                pass
+
+    # Keep the order of the modpack index
+    downloaded_files: dict[str, str] = {download_metadata['path']: futures[download_metadata['path']].result() for download_metadata in downloads_metadata}
+    return downloaded_files
+
+def extract_modpack(filename: str, destination_folder: str = '.', is_server: bool = False, download_optional_files: bool = True, wait_for_user: bool = True, print_logs: bool = True, download_workers: int = DEFAULT_DOWNLOAD_WORKERS, buffer_size: int = DEFAULT_BUFFER_SIZE, cache: Optional[ArtifactCache] = None, compression_level: int = DEFAULT_COMPRESSION_LEVEL, compression_workers: int = DEFAULT_COMPRESSION_WORKERS, session: Optional['requests.Session'] = None, host_limiter: Optional[HostLimiter] = None, bandwidth_limiter: Optional[BandwidthLimiter] = None, host_stats: Optional[HostStats] = None, on_event: Optional[Callable[[dict], None]] = None, byte_budget: Optional[ByteBudget] = None, path_filter: Optional[PathFilter] = None, record_skipped: bool = False) -> tuple[str, dict]:
+    """
+    Converts an .mrpack file into a .zip file.
+    Downloading, verifying, compressing and writing run as a pipeline: each file is written into the .zip file as soon as it is downloaded.
+    Downloads wait while the bytes between the start of a download and the .zip file would exceed the budget, so memory use stays flat no matter how large the modpack is.
+    Downloaded files are kept in a resume folder until the .zip file is complete, so if the extract fails, running it again only downloads the files that are missing.
+
+    :param filename: The path to the .mrpack file.
+    :type filename: str
+    :param destination_folder: The folder to place the output .zip file into.
+    :type destination_folder: str
+    :param is_server: Whether the modpack is being extracted for a server.
+    :type is_server: bool
+    :param download_optional_files: Whether optional files should be downloaded.
+    :type download_optional_files: bool
+    :param wait_for_user: Whether to wait for user input before extracting.
+    :type wait_for_user: bool
+    :param print_logs: Whether to print logs while extracting.
+    :type print_logs: bool
+    :param download_workers: The maximum number of files to download at the same time.
+    :type download_workers: int
+    :param buffer_size: The size of each chunk read from the network or copied between files, in bytes. Bounds the memory used per download.
+    :type buffer_size: int
+    :param cache: The artifact cache to take files from and add downloaded files to, or None to always download.
+    :type cache: Optional[ArtifactCache]
+    :param compression_level: The zlib compression level used for files that are deflated in the .zip file.
+    :type compression_level: int
+    :param compression_workers: The maximum number of files to compress at the same time.
+    :type compression_workers: int
+    :param session: The HTTP session to download with, or None to create one for this run.
+    :type session: Optional[requests.Session]
+    :param host_limiter: The limiter for concurrent downloads per hostname, or None to use HOST_CONCURRENCY_LIMITS for this run only.
+    :type host_limiter: Optional[HostLimiter]
+    :param bandwidth_limiter: The limiter for the combined download speed, or None for no limit.
+    :type bandwidth_limiter: Optional[BandwidthLimiter]
+    :param host_stats: The statistics used to rank download URLs and hedge slow downloads, or None to load them from CACHE_DIR and save them when done.
+    :type host_stats: Optional[HostStats]
+    :param on_event: A function called with a dict for each progress event, possibly from worker threads, or None. See SummaryReporter.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param byte_budget: The limit on bytes in flight, which may be shared with other extracts, or None to use DEFAULT_MAX_IN_FLIGHT_BYTES for this extract only.
+    :type byte_budget: Optional[ByteBudget]
+    :param path_filter: The filter selecting which files and overrides are extracted, or None to extract all of them. Files and overrides left out are never downloaded or read.
+    :type path_filter: Optional[PathFilter]
+    :param record_skipped: Whether to save the files and overrides left out by path_filter next to the .zip file, so fetch_skipped_files can fetch them later.
+    :type record_skipped: bool
+    :return: The path to the .zip file, and the contents of the modpack index file as a dict.
+    :rtype: tuple[str, dict]
+    """
+
+    # Read mrpack file
+    if print_logs:
+        print('Reading mrpack file...')
+    phase_start_time: float = start_phase(on_event, 'read')
+    data: dict
+    overrides: dict[str, ZipInfo]
+    data, overrides = read_modpack(filename, is_server)
+    end_phase(on_event, 'read', phase_start_time)
+
+    # Get metadata
+    downloads_metadata: list[dict] = data['files']
+    required_downloads_metadata: list[dict] = [download_metadata for download_metadata in downloads_metadata if should_download_file(download_metadata, is_server, download_optional_files)]
+
+    # Leave out the files and overrides that don't match the path filter before anything is downloaded or read
+    skipped_downloads_metadata: list[dict]
+    skipped_overrides: dict[str, ZipInfo]
+    required_downloads_metadata, overrides, skipped_downloads_metadata, skipped_overrides = apply_path_filter(required_downloads_metadata, overrides, path_filter)
+
+    # Get output paths
+    # Downloads are spilled to a folder next to the output file instead of being kept in memory
+    # The folder is kept if the extract fails, so running it again resumes where it stopped
+    output_filename: str = get_output_filename(destination_folder, data, is_server)
+    download_folder: str = get_resume_folder(destination_folder, output_filename, data)
+
+    # Wait for user, showing what would be downloaded
+    if wait_for_user:
+        if print_logs:
+            print('')
+        print_modpack_metadata(data)
+        print_modpack_plan(plan_modpack(data, overrides, is_server, download_optional_files, cache, download_folder, host_stats, host_limiter, download_workers, bandwidth_limiter, path_filter))
+        print('')
+        input('Press ENTER to continue.')
+        if print_logs:
+            print('')
+
+    os.makedirs(download_folder, exist_ok=True)
+    journal: DownloadJournal = DownloadJournal(download_folder)
+    hash_verifier: HashVerifier = HashVerifier()
+    if byte_budget is None:
+        byte_budget = ByteBudget()
+    writer: ZipStreamWriter = ZipStreamWriter(output_filename, download_folder, byte_budget, compression_level, buffer_size)
+    try:
+
+        # Download files and write them into the output zip file as they arrive
+        if print_logs:
+            print('Downloading files...')
+        phase_start_time = start_phase(on_event, 'download')
+        download_files(required_downloads_metadata, download_folder, download_workers=download_workers, host_limiter=host_limiter, bandwidth_limiter=bandwidth_limiter, host_stats=host_stats, buffer_size=buffer_size, cache=cache, print_logs=print_logs, session=session, journal=journal, hash_verifier=hash_verifier, on_event=on_event, writer=writer)
+        end_phase(on_event, 'download', phase_start_time)
+
+        # Write overrides and finish the output zip file
+        if print_logs:
+            print('Writing output zip file...')
+        phase_start_time = start_phase(on_event, 'write_zip')
+        writer.add_overrides(filename, overrides, compression_workers)
+        writer.close()
+        end_phase(on_event, 'write_zip', phase_start_time)
+
+    except BaseException as error:
+        writer.abort()
+        hash_verifier.shutdown()
+        emit_event(on_event, 'error', error=str(error) or type(error).__name__)
+        if print_logs:
+            print(f'Extract stopped. Downloaded files were kept in "{download_folder}" and will be reused if the modpack is extracted again.')
+        raise
+    hash_verifier.shutdown()
+    shutil.rmtree(download_folder, ignore_errors=True)
+
+    # Record what was left out, and remove a record left by an earlier extract since it described the old .zip file
+    skipped_manifest_filename: str = get_skipped_manifest_filename(output_filename)
+    if record_skipped and (len(skipped_downloads_metadata) > 0 or len(skipped_overrides) > 0):
+        write_skipped_manifest(skipped_manifest_filename, filename, data, is_server, skipped_downloads_metadata, skipped_overrides)
+    elif os.path.isfile(skipped_manifest_filename):
+        os.remove(skipped_manifest_filename)
+
+    # Show success message
+    if print_logs:
+        if path_filter is not None:
+            print(f'Left out {len(skipped_downloads_metadata)} files and {len(skipped_overrides)} overrides not matching the path filter')
+            if record_skipped and (len(skipped_downloads_metadata) > 0 or len(skipped_overrides) > 0):
+                print(f'Recorded them in "{skipped_manifest_filename}"')
+        if journal.resumed > 0:
+            print(f'Resumed {journal.resumed} files downloaded by an earlier run')
+        hash_stats: dict[str, float] = hash_verifier.get_stats()
+        if hash_stats['files_verified'] > 0:
+            print(f'Verified {hash_stats["files_verified"]} files, hashing {hash_stats["bytes_hashed"] / (1024 * 1024):.2f} MiB at {hash_stats["throughput"] / (1024 * 1024):.2f} MiB/s')
+        if cache is not None:
+            cache_stats: dict[str, int] = cache.get_stats()
+            print(f'Artifact cache: {cache_stats["hits"]} hits, {cache_stats["misses"]} misses, {cache_stats["bytes_saved"] / (1024 * 1024):.2f} MiB saved')
+        if byte_budget.waited > 0:
+            print(f'Downloads waited {byte_budget.waited:.2f}s for the writer, with at most {byte_budget.peak / (1024 * 1024):.2f} MiB in flight')
+        print(f'Successfully extracted to "{output_filename}"!')
+
+    # Return info
+    return output_filename, data
+
+def fetch_skipped_files(manifest_filename: str, destination_folder: str, path_filter: Optional[PathFilter] = None, print_logs: bool = True, download_workers: int = DEFAULT_DOWNLOAD_WORKERS, buffer_size: int = DEFAULT_BUFFER_SIZE, cache: Optional[ArtifactCache] = None, link_mode: str = DEFAULT_LINK_MODE, extract_workers: int = DEFAULT_EXTRACT_WORKERS, session: Optional['requests.Session'] = None, host_limiter: Optional[HostLimiter] = None, bandwidth_limiter: Optional[BandwidthLimiter] = None, host_stats: Optional[HostStats] = None, on_event: Optional[Callable[[dict], None]] = None) -> dict[str, str]:
+    """
+    Fetches files and overrides that a filtered extract left out into a folder, such as the folder the .zip file was unpacked into.
+    Only the manifest saved by extract_modpack is read, so the modpack index isn't parsed again. Downloads are verified against their hashes as usual.
+    The fetched entries are removed from the manifest, and the manifest is deleted once nothing is left.
+
+    :param manifest_filename: The path to the manifest saved by extract_modpack with record_skipped.
+    :type manifest_filename: str
+    :param destination_folder: The folder to place the files into, as the root of the instance.
+    :type destination_folder: str
+    :param path_filter: The filter selecting which of the recorded files and overrides to fetch, or None to fetch all of them.
+    :type path_filter: Optional[PathFilter]
+    :param print_logs: Whether to print logs while fetching.
+    :type print_logs: bool
+    :param download_workers: The maximum number of files to download at the same time.
+    :type download_workers: int
+    :param buffer_size: The size of each chunk read from the network or copied between files, in bytes.
+    :type buffer_size: int
+    :param cache: The artifact cache to take files from and add downloaded files to, or None to always download.
+    :type cache: Optional[ArtifactCache]
+    :param link_mode: How files from the cache are placed into the folder: "copy", "hardlink" or "reflink".
+    :type link_mode: str
+    :param extract_workers: The maximum number of overrides to extract at the same time.
+    :type extract_workers: int
+    :param session: The HTTP session to download with, or None to create one.
+    :type session: Optional[requests.Session]
+    :param host_limiter: The limiter for concurrent downloads per hostname, or None to use HOST_CONCURRENCY_LIMITS.
+    :type host_limiter: Optional[HostLimiter]
+    :param bandwidth_limiter: The limiter for the combined download speed, or None for no limit.
+    :type bandwidth_limiter: Optional[BandwidthLimiter]
+    :param host_stats: The statistics used to rank download URLs and hedge slow downloads, or None to load them from CACHE_DIR and save them when done.
+    :type host_stats: Optional[HostStats]
+    :param on_event: A function called with a dict for each progress event, possibly from worker threads, or None. See SummaryReporter.
+    :type on_event: Optional[Callable[[dict], None]]
+    :return: The path each fetched file was placed at, keyed by path relative to the instance.
+    :rtype: dict[str, str]
+    """
+
+    # Read manifest
+    try:
+        with open(manifest_filename, 'r', encoding='utf-8') as f:
+            manifest: dict = json.loads(f.read())
+        skipped_downloads_metadata: list[dict] = manifest['files']
+        skipped_overrides: dict[str, str] = manifest['overrides']
+        source_filename: str = manifest['source']
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        raise ModpackExtractorError(f'Invalid skipped files manifest "{manifest_filename}": {error}')
+
+    # Select entries and check every path before anything is fetched
+    selected_downloads_metadata: list[dict] = [download_metadata for download_metadata in skipped_downloads_metadata if path_filter is None or path_filter.matches(download_metadata['path'])]
+    selected_overrides: dict[str, str] = {filename_relative_to_instance: compressed_filename for filename_relative_to_instance, compressed_filename in skipped_overrides.items() if path_filter is None or path_filter.matches(filename_relative_to_instance)}
+    destination_paths: dict[str, str] = {}
+    for filename_relative_to_instance in [download_metadata['path'] for download_metadata in selected_downloads_metadata] + list(selected_overrides):
+        destination_paths[filename_relative_to_instance] = get_safe_path(destination_folder, filename_relative_to_instance)
+
+    # Overrides are read from the .mrpack file, so it must be the one the manifest was saved from
+    if len(selected_overrides) > 0:
+        try:
+            stat: os.stat_result = os.stat(source_filename)
+        except OSError:
+            raise ModpackExtractorError(f'The modpack file "{source_filename}" the skipped overrides are read from doesn\'t exist anymore!')
+        if stat.st_size != manifest['source_size'] or stat.st_mtime_ns != manifest['source_mtime_ns']:
+            raise ModpackExtractorError(f'The modpack file "{source_filename}" has changed since it was extracted, so its skipped overrides can\'t be read!')
+
+    os.makedirs(destination_folder, exist_ok=True)
+    fetched_files: dict[str, str] = {}
+
+    # Download files into a folder next to the destination, so they can be moved into place instead of copied
+    if len(selected_downloads_metadata) > 0:
+        if print_logs:
+            print(f'Downloading {len(selected_downloads_metadata)} skipped files...')
+        phase_start_time: float = start_phase(on_event, 'download')
+        download_folder: str = tempfile.mkdtemp(prefix=FETCH_FOLDER_PREFIX, dir=destination_folder)
+        try:
+            downloaded_files: dict[str, str] = download_files(selected_downloads_metadata, download_folder, download_workers=download_workers, host_limiter=host_limiter, bandwidth_limiter=bandwidth_limiter, host_stats=host_stats, buffer_size=buffer_size, cache=cache, print_logs=print_logs, session=session, on_event=on_event)
+            for filename_relative_to_instance, downloaded_filename in downloaded_files.items():
+                destination_path: str = destination_paths[filename_relative_to_instance]
+                os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+                if cache is None:
+                    os.replace(downloaded_filename, destination_path)
+                else:
+                    clone_file(downloaded_filename, destination_path, link_mode)
+                fetched_files[filename_relative_to_instance] = destination_path
+        finally:
+            shutil.rmtree(download_folder, ignore_errors=True)
+        end_phase(on_event, 'download', phase_start_time)
+
+    # Extract overrides by their recorded member names
+    if len(selected_overrides) > 0:
+        if print_logs:
+            print(f'Extracting {len(selected_overrides)} skipped overrides...')
+        phase_start_time = start_phase(on_event, 'install_overrides')
+        with ZipFile(source_filename) as zf:
+            try:
+                members: dict[str, ZipInfo] = {filename_relative_to_instance: zf.getinfo(compressed_filename) for filename_relative_to_instance, compressed_filename in selected_overrides.items()}
+            except KeyError as error:
+                raise ModpackExtractorError(f'Invalid skipped files manifest "{manifest_filename}": {error}')
+        extract_zip_members(source_filename, members, destination_folder, replace_existing=True, extract_workers=extract_workers, buffer_size=buffer_size, print_logs=print_logs)
+        for filename_relative_to_instance in selected_overrides:
+            fetched_files[filename_relative_to_instance] = destination_paths[filename_relative_to_instance]
+        end_phase(on_event, 'install_overrides', phase_start_time)
+
+    # Keep only what is still left out in the manifest
+    manifest['files'] = [download_metadata for download_metadata in skipped_downloads_metadata if download_metadata['path'] not in fetched_files]
+    manifest['overrides'] = {filename_relative_to_instance: compressed_filename for filename_relative_to_instance, compressed_filename in skipped_overrides.items() if filename_relative_to_instance not in fetched_files}
+    if len(manifest['files']) == 0 and len(manifest['overrides']) == 0:
+        os.remove(manifest_filename)
+    else:
+        with open(manifest_filename + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(json.dumps(manifest))
+        os.replace(manifest_filename + '.tmp', manifest_filename)
+
+    # Show success message
+    if print_logs:
+        print(f'Successfully fetched {len(fetched_files)} skipped files into "{destination_folder}"!')
+    return fetched_files
@@ -2,288 +2,336 @@
 
 # IMPORTS
 
-from urllib.parse import urlparse
-from zipfile import ZipFile
-from typing import Optional
-from PIL import Image
-import requests
+from modpack_extractor import *
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from zipfile import ZipFile, ZipInfo
+from typing import Optional, Callable, BinaryIO
+import importlib.util
+import threading
+import tempfile
 import datetime
 import platform
-import hashlib
+import shutil
 import base64
 import random
 import json
+import time
 import os
 import io
 
-if platform.system() != 'Windows':
-    raise OSError('Soup\'s Modrinth modpack installer only works on Windows operating systems!')
-
 
 
 # CONSTANTS
 
-APPDATA_PATH: str = os.path.expandvars('%appdata%')
+APPDATA_PATH: str = os.getenv('APPDATA') or os.path.expanduser('~')
 INSTALLATIONS_DIR: str = os.path.join(APPDATA_PATH, '.soup_mc_modrinth_packs')
 VERSIONS_DIR: str = os.path.join(APPDATA_PATH, '.minecraft', 'versions')
 LAUNCHER_PROFILES_FILE_PATH: str = os.path.join(APPDATA_PATH, '.minecraft', 'launcher_profiles.json')
+INSTALLATION_MANIFEST_FILENAME: str = '.soup_modpack_manifest.json'
+VERIFY_CACHE_FILENAME: str = '.soup_modpack_verify_cache.json'
+VERIFY_RECENT_MODIFICATION_TIME: float = 2
+LAUNCHER_PROFILES_LOCK_FILENAME: str = '.soup_launcher_profiles.lock'
+LAUNCHER_PROFILES_LOCK_TIMEOUT: float = 30
+LAUNCHER_PROFILES_REPLACE_ATTEMPTS: int = 5
 PROFILE_ICON_SIZE: tuple[int, int] = (128, 128)
-FILENAME_UNSAFE_CHARACTERS: str = r'\/:*?"<>|'
-STRICT_FILENAME_ALLOWED_CHARACTERS: str = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_-'
-ALLOWED_HOSTNAMES: list[str] = ['cdn.modrinth.com', 'github.com', 'raw.githubusercontent.com', 'gitlab.com']
 DEFAULT_PROFILE_ICON: str = 'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAIAAAACACAYAAADDPmHLAAAqrUlEQVR42uxbA5QsSRbdahuFjMjIb9u2bY9t27Ztz3Js27Ztz9F69+Ptuyfyzeb5p7orsqb6a7rOea3MyIx49z5G9O82wk+CpQSS7WJRUXFtaWlZn4rKqoU1tfWH1zWkrmhMZu5OpfUrac//LKOCnzzd5m8s/2VZE8p/8Ddcwz24F2PqG1KX4xn8rAV4ZlFRUW0Tc8Jciu3cWj8tBXpxNtBLSsu6V1bVbFFX33hOMuU9mvbM1wzmSuW3JeW3I3wX4b87SXSMPAOE4Wd/1ZjyHqmtazy7sqp685LS0m4tS4bWT9HaoLMV1pVXVM6qq0+en8r473gMjjbtWASoX4BezbIqIqvF4psEX65nH0t4l4q8D7+nMvptJt95PKcZPLeaLGQoaoUx/qfYSmj+RUWVFRVV89glX59R5gcFqxTALXArIQBLAG4hWYN3yPvEW2AumBPP7Xue47U81zk854os62n95PiURF0nx93ebF1nwa2LkkMgBASxalpPIt5CyEdCTp7zlxwqTuc19MySvzT3aQW+vKJqBidh94q7jYK+vgB3J4SQoa2EJWpIZu7iEDElS07T6uqjMZKz7SXJtH5pbfcuMXgjE/EMkkxSMq2e4zXObw0NUVdogZ+D0kuAl+SrxcDxmxDdMiLrkXyBSf48e4TpTXnATd/dS4wvKx/AZdVDAry4z4IAbPh5QUTwu4CsAvI8lgwk/FkFTY/1IYUlAjxCY9K7F3lOVDe/CatPJIrKULdDEQWxeIAjYOFngNrgk1ejyKvyyKvm73WavJSx97dtT17HDuR16WilPf/chnMNxdcajb23Khxby98bfUsSEyVTYYgA4WTx1EQiUbzpeoNInGPXNy3tmc+QIEnSlB/oETDSBkABMAtW546kRvcmvWI46QMnkX/GbDLXLSFz2+ZkHtqazBPbU/DsDhS8tCMFL7I8swOZx7cjc/9WZG5aQf5Vi8k/aSbpvcaTXjSE1JAe5LVj0tRr+w4QJCOEyJ8MsnboIp3xPywrrxgX1dmmYvil1uoTRXUNyYvY9VnwdPDffCxdQAfQAAOWrnp2Ib14KPnHzyBz4woKXmBQP9qDgq/3oeC7fSn4lr9/vTcFX+5Fwecsn+1Jwacsn+zBEv6Mv+HaV3zfNxgXjsXv7+1O5untyVy/hPTBk0nNHGg9SK2GdwEBhQx5VQ7QhRJvUN94ZlR3m4TLRx+dGf5eaPWrY2f1olxYHRQO0If2gIWS+ctyCl7fBUAJYBbYD3Zn4Haj4N1Q3ovI+7tnkch1GSPjPtzdkuTr8B1fMFGe35H8KxaR3mYUeT06gwwsCmEkL68gHUfoKJXRr3OLu+vGHBKK5Ieq6ppthd1gel7Ai7V36UR6h9EAHaAJ4NbaBTgB+IMCC54ZfQc8BzwF5LVdLBkWDsGc7VzTJi8iQEey91BZWb1M9AnZ6OI99+vPjTRyVsYFXhI5Nawn+SfP5Ji9E9w5QIdVthTg7oQQL/HxHiAC5kXmsW1J7z+RvO6d8yaC6ArVUW1dw0kbUV6Q+CXL5/LuAYAv/flYMT7pw9WTGtOb/IsXQOGwdihaQHcAaT2QAfNCLoG5vrozchJSvbpYInhBrBxBNqSgQ+4k3prgj4SEDTrZKy4uSaYy/lsKyZ5yd/lQDpQEZalB3cm/YD4Dvqe1+A+gYLH0DVzej3gFEIHzE//IqUgasTbpMzgTAToECVJp/QJvMFWLoW2o4Adpz3wu8T6O1SOBQi3uHzEVCgTwYlkFi93uUoDQInNHfvI9E+G5HUhvNxp9BoS2mN4g+A90mvb892BgQoINDfwODP73scAXq4e7nz+Y6/PtoCyJ778e7A/C7P1LKe32lbLQyjf4LiLXUTKyINOHFQuQ+YYejH9nN8wDzydzwwrkNLG9gSSHrONPWdfehkACmQDAb5vxzA+SvTotqE1b21Bpy1Z/9lwLEuInlPV+fqCDOKj1oWiAi+uwPDSA/MsWkn/CDNIHTSK901jS244kvfUI0tvw9+1Gkd51HPmHTiH/lFlkrllM5p4tkXQi2xeCoE+AZwoZ8goNSBTxu95ngvUEKSSJsUnwGes8JTnBes32MRHsfTuDLy4fsX5CX2TNFrD34ilVQIeLRX0OgEAec+cW5J84k/Tmw0kNZ0vr0MEquTbS3q1WWcSTa//v9HXtRGpcH5Se5J8zl8xD2+B9mC+Ill9uIkSFN/jjsrCHgPAXjwToqxQVFVWtr+qgKMz2S1MZ/Zar2xd3ByXrXcbCuqxVvbNrPOAhGAcg3t4VbV7SO44mNaAbeenAAl0T6eGLqw0cReYpewpCEr+tbTHvN5HM7ZsLGbCOWF5BwgK8FLyMmjYA5JNy0ZUE2F5+NorJOvP78gNKPWT7zuBnDHlJQ/6Zc6A4ATQW8HChEPPA1nCjpPp1g8UCIDxbPExBNm3WJg7+BkIALHgVNao3Sj2EGawHpAw9guOaJDf4bC8OQWNBXLwTRHMiQVgi3hghQGKdbeeir6+NW6kH5QEcZPnmD8uQ6InrdI2dyBEg6PVjgwYtVwFCQBLFtaxENoCEDCjx4NHMw9sgFCGXcV6fGADG+cdNt2RWeI8zCdAsOlGwWScZf1V17fa2yROsdAFfdujMvVshy3Z3+e9aC4GrRCKn5g6ySq9VeHbLgu5OBulfYC62Vf3kdvAIUs24l4w/7Mv9j3lWXypwIcEa2T+oqKxe2MIbSLKxU94f8Ucm4AR+t05kHtmGgdwb4Du7eygR27Z665HwIAA+uuu24YiEHR16pbbtUVEAVCSozt4AuoF39C9fRF4qcCWBbKz9q6SktGNLJYWJcEu3LO35H8khDie336WjBf9rAd/R6r/YG/v4Nouv9iJKLkBMX0sKSgbMEcBVeqQG9yDzp2U2LHwo7t6JBChbYTwy75x7B8AkldYvRzEruPXzmfcrtcmd9MkhDVgCDlnEAB/uHlutcPfWmjJBfsD7a2X1AAVzglLrtGzfWvGCQnsE5Dv2XfU+6T3HMwH2CCueGCQ4fx7mGiaGjvlAfeNpglkhwcfBzblKNndyLV6xpAMyf14O9mNBbs0c1Ma/X4p8AWWcJFvxQceYlJEjYQCB/85z540ZNaIXqWn9Sc0ZRHr+EIJ4nTpKuZgr3sfPESCVHspHnDqCPhxJEOYER0/DGlzfvQaegE8WjRbsCuL6ueFQnVHmG4k5uRYNxfvnzgWLAb5TFgzL94+ZjiQPlhpP2WLlSZuVo9+u+nYlvWwYMms0XNBwwsYMLBFll231ouX7yV6kBnbHWBCoaVLXa0soFcRPPuENML5de/QspApyyoVAGL3TGKzLpVm0SppEkd3DRCFKvgvhXnJ2+jDBKs+6vO8cFokFfmRdo96RF1kZsz8uJKm13Ts1uDvpfSeQuXkFBW/tKkfC+HvYZsa7oqXlJ3uAGBYgAOtnBx/k0NuOJr18GOYm5Wc8IgQ2LILg/mmzUQ3l3HCSa2g0qcn9ELbwHKdQUFPbcIwcvv5Vrd6ysvJBYJVLxo8Jqqn9YWGygGbBx2YLtnz10qHkVcTohEmDBxaZCXASB5aFZzZzSmgtZdumEk4XWa9jmrH+RmNL2J/3JxAGO5aqT1c0n0CEWPOWTqh/+FRYdy4SyBkD5EVoTYNEuQxEcFrJVUGnvLuEMgj/ci1n9puLvQACDZHg6e0xYUw8p+UDfDV3MCwfVuhebiExShqc+rWbNgD861inhGTLGV1JAILnZn+fFxAqEfPU9iAsrBEkg4dBlYJQg/lLaHCuRDBGHzBZSJAzH8B95tolWDvGO1QF6BKmbxRjzjfxW6hdEr8gjPs4vfNd80mOAAMvgY6egO9+YEQR3KG5dTPkDTaWi6V/EG9TBkDiYGmTSZZv8wqUc3I4NLIJJUSAR7BrqJXE1Z0EGCvh0mm+u49zTQpXhwnh2Lx7A6mMfjNXzS/g6+XDEXNd4j7uw+EIZ/Bl6xj3YrsW5IHV57tHHw0BasFgaTBld9m1GhUD2tAY0+SBD4QGNWsgvImMdSNBtYIXwjNyGQ7ehXdK0orxORPCxpT3mHj0WNZfWfW/9s4COnI018KZTnPS3ElVJRlmZmZmZmZmhmVmZmZmZmbm3cwsMzPvTnre/7l8j+v5xJKcqsk25RwP9aTKtvQLrq6kwXM4/bbpH5Ppx0cB4PCSXC1G6xE+gg2Xjvff5r6RD1/Ai1IQ1xVbR3/PyBlLJn+Z+u7mlfslE1xxSsfzvP1HbeJJ65FHkALjorxTKkvB91MjwaKZzyVkMUuVF9kKICXAFdCMU9sKtHl96xppn15QA8YugkWDXZ878uKTCz/Wchs4OSFkCPhfzD0vuzuWkCp1gDKfvxTlrcYARvMT+tijcG38vg9fYw3edCZ1flI/KbkPminO4L6+475H+A6KXXppBeT7B05yQZ+RjLZNSRThcHNuJMsDZtDukB3JKrVCUVoPPdwurBgvSiYaUy+WEO4DRaXbB6AqO60t4xkXcTpP5eRFoVy+h+4kCCm4R08JFNhi5Yp3OW6/S+hzRfrqxQLrRWMBRf6Nj7q+fyS7aU60b7rGs6AP4oMCJVv4jcwstsGkX9cpHReMGwTGfQH+UEIGEGqeu2cWQNLr19hq0/bpb1iI5igvmcwGzCCsgCgYJ5kAsXHIdiiBG+vw57hFyCZeUMjnY2maNx/kB4TKCJb4GUF/3rK9i/J+T/iNw3fgQWN+/2FHyO+7Zp9TR1kU4cvkx6lWbTYxKVPznD3g5aNMonthlgmgMLt2DUAp4EYqY9MSVoPwoaIWccaB28YsgTCHN56pILdS0VFI2EQU27I4rOXiAv+hWmi5gpl5N89zGgr+vNP/8lNV7rTMFRg4WLxvrgQjP/qosPDlezntnAxyc/oGuT8+C0GXC0P8e6TAIiXg3kEB4RvyPQiWZw4rwdevINhE+XRabbe651bp96+OpIWUnUNWoI0OLnqIZF2B+fcvTMMSfyPNqfaL6fQftF2u4WZghILQuavijg8jX3cA5q3WC+a0tJ57IpxAglJF9X5OHm/O4P5B/VLwtQcuIYbi6R6xHJ+6CGsiBpP1HrCUin0cK3ANdDTiKgWyJiaQAvu7J68RKPWbN3CGm/opMn7m8bwEbtBKWSjEuCmLGkPIo3Ep6tiNlo7pKUBAmPYOUmfP6/zKSijqtB5/dCfkHAoMCTpRAD4nnFoj5HEnI4BP6GQECgbnzJl3YCkWKP4lEQzfagV/mE4eACImbNzM5447gd+B22ExDKw9S4PAuRnW4GMJxYMTndMxzMP3TvCteAsb1UYFfNyTqwSUd+88hBMes4bXOkW172TWhRgFpXHhYVx7cvHPLQ59p/nv7x9K5v/PhvkXMEL0yY05pz/h7OT8TgVLaFvr+SeGauUq+FBRw7KgPLywnrF++Tw/NpCQSPWgrdEn4CqBzLZzKBR7YGlInTkUdlr4oyzD8uoEE4yuo3WP5t1O2Sv3Py1E+Bgeu2/kPecKg694UN3U9ropB0beTalkpD5OsyWnXgKcOktouMT7HxqFv+gqgS7h/2QajJ3xlID75//h/fEeXUszP0sLFRNZ1hD2kOKsSH1gv07LL7rXyxT9O8Efph0hGw95HWiYePpeng2oQbYQSifp+uHFhDn/EniDun4xOArBEzw19m13/oDHj7ztbCwQeAH/D/cWJns0tt4U8Md/jm85RZ0SyRREcfRLl6lPcXKr8r1wSvjfnEb+mE43ANlzJk2Hgn4tjYSi5Jp/ApML9pJvtjX8JjQ8BiNnRMkFPkeulFZycfppO4d7wDNA1iSCVgu6ev8wt6RgKAbWi/uMWgJoXyCMBIYIxs7hv3gpcQ8C497kiooYY1HOWZy5PAFix2EhXZfbPHN3zwoADdNR9Dm5AM3k3U5U767Mvx4OjH1jaWN1pMv/Q+DH7zg+rmDuDIWo0qJxMcOH8S309SkzEWkEYXfCxqoZUNjBr3N/pUKRj+TxfQjDtQKQPm8/mENCPMH38M8IEDIt4BGHgyIRyoJSuQeEzMxRgBWikKeezhEFgTR6XNZ0zD83SMCjL3X9kX/6ae2K1cIhjuy/rXEijWD11zdyejDNque7pBF18YLIDa+/vg9glVPkZ5kpsg4KLgPFwVUCFOGK4FQo8BOdDRPvBZf8//wegaOJCWjqCBPNJX/8/4vk/60Ha162jx7MqrFD9LAx/0Y7IBv50AUIhnjC8vu0ddcjjszLlEtgTRy+1SXyB2ksrsC3AuWUFp9sWjYJDWyA2AO3o5kFivrjgyqUdl9DjKYMw0EFFz+8Tz/JJ3zR9f+DaPYJUgAzGCl8W1Xal5TphF1QFh7QfEGYYh/pKgn/mv14kWUeoK4YUZV07TjIIrzMmgxgrM9V4hA4RTKIJkWrebzw5TOcTI4AK3H68v7+Rsr/fy8fYWk3flTFnyrYF3Kmn/q5ZlIPBDSsIlJE+KBiCJ+XOGXho3gQTc0XaVxq7oTAYlo4rvhchAgyCiTuYS8TOXX8u+ABifU7dy8AAkPw+ChoSAQvQv8qBUbeqhdnBn+fU/Dn4NwFYcPFz5sX7Y1V6Ur4CKx5yq6+y/FjEKaK+jFOry4Fy+8/z7s/HfK/wxpmkONFpvkXL+5YeHGWyXYRKX0WplWfZft+vytGwid35zOlQPVeHDAtwoeoelo94RtBM4Fdr8fReZxB+A90QHlgFh1EUMUO7UugwGPxCfgGU5uvVcRu+P+vXHbf8JYb68srPsuvdHHxMOTVBmdfqRf5L6lpbp0i7diTzBSiP+GM3boVfqmhJKvtW8oeH4UjC+VmA9dCelEgaOIBKfu7sg+miFUAUgYAGxfzCsulPFKNwhAme+Sd54AVuIQHJnIrAKwqcMD3x104Pp8Ti+UJd9+Ko6C5RNDLm7ce7NTru3ADtzh1E2sCKc/0YxQ0H3b9tcuVoZhxANYQmXmAEDuN+pgz47kATDrQ7thfbynGrXVcAB9jf7uV6hwBnu3/N5L/v8aKJRi9IvNfmUkQqBGweSXZcn5Pu3rzsn2hhnFKNWa+p2VkQecMwtKzeoLn0kAMzUkEeIOUCqeisf1mgs3tOOxWlyqGAkATe01f6vf/HkGglQEQhNGg2HrQoYmBcjAlzf9/8d8eelhK7XbWizRIpFvRoOn3DZy6m5Rp8s/ZDwJlXPgEsJwi9gVkCN+cIdXmuy8lexW9T9oVPblQgTmt55wAKASzCYvKaSZ24iBiseRS/G4nJxNIXV8f7QulgGrAxD/Or7j4M/x1yzCJOrVG/q8sg4dHmchCJu3W2XVLt3RcTlFJyyiY8LnMJ7y/x8vIesJPrKDO6dQzVoYyMTAwio8AuU+9O+6Xz6IeorpAlQsA+kZh7NJwmyH09b70L/+KPUx8vJqNJu6r/H/q6Z+whBeepJfhwqQMcGKCd3xMa3BFjRsHOO1f4+JNXgBFHTc56fvU+4OJVPn+1PD6OqvhVYc9Gz37o77ea74TFN1e5MYmw2XY7UWEkaPCi98CdvROWClOUvdCR0g6pc3AfZ69B4pqZlBMF2fziRBUV5mM9wd5NcIUTtb/19OsAI0UKxzBA/garFiiW/8qv0hQWcQU8avYS5RX65oEsigf6ayKLzZ9/sgd7AoqcczXrqDlPI9L1jUOkJFVCAx6XzpAjRAY9OfpVAC1WRkmTETSU708Vi8EgoidZsnEftzqpDG4gRodm04nfQZArZSwGWI19sebYTNJsWwSjaGkwi8au2yO4psKwAAMVwE+eF6UDf2fPrRhWhXgcb1QAGUDtFP5aZZYSrCH/f56dSeNcoroS2RZFAibVsQAYYN9cKrBNCS0KgUguNM9xgLfkWlTgBV9wVUuYq3YV8t3AXQIlRot/akdTqqFz8sQve+4vDnSP+IAtzsJRaE7aez3N4n+Xa7WCf4GeZNiTdkF0DwC29p1AXcEYqj3nBOdfPZfFOAfIQVAMxHKkskvTqOD3PEA4Ab+A7zTRgH1chHkUN9SMguviUJIIcLCEuEOKjMd/hzXAmuHky6hV/Q+wGieTGEVBFJcUuprBoHw/1wY/S4zCOQgMFU1KVLI1f29bzhYCm7stlXWCdzYs+Laexs4+tI8p9f+ejMnzrpo1hezpYKSDYI32KCwxOBoXqLrBvhs4NTG7ltpQ4mEXoyWmz2U4NtYFU+wMsjmJPerZ2YXAZ9n4wCfNJ65dhoot+RmAb8DCfxxpQKIuTuaM3d/dF2buXJP6YII+asbmQ5WDUH6p4FLbeAQOMuj28Tu5TuARTl5+HashoTvQsGYbDh2jR03U7OoBlImZu8mwKh8pldS1p/z3YBbk8QsEprmJ1xvW713nK1Wdad/4qSugSDJmsUTjIH5ijMIgpeDWa7wY8Kgr/fxeyDcfex5AtJiXqpGt3AJSQTAgOuHaRbli6sWcQIz+fGLGBrJ+BcoZ8QRgot94Zf4D+r0qSgLk9ZWK72EVgzOmGp1UXIg0wpBwWxs70vUoPdKAcwhCa+o6gSWL3Q0T8Ug8eVQAqsY9KDDeAjMYm7uMx4BrCT+XEHZVEuson+j1NoAUmeeL79DkIhV85/3i/7zAvBYRBpcAzAxisu9W58FEYXP8hQgyf7dDIF8gV8Odn2PEDwz+pSfJUipitoVyLCRQ1RpzD0YOJqvebvdrZATb8BnCVcEflgM0ErhClMnv6j4dZqBJ4iVtT09mQ4ri3LwebFycNYnODC46M4QIeQ65Z/dRrINNnMbM3cUsV+V3EXq2rl6f/6/+ubeE2YXlgMLBvFFk7rMg/MEDo79rCi0Ma5W6STd0xw0j0hLCdolhCDzgcGFt9ETeIpPCWOtm6PJXj9gPBDUi4FhJF58HUKF2DM65b25lEp+T2NbOWE2VE1Bi8KWQCA/AHRSaHYQcHC+fjnPVsHKulysLHdeAHMgGQmzPRrhkUIZvhAhhcLHN30ZN7a50++mS7X+8XCAp7XxACuRVvP4pcHNF/nzDXX6aY+LMJ+ZX2T5bLkTgrti2BXPJmCqsw5wHplSCARiqztTQRalnX+/ECnEoDnDpBHNuco3euNM9TDxUm5MOApE+XcCKoIvhkNpXH13gocG9ys1pgYLSmRO7z4nZrL9Zg4pFi1joKlwG0QX4zPIirCqfpcwMm7vHvxpmgK/oC+fB/xxBYJOY4iEZvQFXmJ3qYoYcpZRIq25lROlRPjMLIIowunLkMn1NyBr0MClunMFNU+Qog90N/iMsmT+6YelbD2fTux7CZzj/QbCLVCWxhE7MCdB8wWh7LG8StbEmx344b6ONe9PV2+g5YP4cJm0SA5fAQihHLgVhkf5jRP+AkYqfVTlsDxkDnyHGi6psTNqRVM8IttHNVeQPyPaB76mO8md1N2Zro2qTO20vTVvMPooLGIOysDzzs+bSY/biQMK5U7FKbtFfNGSJ0v+jIU9O9QcuofN51O0zpbNchoyCZgDLGu0Urvmnt8DL6AmUOTjXOUBjDS1Ysa/r5igxL79XrF9lDQLKJWsh98jONP6d71Up0fBRv7KNPrN3YAttrWM9zror79RcygDQYoJUbNmbeZvAou3h4ONQ5pQ73sZu4eYiU+tKXxBr5hWmXt/N/9YphxkJ7x0pV3cp8q7RM60tEF8JdfWXEHh6f60MX0Ppp9s6cegie6wC9JhTvD0UdQK2U7QFVSeDfzt0ICIhxWMHpebjonSsOftSmBOTd+vU0PrE3sCMl+IgMZiwuEeRCHjtKOkreeeAF2LtKlz+6hOVp3NJcQcPCPKhHJJAQwG0OWMluks/07DpXFxza9PNiDyucERMbZvU0WKETFzWAFTC7t36eKtBHMO9S3B7McFVASyKA9CJ0fn3zVM0tk+6q3Hy8bNQDzVnCBvIxhlXc/3x61P+NKksCVP75S9lkMcFxoS1Rgj13RHxKLpFEoAORjSUAu7d9qpaf/G12rqZ12aNkIX+7arF6zVcHAT336OaiVe+djfU1RUYrXWLr4LOTY+/ggNieqcErqY+rB8RS/anTixxULlHjZHYglupeChLV41lSAudHcuENA3B4J78voUZB2Jg5xcXUgiwzb4u5pDeF7HPXkcgJFfpfx/sDwtFE2gT/C1aAimwhwUub2DCtbvfdf/G2yhyrINhidxT5xqPxbo7cRQLBCQMLEEVskXvky/U6rVd2hQ5Ngfbs5SytaTj6F0ncczDZ5ZCh02/8g2TYN5+WTzgvu1I8h1AwKFniNQqGuzLqIGEX4ZN3cjaU4fY1xE6uheEXwXQmoIcYR71eDoUE8i8wEbqiD6o2JRLgJfLhQeRYOY03rMkWQ1pNPIoo75ZzbQ0YXMy7uBZ8yYv5wFkeFh0ca8wDiYw8mAEsUMAvL68KRwTh1KQ4EmmyO00QYoAkHdFH2m7Y8RPi8ecgzKJ8sVqSCS8yvFDA2LLsbx6ZB0dDa3F18QSzRvOqiMujpTQtcppoRONi4+IURPEyjkjDWHvetU9Tww5zqBOeqJg3wC9z62dbQQAC+FE0OWwLRPmUkEZ4+Kb3H5ECy0OKyeKGh+XFNaj3fI9jxfeFw8gJthMcmqknu4yXEp5QGR9l7hGfnMwO3dhRGjRYm4tgJw82ixwJzdCjBHkTEmFuw9qgRc2gTKqaHS2HrCMWDlhWLxHSgEKRsnhu9r5Bf/7M9IpK6gvUX1Rs4QyA2EFkagAJqf4COJX8zmMYaQRGQ6c9bsLSRrc2tIKhS8T8UhdwIG7J6gEih4o3gh7L4M5nAKEBCnDgWREtRZGSOfibDUbg2xpHHkjpBNqRS2FQNLx9/B+Rv+AKoypd1TRkw/Aywie3817YTGD+7dXxnjUr9KSySH3h7ZGaRg8CgnGCyxVHwFUPWLkqpIJlX7+6UEcNuZfsnD1mYDyWdq4EKx8oWTA7cuATcX8Heujr4841kPy1fkjNtAD2AQJjqzQAPxpVGaeWCWwvlu0cj9oZBC/9gTcFBAAYrgIDFGv+hZAdX2IYN6Wqv2rNaTsuEFXpcun63ACyYMVoao20m37JErGq+iYQyYZ/6ZoDNDBwftFbIQVEc/VUHKHC9YuQRnuDY+L7o2js+mOhpdG1ceA+PMBv5UdG1caXy8HwziBsDAqba5xR0e7Dc3phm5h0QXR2pbNyVmfLsUzbcGjlIIT9A2j9bTjPG2TvqLUqJIWBkCWNwKtYHQ8zXzuUmvqrE48jWn+a1zUoCs8jf/WCv4s6zAVzwrUHT87OtO/ZYJ4zSjwdGJXHr5lE7FJOL09oYd7OzhM2heygQQPITY5nl7YbEEM0eVm4ZZP+Ad7yDL7qIm0tDp/4xkOpXl0ccH6gNKXwjavK0fehDMKJBoLSXAR+NyqOphZnnxfE5ti+BTs+yBmVi7DJJuuyX2G1JRLPYYeMIv9/qhUCEkEXRQQWUU9z90qsujZ+QZwYfQJNcVIJzNgnt/+DNMJnP5j9gxvpxBHcqZr16Pl5F88sWK+DnNzmBopz7vRNXKfOh/YA7wyItOpj0dy4Afr7c+fi7bQA7ic0Lr47F6jI7XHCYf9s0aP94REb63SHKHyC4BYQNEvqBU8rOeEgB4gCcoJgiPZW9kTB2CJ4gcoHN8L4LEpEuwoaYPFWmKXn9DAZe0GNmmCB9fHy4jC5nk94iDygOtvV4EXKDWzvmkj3VXpLx/cyf4i7kC+GNtdHD0Pz4lilzW2XNTUgIekEULKvGGF0KIDpWdwFHQNlg2sJdJp0ShxjrwPfpOIZG6dJ/w7e0xLQVYI1dRjzQylGc1j8l8vqeY+jMUG4Vz1+5yIaN8LcwjchnOcmTsB4NpqvTchCP/ZLiTMeSlhs84PoTkKTXDn+IPeUGGOTVIE2LM5uth9qWraD8WMFCEIYPA2qAMWekWt6ELJSH9grfQPGfPCGRbf4Q89wZv4CUnC0wKN6DSUh/3+9kk8HsS5t8fCP7iViAFE0eqhSxSOEHb6WQN8fLHi3VwLKOmEoa2uy7BYMxySnlpCBMYF/MJxg5wxWzh5kV7pWGM+9DokazPnsC1BIHU931wJX4/XFg2CLUEriW8xA/6AM68fN/YChZO+yJKQCPp8+QKYuDGBnD4ON2+EhQgB4EdJs8jfBpXxT5A/LsYQQOlC4XjlE6JoVs1xAJX0WJ5BOlbXkcICx/rxe+rYBUx/dC9ntRj4cuMaLtY625hA57P44WTGWQI10/DSkAQh0nGnwOqICDP7Eajb3vgZaR8HA9QKf/SVo9lq9d6/iss4SlkHHyWG2Aq6mfWQ0lmPf3pz6uF2zoU8hJbtoX5TebvwrglyIKjzCVQzMFk8zlqOdOpXnmuYs8fgidFZSOYBk7I38eF/5JTVLGMKL1isn8nqvfGTtrXtSEgomTJxIUuZ6CsBFgCuHOKCeKlY4I2UjTcAiaRIFOfPQ00MNfNKBMh9QIpFEilcTfxesWvcyh5WVn4PtxLl3cho/v3RzTyZ2ZK0FA84FKnMeeMSylSxPE4eQQXgltg4SPMIU6I2D89I3rWJZUuaQmLIJiEL4CCo7S1nk9wMulhpuCNqPCV8i15jOf3ex4PiDfQhopjSoCwEBytY6JU1SWNoghUFVkoQXrEYCcsAiewGP8uIcWVIrpcWkLHP9M61nrI4Ww20+bRGrC0eAPXEByCahb7kFsx4ad3T53/jYVcuKbnZ0aOD8xKHUXfyGMCRwlU4h0jCueBVZKVS6ilCJrtQ4cNBSJSuca2myIYpX9YHaV0FYGfEwwOlZZLN8cQOjMQmNvP/UytHjGe+XviA4pIsH3j+5Al/KzQ0/xsWSbT+dOfr51bTq95WAmKKhi0aoI8rW/hqs8r/G7R40eRho4kTiU7ghs7bwH4QrlVtDAuCVSdQfp3/RkWBWSRNncAJWbuwGMgpZXQtaCqbs+DYgLcIPMLsGAub6B0IXwInncnfv+AGfRNgzeYmSvBeqmp5DdBJRBsTFQPHYuhBpwGrEFXhA+UAcFo5SpKgoIRQMIsaj3ksOz0Ni/cOwl1j6yq2Dxr9/TvezETmF29+OH2ruG3ncUOZCBllKsw8RLid6Z2nxo7C60ca8Ul9xI9+bB7OXjT6ffdzCClIBukSSO/5ga50Vr4+EA2N4gGCMUGfvTs9Pnzd5WdeekIUDuOBP+SXUi4xZ9n/w1aF7y+clFpykMsRFiFQ8k2NKyNrGFN4f8gCX/YF/70KwGWYIyaQS0laBWED8w183J4cdr+GVcEXynKV+V/9yuI0ROvIRZU8xiwQaBqsIUc4Q+1vpPe8dLC+q5UP1KC/uUJkUqBYSxF1KV8mpMB44V8WIRO39euNJcEj5lH8JBDUWrmKBun3o/2YfbQ07cSnHw3JgAynpVSxPfkdQPAohW1rMGSDOxh3h3+OH+Z11PS1elcKYXOpbXvTClrPfoo+JJqW6uLYE5omsfiJUOvL+MwK/NPf8fsoWfwAEKsaoMti5ooAlPKmVRKylSOwH1T3ZPLDz4JOokpoJjDYia6pzSNya8LUglhzUGeR5bf7SrwU+SkaT3pxfgvPy4wyqlZaTcjheJHSfWo7UsZNE+wlwrhB5jFXCHST+r8DJ+A7s6JR/AGU8j392RT8+Yzx0fvk2vV+llH5ophlKmKeE+zIJhO1FQEIYlC4aivM4ACzgHmltOHm0AhNICyHNRxiYJVcRX/XynyB7Ejm5DS0VzCTETSRwAolZmJe6YES+u98I6o6iU616Yy+XURvpUxOAQ1nLlw8bLnZdCxrIEbGxjsnw5IFhoXp48cHoQO9g8CI4BU2sdpBT0Ea8BPk5ahKLr4b+T5pH862VqLi4Vh5OvIa06/r/XAQ2Ez016G0AVBd1OPWKFTny7q+U8ovbvV4UeBC8yi+UemVPHHaLr8XddFmWVC+hpiJye27jb0HtDPB22bxgvG1TBhs43df+ESTnF+XQIGwYyfBACdzcQw1q8y2wiwiNl7sJTEMiIuIajz5wrFfT0p3nhi8uy7Kvr72i4BjiHMFWk95o+rJ2PSNI+YXLuAd6mySWigj8C8nOL82pCKHoIEAtbJVk0Bwas827NZPTl/j++cGFy4+KHrpB/P5K9u1oDYYMelaWQpbkG9B3FFiFbxSkJr5H1+Q52X2sWd3w3fgy/4vGP3HaJueyneamsN1IFEGxqK0BOL4CpIxXX/fN8KFFuEzRzU+VTq1j1Ez89Z0Klf0376ld6oIZU9NlIE+UllDavYNSEfz2nP+/Q+kZT9mIrnX3N/yn4vDTI6asnS4WyXUQlIKlDFlfNaITfWce8TydS/ec6cuQeUcBIvyFurCBBQ6UpKWcPP21ahrAzZKVvxPxb4hO5Fp52Lql3qznlkqpJuulbwU3MNelFML5vHCDvmGMI74AWX3YRO3v2sECukfIpRdNK5p6GkqGkO30tpoqEeUvU8a39qQMrlyDhVxBYmF3FMalJ5TkLMvkUTJALgaisEV1FMEcIma8HlCJhrovz7ag6VwDU8I93DV5OVeipt2One5pct2lof36OsoeIUQUTZZN68gTOSEJ6SUsqPsf5GEbeCL13Rk178DleRosJ1SFXOD6YCzeOTRTqpf+as9SvcWP+aFtVPfwpZkTOzAynhCzulQsoZgwsWPTCZ5Bclob0/kVe/DncxCZJdyX9XQJlfwNJ/G06zkkEpOdWpt/49tMKltXp3pOzkZOIR6vHG/aySQv8/+K2t0Ar+bHYAAAAASUVORK5CYII='
 
-DEPENDENCY_NAMES: dict[str, str] = {
-    'minecraft': 'Minecraft',
-    'forge': 'Forge',
-    'neoforge': 'NeoForge',
-    'fabric-loader': 'Fabric',
-    'quilt-loader': 'Quilt'
-}
-
 
 
 # DEFINITIONS
 
-class ModpackExtractorError(Exception):
-    pass
-
 class ModpackInstallerError(Exception):
     pass
 
-def escape_filename(filename: str, strict: bool = False) -> str:
-    escaped_filename: str = ''
-
-    for character in filename:
-        if character in FILENAME_UNSAFE_CHARACTERS:
-            escaped_filename += '_'
-        elif ord(character) < 32:
-            escaped_filename += '_'
-        elif strict:
-            if character in STRICT_FILENAME_ALLOWED_CHARACTERS:
-                escaped_filename += character.lower()
-            else:
-                escaped_filename += '_'
-        else:
-            escaped_filename += character
-
-    return escaped_filename
-
-def image_to_uri(image_data: bytes) -> str:
-    encoded_data: str = base64.b64encode(image_data).decode()
-    return f'data:image/png;base64,{encoded_data}'
-
-def print_modpack_info(filename: str) -> None:
+def check_platform() -> None:
     """
-    Prints info about an .mrpack file.
+    Checks that the Minecraft Launcher profiles can be installed to on this platform.
+    Reading and extracting modpacks works everywhere, so this is only checked before installing.
 
-    :param filename: The path to the .mrpack file.
-    :type filename: str
     :rtype: None
     """
 
-    # Read mrpack file
-    with ZipFile(filename, 'r') as zf:
-
-        # Read index file
-        data: bytes = zf.read('modrinth.index.json')
-        data: dict = json.loads(data.decode())
-
-    # Get metadata
-    modpack_version: str = data['versionId']
-    modpack_name: str = data['name']
-    modpack_summary: Optional[str] = data.get('summary')
-    modpack_dependencies: dict[str, str] = data['dependencies']
-
-    # Print info
-    print(f'Filename:        {os.path.basename(filename)}')
-    print(f'Modpack name:    {modpack_name}')
-    print(f'Modpack version: {modpack_version}')
-    if modpack_summary is not None:
-        indented_modpack_summary: str = modpack_summary.replace('\n', '\n                 ')
-        print(f'Modpack summary: {indented_modpack_summary}')
-    print('Dependencies:')
-    for dependency, dependency_version in modpack_dependencies.items():
-        print(f'    {DEPENDENCY_NAMES.get(dependency, dependency)} {dependency_version}')
+    if platform.system() != 'Windows':
+        raise ModpackInstallerError('Soup\'s Modrinth modpack installer can only install modpacks on Windows operating systems!')
 
-def extract_modpack(filename: str, destination_folder: str = '.', is_server: bool = False, download_optional_files: bool = True, wait_for_user: bool = True, print_logs: bool = True) -> tuple[str, dict]:
+def check_dependencies() -> None:
     """
-    Converts an .mrpack file into a .zip file.
+    Checks that PIL and requests are installed without importing them.
+    They are imported only when an icon is resized or a file is downloaded, so a missing one would otherwise only be noticed then.
 
-    :param filename: The path to the .mrpack file.
-    :type filename: str
-    :param destination_folder: The folder to place the output .zip file into.
-    :type destination_folder: str
-    :param is_server: Whether the modpack is being extracted for a server.
-    :type is_server: bool
-    :param download_optional_files: Whether optional files should be downloaded.
-    :type download_optional_files: bool
-    :param wait_for_user: Whether to wait for user input before extracting.
-    :type wait_for_user: bool
-    :param print_logs: Whether to print logs while extracting.
-    :type print_logs: bool
-    :return: The path to the .zip file, and the contents of the modpack index file as a dict.
-    :rtype: tuple[str, dict]
+    :rtype: None
     """
 
-    # Read mrpack file
-    if print_logs:
-        print('Reading mrpack file...')
-    with ZipFile(filename, 'r') as zf:
-
-        # Read index file
-        data: bytes = zf.read('modrinth.index.json')
-        data: dict = json.loads(data.decode())
-
-        # Read overrides
-        base_overrides: dict[str, bytes] = {}
-        one_sided_overrides: dict[str, bytes] = {}
-        for compressed_filename in zf.namelist():
-
-            # Get override type
-            override_type: str = 'none'
-            if compressed_filename.startswith('overrides/'):
-                override_type = 'base'
-            elif compressed_filename.startswith('server-overrides/'):
-                override_type = 'server'
-            elif compressed_filename.startswith('client-overrides/'):
-                override_type = 'client'
-
-            # Read override
-            filename_relative_to_instance: str = '/'.join(compressed_filename.split('/')[1:])
-            if override_type == 'base':
-                base_overrides[filename_relative_to_instance] = zf.read(compressed_filename)
-            elif (override_type == 'server' and is_server) or (override_type == 'client' and not is_server):
-                one_sided_overrides[filename_relative_to_instance] = zf.read(compressed_filename)
-
-        # Merge overrides
-        overrides: dict[str, bytes] = base_overrides | one_sided_overrides
-
-    # Get metadata
-    modpack_version: str = data['versionId']
-    modpack_name: str = data['name']
-    modpack_summary: Optional[str] = data.get('summary')
-    modpack_dependencies: dict[str, str] = data['dependencies']
-    downloads_metadata: list[dict] = data['files']
-
-    # Wait for user
-    if wait_for_user:
-        if print_logs:
-            print('')
-        print(f'Modpack name:    {modpack_name}')
-        print(f'Modpack version: {modpack_version}')
-        if modpack_summary is not None:
-            indented_modpack_summary: str = modpack_summary.replace('\n', '\n                 ')
-            print(f'Modpack summary: {indented_modpack_summary}')
-        print('Dependencies:')
-        for dependency, dependency_version in modpack_dependencies.items():
-            print(f'    {DEPENDENCY_NAMES.get(dependency, dependency)} {dependency_version}')
-        print('')
-        input('Press ENTER to continue.')
-        if print_logs:
-            print('')
-
-    # Download files
-    if print_logs:
-        print('Downloading files...')
-    downloaded_files: dict[str, bytes] = {}
-    for download_metadata in downloads_metadata:
-
-        # Get metadata
-        filename_relative_to_instance: str = download_metadata['path']
-        file_size: int = download_metadata['fileSize']
-        hashes: dict = download_metadata['hashes']
-        environment: dict = download_metadata.get('env', {'client': 'required', 'server': 'required'})
-        download_urls: list[str] = download_metadata['downloads']
-
-        # Check environment
-        file_support: str = environment['server'] if is_server else environment['client']
-        should_download: bool = False
-        if (file_support == 'required') or (file_support == 'optional' and download_optional_files):
-            should_download = True
-        if not should_download:
-            continue
-
-        # Download file
-        if print_logs:
-            print(f'Downloading [{file_size / (1024 * 1024):.2f} MiB] {filename_relative_to_instance}')
-        success: bool = False
-        for download_url in download_urls:
-            if print_logs:
-                print(f'Using {download_url}')
+    for module_name in ('PIL', 'requests'):
+        if importlib.util.find_spec(module_name) is None:
+            raise ModuleNotFoundError(f'No module named \'{module_name}\'', name=module_name)
 
-            # Check hostname
-            hostname: str = urlparse(download_url).hostname
-            if hostname not in ALLOWED_HOSTNAMES:
-                raise ModpackExtractorError(f'Invalid modpack file: Hostname "{hostname}" isn\'t on the whitelist!')
+class LauncherProfileStore:
+    """
+    Reads and writes the profiles in the Minecraft Launcher's launcher_profiles.json.
+    Every change holds a lock file, so installs in other threads and processes can't lose each other's profiles, and is written to a temporary file that replaces the original, so the file is never left half written.
+    Profiles added with auto_flush turned off are kept until flush() is called, so a batch of installs rewrites the file once.
+    """
 
-            # Download from URL
+    def __init__(self, path: Optional[str] = None, auto_flush: bool = True, lock_timeout: float = LAUNCHER_PROFILES_LOCK_TIMEOUT) -> None:
+        """
+        :param path: The path to launcher_profiles.json, or None to use LAUNCHER_PROFILES_FILE_PATH.
+        :type path: Optional[str]
+        :param auto_flush: Whether added profiles are written immediately. If False, they are written by flush().
+        :type auto_flush: bool
+        :param lock_timeout: How long to wait for another process to finish writing the file, in seconds.
+        :type lock_timeout: float
+        """
+
+        if path is None:
+            path = LAUNCHER_PROFILES_FILE_PATH
+
+        self.path: str = path
+        self.lock_path: str = os.path.join(os.path.dirname(path), LAUNCHER_PROFILES_LOCK_FILENAME)
+        self.auto_flush: bool = auto_flush
+        self.lock_timeout: float = lock_timeout
+        self.writes: int = 0
+        self._pending: dict[str, dict] = {}
+        self._cached_profiles: Optional[dict] = None
+        self._cached_stat: Optional[tuple[int, int]] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def _acquire_file_lock(self) -> BinaryIO:
+        """
+        Locks the lock file next to launcher_profiles.json, waiting for other processes to release it.
+
+        :return: The open lock file, which must be passed to _release_file_lock().
+        :rtype: BinaryIO
+        """
+
+        lock_file: BinaryIO = open(self.lock_path, 'a+b')
+        deadline: float = time.monotonic() + self.lock_timeout
+        while True:
             try:
-                r: requests.Response = requests.get(download_url)
-            except Exception as e:
-                if print_logs:
-                    print(f'Error during download: {e}')
-                continue
-            file_data: bytes = r.content
-
-            # Verify hashes
-            sha1_hash: str = hashlib.sha1(file_data).hexdigest()
-            sha512_hash: str = hashlib.sha512(file_data).hexdigest()
-            if sha1_hash != hashes['sha1']:
-                raise ModpackExtractorError('SHA1 hashes don\'t match!')
-            if sha512_hash != hashes['sha512']:
-                raise ModpackExtractorError('SHA512 hashes don\'t match!')
-
-            # Save file
-            downloaded_files[filename_relative_to_instance] = file_data
-            success = True
-            break
-
-        # Check for success
-        if not success:
-            if len(download_urls) == 0:
-                raise ModpackExtractorError('Invalid modpack file: No download URLs were provided!')
-            raise ModpackExtractorError('All provided download URLs failed! Check your internet connection.')
-
-    # Get output paths
-    server_suffix: str = ' - Server' if is_server else ''
-    escaped_output_name: str = escape_filename(f'{modpack_name} - {modpack_version}{server_suffix}')
-    output_filename: str = os.path.join(destination_folder, escaped_output_name + '.zip')
-
-    # Write output zip file
-    if print_logs:
-        print('Writing output zip file...')
-    with ZipFile(output_filename, 'w') as zf:
-
-        # Write downloaded files
-        for compressed_filename, file_data in downloaded_files.items():
-            zf.writestr(compressed_filename, file_data)
-
-        # Write overrides
-        for compressed_filename, file_data in overrides.items():
-            zf.writestr(compressed_filename, file_data)
-
-    # Show success message
-    if print_logs:
-        print(f'Successfully extracted to "{output_filename}"!')
+                if os.name == 'nt':
+                    import msvcrt
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    import fcntl
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return lock_file
+            except OSError:
+                if time.monotonic() >= deadline:
+                    lock_file.close()
+                    raise ModpackInstallerError(f'Timed out waiting for another program to finish writing "{self.path}"!')
+                time.sleep(0.05)
+
+    def _release_file_lock(self, lock_file: BinaryIO) -> None:
+        """
+        Unlocks and closes a lock file from _acquire_file_lock().
+
+        :param lock_file: The open lock file.
+        :type lock_file: BinaryIO
+        :rtype: None
+        """
+
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        finally:
+            lock_file.close()
+
+    def _read(self) -> dict:
+        """
+        Reads launcher_profiles.json. Must be called while holding the file lock.
+        The file is only parsed again if it changed since this store last read or wrote it.
+
+        :rtype: dict
+        """
+
+        stat: os.stat_result = os.stat(self.path)
+        stat_key: tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+        if self._cached_profiles is None or self._cached_stat != stat_key:
+            with open(self.path, 'r') as f:
+                self._cached_profiles = json.loads(f.read())
+            self._cached_stat = stat_key
+        return self._cached_profiles
+
+    def _write(self, profiles: dict) -> None:
+        """
+        Replaces launcher_profiles.json with new contents. Must be called while holding the file lock.
+
+        :param profiles: The new contents of the file.
+        :type profiles: dict
+        :rtype: None
+        """
+
+        # Write temporary file
+        file_descriptor: int
+        temporary_path: str
+        file_descriptor, temporary_path = tempfile.mkstemp(prefix='.launcher_profiles.', suffix='.tmp', dir=os.path.dirname(self.path))
+        self._cached_profiles = None
+        try:
+            with os.fdopen(file_descriptor, 'w') as f:
+                f.write(json.dumps(profiles))
+                f.flush()
+                os.fsync(f.fileno())
+
+            # Replace file, retrying briefly in case the launcher has it open
+            for attempt in range(LAUNCHER_PROFILES_REPLACE_ATTEMPTS):
+                try:
+                    os.replace(temporary_path, self.path)
+                    break
+                except PermissionError:
+                    if attempt == LAUNCHER_PROFILES_REPLACE_ATTEMPTS - 1:
+                        raise
+                    time.sleep(0.1 * 2 ** attempt)
+        except BaseException:
+            if os.path.isfile(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+        # Remember what was written so the next change doesn't parse the file again
+        stat: os.stat_result = os.stat(self.path)
+        self._cached_profiles = profiles
+        self._cached_stat = (stat.st_mtime_ns, stat.st_size)
+        self.writes += 1
+
+    def update(self, function: Callable[[dict], None]) -> None:
+        """
+        Changes launcher_profiles.json while holding the lock.
+
+        :param function: A function that changes the contents of the file in place.
+        :type function: Callable[[dict], None]
+        :rtype: None
+        """
+
+        with self._lock:
+            lock_file: BinaryIO = self._acquire_file_lock()
+            try:
+                profiles: dict = self._read()
+                try:
+                    function(profiles)
+                except BaseException:
+                    self._cached_profiles = None
+                    raise
+                self._write(profiles)
+            finally:
+                self._release_file_lock(lock_file)
+
+    def add_profiles(self, profiles_to_add: dict[str, dict]) -> None:
+        """
+        Adds profiles to the launcher, writing the file once for all of them.
+
+        :param profiles_to_add: The profiles to add, keyed by profile ID.
+        :type profiles_to_add: dict[str, dict]
+        :rtype: None
+        """
+
+        if len(profiles_to_add) == 0:
+            return
+
+        def add(profiles: dict) -> None:
+            profiles.setdefault('profiles', {}).update(profiles_to_add)
+
+        self.update(add)
+
+    def add_profile(self, profile: dict) -> str:
+        """
+        Adds a profile to the launcher, or queues it until flush() is called if auto_flush is turned off.
+
+        :param profile: The profile to add.
+        :type profile: dict
+        :return: The ID of the new profile.
+        :rtype: str
+        """
+
+        profile_id: str = random.randbytes(16).hex()
+        if self.auto_flush:
+            self.add_profiles({profile_id: profile})
+        else:
+            with self._lock:
+                self._pending[profile_id] = profile
+        return profile_id
+
+    def flush(self) -> int:
+        """
+        Writes every queued profile to the launcher.
+
+        :return: The number of profiles written.
+        :rtype: int
+        """
+
+        with self._lock:
+            pending: dict[str, dict] = self._pending
+            self._pending = {}
+        try:
+            self.add_profiles(pending)
+        except BaseException:
+            with self._lock:
+                self._pending = pending | self._pending
+            raise
+        return len(pending)
+
+    def update_profiles(self, install_path: str, fields: dict[str, str]) -> int:
+        """
+        Changes fields of every profile that uses a game directory, including queued profiles.
+
+        :param install_path: The game directory.
+        :type install_path: str
+        :param fields: The new values of the fields, keyed by field name.
+        :type fields: dict[str, str]
+        :return: The number of profiles changed.
+        :rtype: int
+        """
+
+        updated: int = 0
+        normalized_install_path: str = os.path.normcase(os.path.abspath(install_path))
+
+        def update_fields(profiles: dict) -> None:
+            nonlocal updated
+            for profile in list(profiles.get('profiles', {}).values()) + list(self._pending.values()):
+                if os.path.normcase(os.path.abspath(profile.get('gameDir', ''))) == normalized_install_path:
+                    profile.update(fields)
+                    updated += 1
+
+        self.update(update_fields)
+        return updated
+
+    def rename_profiles(self, install_path: str, profile_name: str) -> int:
+        """
+        Renames every profile that uses a game directory, including queued profiles.
+
+        :param install_path: The game directory.
+        :type install_path: str
+        :param profile_name: The new name of the profiles.
+        :type profile_name: str
+        :return: The number of profiles renamed.
+        :rtype: int
+        """
+
+        return self.update_profiles(install_path, {'name': profile_name})
 
-    # Return info
-    return output_filename, data
+def image_to_uri(image_data: bytes) -> str:
+    encoded_data: str = base64.b64encode(image_data).decode()
+    return f'data:image/png;base64,{encoded_data}'
 
-def install_modpack(extracted_modpack_filename: str, data: dict, wait_for_user: bool = True, print_logs: bool = True) -> None:
+def get_install_path(data: dict, wait_for_user: bool = True, print_logs: bool = True, replace_existing: bool = False) -> tuple[str, str]:
     """
-    Creates an installation in the Minecraft Launcher from an extracted modpack.
-    Prompts the user for the name of the Minecraft version to use.
+    Gets the game directory and launcher profile name for a new installation of a modpack.
+    If the modpack is already installed, a numbered suffix is added to both, unless replace_existing is set.
 
-    :param extracted_modpack_filename: The path to the .zip file containing the extracted modpack.
-    :type extracted_modpack_filename: str
     :param data: The contents of the modpack index file as a dict.
     :type data: dict
     :param wait_for_user: Whether to ask user to confirm before installing if a duplicate installation is found.
     :type wait_for_user: bool
-    :param print_logs: Whether to print logs while extracting.
+    :param print_logs: Whether to print logs while installing.
     :type print_logs: bool
-    :rtype: None
+    :param replace_existing: Whether to return the game directory of the existing installation, which the caller replaces.
+    :type replace_existing: bool
+    :return: The path to the game directory, and the name of the launcher profile.
+    :rtype: tuple[str, str]
     """
 
     # Get installation path and name
@@ -295,6 +343,8 @@ def install_modpack(extracted_modpack_filename: str, data: dict, wait_for_user:
 
     # Check for existing installation
     already_installed: bool = os.path.isdir(install_path)
+    if replace_existing:
+        return install_path, profile_name
     if already_installed and wait_for_user:
         if print_logs:
             print('')
@@ -307,31 +357,55 @@ def install_modpack(extracted_modpack_filename: str, data: dict, wait_for_user:
 
     # Update path to avoid duplicates if already installed
     if already_installed:
-        installation_number: int = 2
+        installation_number: int = 1
         while os.path.isdir(install_path):
+            installation_number += 1
             escaped_output_name = escape_filename(f'{data["name"]}_{data["versionId"]}_{installation_number}', strict=True)
             install_path = os.path.join(INSTALLATIONS_DIR, escaped_output_name)
         profile_name = f'{data["name"]} - {data["versionId"]} (#{installation_number})'
 
-    # Get the icon URI
+    return install_path, profile_name
+
+def create_profile_icon(original_icon_data: Optional[bytes], print_logs: bool = True) -> str:
+    """
+    Creates the icon URI for a launcher profile from a modpack's icon.
+
+    :param original_icon_data: The contents of the modpack's "icon.png", or None to use the default icon.
+    :type original_icon_data: Optional[bytes]
+    :param print_logs: Whether to print logs while installing.
+    :type print_logs: bool
+    :rtype: str
+    """
+
+    if original_icon_data is None:
+        return DEFAULT_PROFILE_ICON
+
+    # Import PIL only when an icon is resized
+    from PIL import Image
+
+    # Resize icon
     if print_logs:
-        print('Loading icon...')
-    profile_icon: str = DEFAULT_PROFILE_ICON
-    with ZipFile(extracted_modpack_filename, 'r') as zf:
-        if 'icon.png' in zf.namelist():
-            original_icon_data: bytes = zf.read('icon.png')
+        print('Resizing icon...')
+    original_icon_stream: io.BytesIO = io.BytesIO(original_icon_data)
+    icon_stream: io.BytesIO = io.BytesIO()
+    icon: Image = Image.open(original_icon_stream)
+    icon = icon.resize(PROFILE_ICON_SIZE, Image.Resampling.BOX)
+    icon.save(icon_stream, format='PNG')
+    icon_data: bytes = icon_stream.getvalue()
 
-            # Resize icon
-            if print_logs:
-                print('Resizing icon...')
-            original_icon_stream: io.BytesIO = io.BytesIO(original_icon_data)
-            icon_stream: io.BytesIO = io.BytesIO()
-            icon: Image = Image.open(original_icon_stream)
-            icon = icon.resize(PROFILE_ICON_SIZE, Image.Resampling.BOX)
-            icon.save(icon_stream, format='PNG')
-            icon_data: bytes = icon_stream.getvalue()
+    return image_to_uri(icon_data)
+
+def ask_for_profile_version(data: dict, print_logs: bool = True) -> str:
+    """
+    Prompts the user for the name of the Minecraft version folder to use for a modpack.
 
-            profile_icon = image_to_uri(icon_data)
+    :param data: The contents of the modpack index file as a dict.
+    :type data: dict
+    :param print_logs: Whether to print logs while installing.
+    :type print_logs: bool
+    :return: The name of the version folder.
+    :rtype: str
+    """
 
     # Show version selection instructions
     if print_logs:
@@ -369,8 +443,42 @@ def install_modpack(extracted_modpack_filename: str, data: dict, wait_for_user:
     if print_logs:
         print('')
 
+    return profile_version
+
+def check_profile_version(profile_version: str) -> None:
+    """
+    Checks that a Minecraft version folder given without prompting the user is installed.
+
+    :param profile_version: The name of the version folder.
+    :type profile_version: str
+    :rtype: None
+    """
+
+    if profile_version.strip() == '' or profile_version != os.path.basename(profile_version) or profile_version in ('.', '..'):
+        raise ModpackInstallerError(f'Invalid version folder name "{profile_version}"!')
+    if not os.path.isdir(os.path.join(VERSIONS_DIR, profile_version)):
+        raise ModpackInstallerError(f'Version folder "{profile_version}" is not installed!')
+
+def save_launcher_profile(profile_name: str, profile_icon: str, profile_version: str, install_path: str, print_logs: bool = True, profile_store: Optional[LauncherProfileStore] = None) -> None:
+    """
+    Adds a profile for an installation to the Minecraft Launcher.
+
+    :param profile_name: The name of the profile.
+    :type profile_name: str
+    :param profile_icon: The icon URI of the profile.
+    :type profile_icon: str
+    :param profile_version: The name of the Minecraft version folder the profile uses.
+    :type profile_version: str
+    :param install_path: The game directory of the profile.
+    :type install_path: str
+    :param print_logs: Whether to print logs while installing.
+    :type print_logs: bool
+    :param profile_store: The store to add the profile to, or None to write it to launcher_profiles.json immediately.
+    :type profile_store: Optional[LauncherProfileStore]
+    :rtype: None
+    """
+
     # Create launcher profile
-    profile_id: str = random.randbytes(16).hex()
     profile_timestamp: str = datetime.datetime.now(datetime.UTC).isoformat()
     profile: dict[str, str] = {
         'name': profile_name,
@@ -382,6 +490,163 @@ def install_modpack(extracted_modpack_filename: str, data: dict, wait_for_user:
         'gameDir': install_path
     }
 
+    # Save launcher profile
+    if print_logs:
+        print('Creating launcher profile...')
+    if profile_store is None:
+        profile_store = LauncherProfileStore()
+    profile_store.add_profile(profile)
+
+def rename_launcher_profiles(install_path: str, profile_name: str, print_logs: bool = True, profile_store: Optional[LauncherProfileStore] = None) -> None:
+    """
+    Renames every launcher profile that uses a game directory.
+
+    :param install_path: The game directory.
+    :type install_path: str
+    :param profile_name: The new name of the profiles.
+    :type profile_name: str
+    :param print_logs: Whether to print logs while installing.
+    :type print_logs: bool
+    :param profile_store: The store the profiles are in, or None to use launcher_profiles.json.
+    :type profile_store: Optional[LauncherProfileStore]
+    :rtype: None
+    """
+
+    if print_logs:
+        print('Updating launcher profile...')
+    if profile_store is None:
+        profile_store = LauncherProfileStore()
+    profile_store.rename_profiles(install_path, profile_name)
+
+def install_downloaded_files(downloaded_files: dict[str, str], download_folder: str, install_path: str, link_mode: str = DEFAULT_LINK_MODE) -> None:
+    """
+    Moves downloaded files into a game directory.
+    Files in the download folder are moved, and files anywhere else (such as the artifact cache) are linked or copied.
+
+    :param downloaded_files: The path to each file on disk, keyed by path relative to the instance.
+    :type downloaded_files: dict[str, str]
+    :param download_folder: The temporary folder the files were downloaded to.
+    :type download_folder: str
+    :param install_path: The game directory.
+    :type install_path: str
+    :param link_mode: How files outside of the download folder are placed in the game directory: "hardlink", "reflink" or "copy".
+    :type link_mode: str
+    :rtype: None
+    """
+
+    for filename_relative_to_instance, downloaded_filename in downloaded_files.items():
+        destination_path: str = get_safe_path(install_path, filename_relative_to_instance)
+        os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+        if os.path.dirname(downloaded_filename) == download_folder:
+            os.replace(downloaded_filename, destination_path)
+        else:
+            clone_file(downloaded_filename, destination_path, link_mode)
+
+def install_overrides(filename: str, overrides: dict[str, ZipInfo], install_path: str, buffer_size: int = DEFAULT_BUFFER_SIZE, extract_workers: int = DEFAULT_EXTRACT_WORKERS) -> None:
+    """
+    Writes overrides from an .mrpack file into a game directory in parallel, replacing any existing files.
+
+    :param filename: The path to the .mrpack file.
+    :type filename: str
+    :param overrides: The info of each override in the .mrpack file, keyed by path relative to the instance.
+    :type overrides: dict[str, ZipInfo]
+    :param install_path: The game directory.
+    :type install_path: str
+    :param buffer_size: The size of each chunk copied, in bytes.
+    :type buffer_size: int
+    :param extract_workers: The maximum number of overrides to write at the same time.
+    :type extract_workers: int
+    :rtype: None
+    """
+
+    # Write to new files so hardlinks to the old files aren't modified
+    extract_zip_members(filename, overrides, install_path, replace_existing=True, extract_workers=extract_workers, buffer_size=buffer_size, print_logs=False)
+
+def write_installation_manifest(install_path: str, data: dict, installed_files: list[str], installed_overrides: list[str]) -> None:
+    """
+    Saves the modpack index and the list of installed files into a game directory, so the installation can be upgraded later.
+
+    :param install_path: The game directory.
+    :type install_path: str
+    :param data: The contents of the modpack index file as a dict.
+    :type data: dict
+    :param installed_files: The paths relative to the instance of the files from the index that were installed.
+    :type installed_files: list[str]
+    :param installed_overrides: The paths relative to the instance of the overrides that were installed.
+    :type installed_overrides: list[str]
+    :rtype: None
+    """
+
+    manifest: dict = {
+        'index': data,
+        'files': installed_files,
+        'overrides': installed_overrides
+    }
+    manifest_path: str = os.path.join(install_path, INSTALLATION_MANIFEST_FILENAME)
+    with open(manifest_path + '.tmp', 'w') as f:
+        f.write(json.dumps(manifest))
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+def read_installation_manifest(install_path: str) -> Optional[dict]:
+    """
+    Reads the manifest saved into a game directory when a modpack was installed.
+
+    :param install_path: The game directory.
+    :type install_path: str
+    :return: The manifest, with the modpack index under "index", the installed files under "files" and the installed overrides under "overrides", or None if the installation has no manifest.
+    :rtype: Optional[dict]
+    """
+
+    manifest_path: str = os.path.join(install_path, INSTALLATION_MANIFEST_FILENAME)
+    if not os.path.isfile(manifest_path):
+        return None
+    with open(manifest_path, 'r') as f:
+        return json.loads(f.read())
+
+def install_modpack(extracted_modpack_filename: str, data: dict, wait_for_user: bool = True, print_logs: bool = True, profile_version: Optional[str] = None, extract_workers: int = DEFAULT_EXTRACT_WORKERS, on_event: Optional[Callable[[dict], None]] = None, profile_store: Optional[LauncherProfileStore] = None) -> None:
+    """
+    Creates an installation in the Minecraft Launcher from an extracted modpack.
+    Prompts the user for the name of the Minecraft version to use, unless it is given.
+
+    :param extracted_modpack_filename: The path to the .zip file containing the extracted modpack.
+    :type extracted_modpack_filename: str
+    :param data: The contents of the modpack index file as a dict.
+    :type data: dict
+    :param wait_for_user: Whether to ask user to confirm before installing if a duplicate installation is found.
+    :type wait_for_user: bool
+    :param print_logs: Whether to print logs while extracting.
+    :type print_logs: bool
+    :param profile_version: The name of the Minecraft version folder to use, or None to ask the user.
+    :type profile_version: Optional[str]
+    :param extract_workers: The maximum number of files to extract at the same time.
+    :type extract_workers: int
+    :param on_event: A function called with a dict for each progress event, possibly from worker threads, or None. See SummaryReporter.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param profile_store: The store to save the launcher profile to, or None to write it to launcher_profiles.json immediately.
+    :type profile_store: Optional[LauncherProfileStore]
+    :rtype: None
+    """
+
+    # Get installation path and name
+    install_path: str
+    profile_name: str
+    install_path, profile_name = get_install_path(data, wait_for_user, print_logs)
+
+    # Get the icon URI
+    if print_logs:
+        print('Loading icon...')
+    original_icon_data: Optional[bytes] = None
+    with ZipFile(extracted_modpack_filename, 'r') as zf:
+        if 'icon.png' in zf.namelist():
+            original_icon_data = zf.read('icon.png')
+    profile_icon: str = create_profile_icon(original_icon_data, print_logs)
+
+    # Get installation version from user
+    if profile_version is None:
+        profile_version = ask_for_profile_version(data, print_logs)
+    else:
+        check_profile_version(profile_version)
+
     # Create installations directory if it doesn't exist
     if not os.path.isdir(INSTALLATIONS_DIR):
         os.mkdir(INSTALLATIONS_DIR)
@@ -389,23 +654,697 @@ def install_modpack(extracted_modpack_filename: str, data: dict, wait_for_user:
     # Install modpack
     if print_logs:
         print('Installing...')
+    phase_start_time: float = start_phase(on_event, 'install_files')
     with ZipFile(extracted_modpack_filename, 'r') as zf:
-        zf.extractall(install_path)
+        members: dict[str, ZipInfo] = {zinfo.filename: zinfo for zinfo in zf.infolist()}
+    extract_stats: dict[str, float] = extract_zip_members(extracted_modpack_filename, members, install_path, extract_workers=extract_workers, print_logs=print_logs)
+    emit_event(on_event, 'extract_stats', **extract_stats)
+    extracted_filenames: set[str] = set(members)
+    end_phase(on_event, 'install_files', phase_start_time)
+
+    # Save index for upgrades
+    installed_files: list[str] = [download_metadata['path'] for download_metadata in data['files'] if download_metadata['path'] in extracted_filenames]
+    write_installation_manifest(install_path, data, installed_files, [])
 
     # Save launcher profile
+    phase_start_time = start_phase(on_event, 'profile')
+    save_launcher_profile(profile_name, profile_icon, profile_version, install_path, print_logs, profile_store)
+    end_phase(on_event, 'profile', phase_start_time)
+
+    # Show success message
     if print_logs:
-        print('Creating launcher profile...')
-    with open(LAUNCHER_PROFILES_FILE_PATH, 'r') as f:
-        profiles: dict = json.loads(f.read())
-    profiles['profiles'][profile_id] = profile
-    with open(LAUNCHER_PROFILES_FILE_PATH, 'w') as f:
-        f.write(json.dumps(profiles))
+        print(f'Successfully installed as "{profile_name}"!')
+        print('You will need to restart the Minecraft Launcher if it was open.')
+
+def install_modpack_from_mrpack(filename: str, download_optional_files: bool = True, wait_for_user: bool = True, print_logs: bool = True, download_workers: int = DEFAULT_DOWNLOAD_WORKERS, buffer_size: int = DEFAULT_BUFFER_SIZE, cache: Optional[ArtifactCache] = None, link_mode: str = DEFAULT_LINK_MODE, extract_workers: int = DEFAULT_EXTRACT_WORKERS, session: Optional['requests.Session'] = None, host_limiter: Optional[HostLimiter] = None, bandwidth_limiter: Optional[BandwidthLimiter] = None, host_stats: Optional[HostStats] = None, profile_version: Optional[str] = None, on_event: Optional[Callable[[dict], None]] = None, profile_store: Optional[LauncherProfileStore] = None) -> dict:
+    """
+    Creates an installation in the Minecraft Launcher directly from an .mrpack file.
+    Downloaded files and overrides are written straight into the game directory, without creating an extracted .zip file.
+    Prompts the user for the name of the Minecraft version to use, unless it is given.
+
+    :param filename: The path to the .mrpack file.
+    :type filename: str
+    :param download_optional_files: Whether optional files should be downloaded.
+    :type download_optional_files: bool
+    :param wait_for_user: Whether to wait for user input before installing, and to ask user to confirm if a duplicate installation is found.
+    :type wait_for_user: bool
+    :param print_logs: Whether to print logs while installing.
+    :type print_logs: bool
+    :param download_workers: The maximum number of files to download at the same time.
+    :type download_workers: int
+    :param buffer_size: The size of each chunk read from the network or copied between files, in bytes.
+    :type buffer_size: int
+    :param cache: The artifact cache to take files from and add downloaded files to, or None to always download.
+    :type cache: Optional[ArtifactCache]
+    :param link_mode: How files from the artifact cache are placed in the game directory: "hardlink", "reflink" or "copy".
+    :type link_mode: str
+    :param extract_workers: The maximum number of overrides written at the same time.
+    :type extract_workers: int
+    :param session: The HTTP session to download with, or None to create one for this run.
+    :type session: Optional[requests.Session]
+    :param host_limiter: The limiter for concurrent downloads per hostname, or None to use HOST_CONCURRENCY_LIMITS for this run only.
+    :type host_limiter: Optional[HostLimiter]
+    :param bandwidth_limiter: The limiter for the combined download speed, or None for no limit.
+    :type bandwidth_limiter: Optional[BandwidthLimiter]
+    :param host_stats: The statistics used to rank download URLs and hedge slow downloads, or None to load them from CACHE_DIR and save them when done.
+    :type host_stats: Optional[HostStats]
+    :param profile_version: The name of the Minecraft version folder to use, or None to ask the user.
+    :type profile_version: Optional[str]
+    :param on_event: A function called with a dict for each progress event, possibly from worker threads, or None. See SummaryReporter.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param profile_store: The store to save the launcher profile to, or None to write it to launcher_profiles.json immediately.
+    :type profile_store: Optional[LauncherProfileStore]
+    :return: The contents of the modpack index file as a dict.
+    :rtype: dict
+    """
+
+    # Read mrpack file
+    if print_logs:
+        print('Reading mrpack file...')
+    phase_start_time: float = start_phase(on_event, 'read')
+    data: dict
+    overrides: dict[str, ZipInfo]
+    data, overrides = read_modpack(filename, is_server=False)
+    end_phase(on_event, 'read', phase_start_time)
+
+    # Wait for user
+    if wait_for_user:
+        if print_logs:
+            print('')
+        print_modpack_metadata(data)
+        print('')
+        input('Press ENTER to continue.')
+        if print_logs:
+            print('')
+
+    # Get installation path and name
+    install_path: str
+    profile_name: str
+    install_path, profile_name = get_install_path(data, wait_for_user, print_logs)
+
+    # Get the icon URI
+    if print_logs:
+        print('Loading icon...')
+    original_icon_data: Optional[bytes] = None
+    if 'icon.png' in overrides:
+        with ZipFile(filename, 'r') as zf:
+            original_icon_data = zf.read(overrides['icon.png'])
+    profile_icon: str = create_profile_icon(original_icon_data, print_logs)
+
+    # Get installation version from user
+    if profile_version is None:
+        profile_version = ask_for_profile_version(data, print_logs)
+    else:
+        check_profile_version(profile_version)
+
+    # Create installations directory if it doesn't exist
+    if not os.path.isdir(INSTALLATIONS_DIR):
+        os.mkdir(INSTALLATIONS_DIR)
+
+    try:
+        # Downloads are moved into place from a temporary folder on the same drive as the game directory
+        with tempfile.TemporaryDirectory(prefix='.soup_mrpack_', dir=INSTALLATIONS_DIR) as download_folder:
+
+            # Download files
+            if print_logs:
+                print('Downloading files...')
+            phase_start_time = start_phase(on_event, 'download')
+            required_downloads_metadata: list[dict] = [download_metadata for download_metadata in data['files'] if should_download_file(download_metadata, False, download_optional_files)]
+            for download_metadata in required_downloads_metadata:
+                get_safe_path(install_path, download_metadata['path'])
+            downloaded_files: dict[str, str] = download_files(required_downloads_metadata, download_folder, download_workers=download_workers, host_limiter=host_limiter, bandwidth_limiter=bandwidth_limiter, host_stats=host_stats, buffer_size=buffer_size, cache=cache, print_logs=print_logs, session=session, on_event=on_event)
+            end_phase(on_event, 'download', phase_start_time)
+
+            # Install downloaded files
+            if print_logs:
+                print('Installing...')
+            phase_start_time = start_phase(on_event, 'install_files')
+            install_downloaded_files(downloaded_files, download_folder, install_path, link_mode)
+            end_phase(on_event, 'install_files', phase_start_time)
+
+        # Install overrides
+        phase_start_time = start_phase(on_event, 'install_overrides')
+        install_overrides(filename, overrides, install_path, buffer_size, extract_workers)
+        end_phase(on_event, 'install_overrides', phase_start_time)
+
+        # Save index for upgrades
+        write_installation_manifest(install_path, data, list(downloaded_files), list(overrides))
+
+    # Don't leave a broken installation behind
+    except BaseException as error:
+        shutil.rmtree(install_path, ignore_errors=True)
+        emit_event(on_event, 'error', error=str(error) or type(error).__name__)
+        raise
+
+    # Save launcher profile
+    phase_start_time = start_phase(on_event, 'profile')
+    save_launcher_profile(profile_name, profile_icon, profile_version, install_path, print_logs, profile_store)
+    end_phase(on_event, 'profile', phase_start_time)
 
     # Show success message
     if print_logs:
         print(f'Successfully installed as "{profile_name}"!')
         print('You will need to restart the Minecraft Launcher if it was open.')
 
+    return data
+
+def upgrade_modpack(filename: str, install_path: str, download_optional_files: bool = True, wait_for_user: bool = True, print_logs: bool = True, download_workers: int = DEFAULT_DOWNLOAD_WORKERS, verify_workers: int = DEFAULT_HASH_WORKERS, buffer_size: int = DEFAULT_BUFFER_SIZE, cache: Optional[ArtifactCache] = None, link_mode: str = DEFAULT_LINK_MODE, extract_workers: int = DEFAULT_EXTRACT_WORKERS, session: Optional['requests.Session'] = None, host_limiter: Optional[HostLimiter] = None, bandwidth_limiter: Optional[BandwidthLimiter] = None, host_stats: Optional[HostStats] = None, on_event: Optional[Callable[[dict], None]] = None, profile_store: Optional[LauncherProfileStore] = None) -> dict:
+    """
+    Upgrades an existing installation in place to the version of a modpack in an .mrpack file.
+    Only files that aren't installed with the new hashes are downloaded, checked with check_installed_file and the verify cache. Files and overrides removed from the modpack are deleted, and overrides are reapplied.
+    The installation must have been installed by this program so its previous modpack index is known. Its manifest and launcher profile are only updated once every file is in place, so if the upgrade fails partway, running it again finishes it.
+
+    :param filename: The path to the .mrpack file of the new version.
+    :type filename: str
+    :param install_path: The game directory of the installation to upgrade.
+    :type install_path: str
+    :param download_optional_files: Whether optional files should be downloaded.
+    :type download_optional_files: bool
+    :param wait_for_user: Whether to ask user to confirm before upgrading.
+    :type wait_for_user: bool
+    :param print_logs: Whether to print logs while upgrading.
+    :type print_logs: bool
+    :param download_workers: The maximum number of files to download at the same time.
+    :type download_workers: int
+    :param verify_workers: The maximum number of installed files to hash at the same time.
+    :type verify_workers: int
+    :param buffer_size: The size of each chunk read from the network or copied between files, in bytes.
+    :type buffer_size: int
+    :param cache: The artifact cache to take files from and add downloaded files to, or None to always download.
+    :type cache: Optional[ArtifactCache]
+    :param link_mode: How files from the artifact cache are placed in the game directory: "hardlink", "reflink" or "copy".
+    :type link_mode: str
+    :param extract_workers: The maximum number of overrides written at the same time.
+    :type extract_workers: int
+    :param session: The HTTP session to download with, or None to create one for this run.
+    :type session: Optional[requests.Session]
+    :param host_limiter: The limiter for concurrent downloads per hostname, or None to use HOST_CONCURRENCY_LIMITS for this run only.
+    :type host_limiter: Optional[HostLimiter]
+    :param bandwidth_limiter: The limiter for the combined download speed, or None for no limit.
+    :type bandwidth_limiter: Optional[BandwidthLimiter]
+    :param host_stats: The statistics used to rank download URLs and hedge slow downloads, or None to load them from CACHE_DIR and save them when done.
+    :type host_stats: Optional[HostStats]
+    :param on_event: A function called with a dict for each progress event, possibly from worker threads, or None. See SummaryReporter.
+    :type on_event: Optional[Callable[[dict], None]]
+    :param profile_store: The store to save the launcher profile to, or None to write it to launcher_profiles.json immediately.
+    :type profile_store: Optional[LauncherProfileStore]
+    :return: The contents of the new modpack index file as a dict.
+    :rtype: dict
+    """
+
+    # Read previous index
+    manifest: Optional[dict] = read_installation_manifest(install_path)
+    if manifest is None:
+        raise ModpackInstallerError('This installation has no saved modpack index, so it can\'t be upgraded. Install the new version instead.')
+    old_data: dict = manifest['index']
+    old_installed_files: set[str] = set(manifest['files'])
+    old_hashes: dict[str, str] = {download_metadata['path']: download_metadata['hashes']['sha512'] for download_metadata in old_data['files'] if download_metadata['path'] in old_installed_files}
+
+    # Read mrpack file
+    if print_logs:
+        print('Reading mrpack file...')
+    phase_start_time: float = start_phase(on_event, 'read')
+    data: dict
+    overrides: dict[str, ZipInfo]
+    data, overrides = read_modpack(filename, is_server=False)
+    end_phase(on_event, 'read', phase_start_time)
+    required_downloads_metadata: list[dict] = [download_metadata for download_metadata in data['files'] if should_download_file(download_metadata, False, download_optional_files)]
+
+    # Check which files are already installed with the new hashes. Files an override replaces are written by the overrides instead
+    if print_logs:
+        print('Checking installed files...')
+    phase_start_time = start_phase(on_event, 'verify')
+    checked_downloads_metadata: list[dict] = [download_metadata for download_metadata in required_downloads_metadata if download_metadata['path'] not in overrides]
+    for download_metadata in checked_downloads_metadata:
+        get_safe_path(install_path, download_metadata['path'])
+    checked_files: dict[str, tuple[str, Optional[list]]] = check_installed_files(install_path, checked_downloads_metadata, read_verify_cache(install_path), verify_workers, buffer_size)
+    end_phase(on_event, 'verify', phase_start_time)
+    changed_downloads_metadata: list[dict] = [download_metadata for download_metadata in checked_downloads_metadata if checked_files[download_metadata['path']][0] not in ('ok', 'cached')]
+    verify_cache_entries: dict[str, list] = {filename_relative_to_instance: cache_entry for filename_relative_to_instance, (status, cache_entry) in checked_files.items() if status in ('ok', 'cached') and cache_entry is not None}
+    new_paths: set[str] = {download_metadata['path'] for download_metadata in required_downloads_metadata} | set(overrides)
+    removed_paths: list[str] = [filename_relative_to_instance for filename_relative_to_instance in old_hashes if filename_relative_to_instance not in new_paths]
+    removed_paths += [filename_relative_to_instance for filename_relative_to_instance in manifest['overrides'] if filename_relative_to_instance not in new_paths and filename_relative_to_instance not in old_hashes]
+
+    # Wait for user
+    if wait_for_user:
+        if print_logs:
+            print('')
+        print(f'Upgrading "{old_data["name"]} - {old_data["versionId"]}" to "{data["name"]} - {data["versionId"]}".')
+        if old_data['name'] != data['name']:
+            print('WARNING: These modpacks have different names!')
+        print(f'{len(changed_downloads_metadata)} files will be downloaded, {len(removed_paths)} files will be removed and {len(checked_downloads_metadata) - len(changed_downloads_metadata)} files are unchanged.')
+        confirm: str = input('Are you sure you want to upgrade? [y/n] ')
+        if confirm.strip().lower() not in ('y', 'yes'):
+            raise ModpackInstallerError('User cancelled upgrade.')
+        if print_logs:
+            print('')
+
+    # Apply the upgrade. The manifest still describes the old version until this succeeds, so a failed upgrade is finished by running it again
+    current_phase: str = 'download'
+    removed_count: int = 0
+    try:
+        # Download changed files
+        with tempfile.TemporaryDirectory(prefix='.soup_mrpack_', dir=os.path.dirname(os.path.abspath(install_path))) as download_folder:
+            if print_logs:
+                print(f'Downloading {len(changed_downloads_metadata)} changed files...')
+            phase_start_time = start_phase(on_event, 'download')
+            downloaded_files: dict[str, str] = download_files(changed_downloads_metadata, download_folder, download_workers=download_workers, host_limiter=host_limiter, bandwidth_limiter=bandwidth_limiter, host_stats=host_stats, buffer_size=buffer_size, cache=cache, print_logs=print_logs, session=session, on_event=on_event)
+            end_phase(on_event, 'download', phase_start_time)
+
+            # Install changed files
+            if print_logs:
+                print('Installing...')
+            current_phase = 'install_files'
+            phase_start_time = start_phase(on_event, 'install_files')
+            install_downloaded_files(downloaded_files, download_folder, install_path, link_mode)
+            end_phase(on_event, 'install_files', phase_start_time)
+
+        # Remove files and overrides that are no longer in the modpack
+        current_phase = 'remove'
+        for filename_relative_to_instance in removed_paths:
+            removed_path: str = get_safe_path(install_path, filename_relative_to_instance)
+            if os.path.isfile(removed_path):
+                if print_logs:
+                    print(f'Removing {filename_relative_to_instance}')
+                os.remove(removed_path)
+                removed_count += 1
+
+        # Reapply overrides
+        if print_logs:
+            print('Applying overrides...')
+        current_phase = 'install_overrides'
+        phase_start_time = start_phase(on_event, 'install_overrides')
+        install_overrides(filename, overrides, install_path, buffer_size, extract_workers)
+        end_phase(on_event, 'install_overrides', phase_start_time)
+
+    # Report how far the upgrade got
+    except BaseException as error:
+        emit_event(on_event, 'error', error=str(error) or type(error).__name__, phase=current_phase, removed=removed_count)
+        if print_logs:
+            print(f'Upgrade stopped during the "{current_phase}" step after removing {removed_count} of {len(removed_paths)} files. The installation still records "{old_data["name"]} - {old_data["versionId"]}", so upgrading it again will finish the upgrade.')
+        raise
+
+    # Save index for future upgrades, and the files that were verified unchanged
+    write_installation_manifest(install_path, data, [download_metadata['path'] for download_metadata in required_downloads_metadata], list(overrides))
+    write_verify_cache(install_path, verify_cache_entries)
+
+    # Update launcher profile
+    profile_name: str = f'{data["name"]} - {data["versionId"]}'
+    phase_start_time = start_phase(on_event, 'profile')
+    rename_launcher_profiles(install_path, profile_name, print_logs, profile_store)
+    end_phase(on_event, 'profile', phase_start_time)
+
+    # Show success message
+    if print_logs:
+        print(f'Successfully upgraded to "{profile_name}"!')
+        print('You will need to restart the Minecraft Launcher if it was open.')
+
+    return data
+
+def read_verify_cache(install_path: str) -> dict[str, list]:
+    """
+    Reads the sizes and modification times of files in a game directory that were found to match their hashes the last time it was verified.
+
+    :param install_path: The game directory.
+    :type install_path: str
+    :return: The size, modification time in nanoseconds, inode number and SHA512 hash of each verified file, keyed by path relative to the instance.
+    :rtype: dict[str, list]
+    """
+
+    cache_path: str = os.path.join(install_path, VERIFY_CACHE_FILENAME)
+    if not os.path.isfile(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r') as f:
+            entries: dict = json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    return entries if isinstance(entries, dict) else {}
+
+def write_verify_cache(install_path: str, entries: dict[str, list]) -> None:
+    """
+    Saves the sizes and modification times of files in a game directory that match their hashes, so they aren't hashed again until they change.
+
+    :param install_path: The game directory.
+    :type install_path: str
+    :param entries: The size, modification time in nanoseconds, inode number and SHA512 hash of each verified file, keyed by path relative to the instance.
+    :type entries: dict[str, list]
+    :rtype: None
+    """
+
+    cache_path: str = os.path.join(install_path, VERIFY_CACHE_FILENAME)
+    with open(cache_path + '.tmp', 'w') as f:
+        f.write(json.dumps(entries))
+    os.replace(cache_path + '.tmp', cache_path)
+
+def check_installed_file(install_path: str, download_metadata: dict, cache_entry: Optional[list], buffer_size: int = DEFAULT_BUFFER_SIZE) -> tuple[str, Optional[list]]:
+    """
+    Checks whether a file from a modpack index is installed in a game directory with the right contents. Used by check_installed_files on its worker threads.
+    If the file's size, modification time and inode number match its entry in the verify cache, it isn't hashed again.
+
+    :param install_path: The game directory.
+    :type install_path: str
+    :param download_metadata: The entry for the file from the "files" list of the modpack index.
+    :type download_metadata: dict
+    :param cache_entry: The file's entry in the verify cache, or None if it has none.
+    :type cache_entry: Optional[list]
+    :param buffer_size: The size of each chunk read from the file, in bytes.
+    :type buffer_size: int
+    :return: "ok", "cached", "missing" or "changed", and the file's new entry in the verify cache, or None if it shouldn't have one.
+    :rtype: tuple[str, Optional[list]]
+    """
+
+    path: str = get_safe_path(install_path, download_metadata['path'])
+    hashes: dict = download_metadata['hashes']
+    try:
+        stat: os.stat_result = os.stat(path)
+    except FileNotFoundError:
+        return 'missing', None
+    if not os.path.isfile(path):
+        return 'missing', None
+    if stat.st_size != download_metadata['fileSize']:
+        return 'changed', None
+
+    # Skip files that haven't changed since they were last verified
+    entry: list = [stat.st_size, stat.st_mtime_ns, stat.st_ino, hashes['sha512']]
+    if cache_entry == entry:
+        return 'cached', entry
+
+    # Hash the file
+    sha1: str
+    sha512: str
+    sha1, sha512 = hash_file(path, buffer_size)
+    if sha1 != hashes['sha1'] or sha512 != hashes['sha512']:
+        return 'changed', None
+
+    # Don't trust modification times that are too recent, since the file could change again without its modification time changing
+    if time.time() - stat.st_mtime < VERIFY_RECENT_MODIFICATION_TIME:
+        return 'ok', None
+    return 'ok', entry
+
+def check_installed_files(install_path: str, downloads_metadata: list[dict], cache_entries: dict[str, list], verify_workers: int = DEFAULT_HASH_WORKERS, buffer_size: int = DEFAULT_BUFFER_SIZE) -> dict[str, tuple[str, Optional[list]]]:
+    """
+    Checks files from a modpack index in a game directory with check_installed_file on a pool of worker threads, largest first.
+
+    :param install_path: The game directory.
+    :type install_path: str
+    :param downloads_metadata: The entries for the files from the "files" list of the modpack index.
+    :type downloads_metadata: list[dict]
+    :param cache_entries: The verify cache of the game directory, from read_verify_cache.
+    :type cache_entries: dict[str, list]
+    :param verify_workers: The maximum number of files to hash at the same time.
+    :type verify_workers: int
+    :param buffer_size: The size of each chunk read from a file, in bytes.
+    :type buffer_size: int
+    :return: The result of check_installed_file for each file, keyed by path relative to the instance.
+    :rtype: dict[str, tuple[str, Optional[list]]]
+    """
+
+    futures: dict[str, Future] = {}
+    executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max(1, verify_workers), thread_name_prefix='verify')
+    try:
+        for download_metadata in sorted(downloads_metadata, key=lambda download_metadata: download_metadata['fileSize'], reverse=True):
+            futures[download_metadata['path']] = executor.submit(check_installed_file, install_path, download_metadata, cache_entries.get(download_metadata['path']), buffer_size)
+        for future in as_completed(futures.values()):
+            future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return {filename_relative_to_instance: future.result() for filename_relative_to_instance, future in futures.items()}
+
+def verify_installation(install_path: str, verify_workers: int = DEFAULT_HASH_WORKERS, buffer_size: int = DEFAULT_BUFFER_SIZE, print_logs: bool = True) -> dict:
+    """
+    Checks that every file a modpack installed into a game directory still matches the SHA1 and SHA512 hashes in its index.
+    Files are hashed in parallel, largest first. The size and modification time of every file that matches is saved in the game directory, and files that haven't changed since are skipped the next time.
+    Overrides aren't checked, since the index has no hashes for them, and neither are files that an override replaced.
+
+    :param install_path: The game directory of an installation made by this program.
+    :type install_path: str
+    :param verify_workers: The maximum number of files to hash at the same time.
+    :type verify_workers: int
+    :param buffer_size: The size of each chunk read from a file, in bytes.
+    :type buffer_size: int
+    :param print_logs: Whether to print logs while verifying.
+    :type print_logs: bool
+    :return: The number of files "checked" and "skipped" because they hadn't changed, the paths of the "missing" and "changed" files, and the index entries of every file that failed under "failed".
+    :rtype: dict
+    """
+
+    manifest: Optional[dict] = read_installation_manifest(install_path)
+    if manifest is None:
+        raise ModpackInstallerError('This installation has no saved modpack index, so it can\'t be verified.')
+    installed_files: set[str] = set(manifest['files']) - set(manifest['overrides'])
+    downloads_metadata: list[dict] = [download_metadata for download_metadata in manifest['index']['files'] if download_metadata['path'] in installed_files]
+    cache_entries: dict[str, list] = read_verify_cache(install_path)
+
+    # Check files, largest first
+    if print_logs:
+        print(f'Verifying {len(downloads_metadata)} files...')
+    checked_files: dict[str, tuple[str, Optional[list]]] = check_installed_files(install_path, downloads_metadata, cache_entries, verify_workers, buffer_size)
+
+    # Collect results
+    result: dict = {
+        'checked': 0,
+        'skipped': 0,
+        'missing': [],
+        'changed': [],
+        'failed': []
+    }
+    new_cache_entries: dict[str, list] = {}
+    for download_metadata in downloads_metadata:
+        filename_relative_to_instance: str = download_metadata['path']
+        status: str
+        cache_entry: Optional[list]
+        status, cache_entry = checked_files[filename_relative_to_instance]
+        result['checked'] += 1
+        if cache_entry is not None:
+            new_cache_entries[filename_relative_to_instance] = cache_entry
+        if status == 'cached':
+            result['skipped'] += 1
+        elif status in ('missing', 'changed'):
+            result[status].append(filename_relative_to_instance)
+            result['failed'].append(download_metadata)
+    write_verify_cache(install_path, new_cache_entries)
+
+    if print_logs:
+        print(f'Checked {result["checked"]} files ({result["skipped"]} unchanged since the last check): {len(result["missing"])} missing, {len(result["changed"])} changed.')
+        for filename_relative_to_instance in result['missing']:
+            print(f'    Missing: {filename_relative_to_instance}')
+        for filename_relative_to_instance in result['changed']:
+            print(f'    Changed: {filename_relative_to_instance}')
+    return result
+
+def repair_installation(install_path: str, wait_for_user: bool = True, print_logs: bool = True, download_workers: int = DEFAULT_DOWNLOAD_WORKERS, verify_workers: int = DEFAULT_HASH_WORKERS, buffer_size: int = DEFAULT_BUFFER_SIZE, cache: Optional[ArtifactCache] = None, link_mode: str = DEFAULT_LINK_MODE, session: Optional['requests.Session'] = None, host_limiter: Optional[HostLimiter] = None, bandwidth_limiter: Optional[BandwidthLimiter] = None, host_stats: Optional[HostStats] = None, on_event: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    Verifies an installation with verify_installation and downloads only the files that are missing or changed again.
+
+    :param install_path: The game directory of an installation made by this program.
+    :type install_path: str
+    :param wait_for_user: Whether to ask the user to confirm before repairing.
+    :type wait_for_user: bool
+    :param print_logs: Whether to print logs while repairing.
+    :type print_logs: bool
+    :param download_workers: The maximum number of files to download at the same time.
+    :type download_workers: int
+    :param verify_workers: The maximum number of files to hash at the same time.
+    :type verify_workers: int
+    :param buffer_size: The size of each chunk downloaded or hashed, in bytes.
+    :type buffer_size: int
+    :param cache: The artifact cache to reuse and store downloaded files in, or None to download every file.
+    :type cache: Optional[ArtifactCache]
+    :param link_mode: How files from the artifact cache are placed in the game directory: "hardlink", "reflink" or "copy".
+    :type link_mode: str
+    :param session: The HTTP session to download with, or None to create one for this repair only.
+    :type session: Optional[requests.Session]
+    :param host_limiter: The limiter for concurrent downloads per hostname, or None to use HOST_CONCURRENCY_LIMITS for this run only.
+    :type host_limiter: Optional[HostLimiter]
+    :param bandwidth_limiter: The limiter for the combined download speed, or None for no limit.
+    :type bandwidth_limiter: Optional[BandwidthLimiter]
+    :param host_stats: The statistics used to rank download URLs and hedge slow downloads, or None to load them from CACHE_DIR and save them when done.
+    :type host_stats: Optional[HostStats]
+    :param on_event: A function called with a dict for each progress event, possibly from worker threads, or None. See SummaryReporter.
+    :type on_event: Optional[Callable[[dict], None]]
+    :return: The result of verify_installation, with the number of files "repaired".
+    :rtype: dict
+    """
+
+    # Verify installation
+    phase_start_time: float = start_phase(on_event, 'verify')
+    result: dict = verify_installation(install_path, verify_workers, buffer_size, print_logs)
+    end_phase(on_event, 'verify', phase_start_time)
+    result['repaired'] = 0
+    failed_downloads_metadata: list[dict] = result['failed']
+    if len(failed_downloads_metadata) == 0:
+        if print_logs:
+            print('Nothing to repair.')
+        return result
+
+    # Wait for user
+    if wait_for_user:
+        confirm: str = input(f'Download {len(failed_downloads_metadata)} files again? [y/n] ')
+        if confirm.strip().lower() not in ('y', 'yes'):
+            raise ModpackInstallerError('User cancelled repair.')
+
+    # Remove changed files from the cache if they are hardlinked to it, so they aren't linked back in
+    if cache is not None:
+        for download_metadata in failed_downloads_metadata:
+            path: str = get_safe_path(install_path, download_metadata['path'])
+            cached_path: str = cache.get_path(download_metadata['hashes']['sha512'])
+            if os.path.isfile(path) and os.path.isfile(cached_path) and os.path.samefile(path, cached_path):
+                cache.discard(download_metadata['hashes']['sha512'])
+
+    # Download failed files again
+    with tempfile.TemporaryDirectory(prefix='.soup_mrpack_', dir=os.path.dirname(os.path.abspath(install_path))) as download_folder:
+        if print_logs:
+            print(f'Downloading {len(failed_downloads_metadata)} files...')
+        phase_start_time = start_phase(on_event, 'download')
+        downloaded_files: dict[str, str] = download_files(failed_downloads_metadata, download_folder, download_workers=download_workers, host_limiter=host_limiter, bandwidth_limiter=bandwidth_limiter, host_stats=host_stats, buffer_size=buffer_size, cache=cache, print_logs=print_logs, session=session, on_event=on_event)
+        end_phase(on_event, 'download', phase_start_time)
+
+        # Install them
+        phase_start_time = start_phase(on_event, 'install_files')
+        install_downloaded_files(downloaded_files, download_folder, install_path, link_mode)
+        end_phase(on_event, 'install_files', phase_start_time)
+    result['repaired'] = len(downloaded_files)
+
+    if print_logs:
+        print(f'Repaired {result["repaired"]} files.')
+    return result
+
+def dedupe_installations(cache: ArtifactCache, link_mode: str = DEFAULT_LINK_MODE, print_logs: bool = True, verify_workers: int = DEFAULT_HASH_WORKERS, buffer_size: int = DEFAULT_BUFFER_SIZE, session: Optional['requests.Session'] = None) -> dict[str, int]:
+    """
+    Replaces identical files in existing installations with links to the same file in the artifact cache.
+    Only files from modpack indexes are deduplicated, identified by their SHA512 hash, and only in installations with a saved manifest. Files are checked on a pool of worker threads and only hashed if they changed since they were last verified, using the same cache as verify_installation.
+    A changed file that isn't hardlinked only affects its own installation and is left alone. A changed file that is hardlinked has changed in every installation that shares it, so it is removed from the artifact cache and every installation gets the original contents back from a verified copy, which is downloaded again if there is none.
+
+    :param cache: The artifact cache to use as the shared store.
+    :type cache: ArtifactCache
+    :param link_mode: "hardlink" or "reflink". Copies can't deduplicate anything.
+    :type link_mode: str
+    :param print_logs: Whether to print logs while deduplicating.
+    :type print_logs: bool
+    :param verify_workers: The maximum number of files to hash at the same time.
+    :type verify_workers: int
+    :param buffer_size: The size of each chunk read from a file or the network, in bytes.
+    :type buffer_size: int
+    :param session: The HTTP session to download restored files with, or None to create one if needed.
+    :type session: Optional[requests.Session]
+    :return: The number of files linked, the number of bytes saved, and the number of files restored because a hardlinked file was changed.
+    :rtype: dict[str, int]
+    """
+
+    if link_mode not in ('hardlink', 'reflink'):
+        raise ValueError(f'Invalid link mode "{link_mode}"!')
+
+    stats: dict[str, int] = {
+        'files_linked': 0,
+        'bytes_saved': 0,
+        'files_restored': 0
+    }
+    if not os.path.isdir(INSTALLATIONS_DIR):
+        return stats
+
+    # Check every installation before linking anything, so a changed file shared through the cache is never linked into more installations
+    verify_caches: dict[str, dict[str, list]] = {}
+    valid_files: list[tuple[str, dict]] = []
+    changed_links: list[tuple[str, dict]] = []
+    for directory_name in sorted(os.listdir(INSTALLATIONS_DIR)):
+        install_path: str = os.path.join(INSTALLATIONS_DIR, directory_name)
+        manifest: Optional[dict] = read_installation_manifest(install_path) if os.path.isdir(install_path) else None
+        if manifest is None:
+            continue
+        if print_logs:
+            print(f'Checking {directory_name}...')
+
+        installed_files: set[str] = set(manifest['files']) - set(manifest['overrides'])
+        downloads_metadata: list[dict] = [download_metadata for download_metadata in manifest['index']['files'] if download_metadata['path'] in installed_files]
+        checked_files: dict[str, tuple[str, Optional[list]]] = check_installed_files(install_path, downloads_metadata, read_verify_cache(install_path), verify_workers, buffer_size)
+        verify_caches[install_path] = {}
+        for download_metadata in downloads_metadata:
+            filename_relative_to_instance: str = download_metadata['path']
+            status: str
+            cache_entry: Optional[list]
+            status, cache_entry = checked_files[filename_relative_to_instance]
+            if cache_entry is not None:
+                verify_caches[install_path][filename_relative_to_instance] = cache_entry
+            if status in ('ok', 'cached'):
+                valid_files.append((install_path, download_metadata))
+            elif status == 'changed' and os.stat(get_safe_path(install_path, filename_relative_to_instance)).st_nlink > 1:
+                changed_links.append((install_path, download_metadata))
+
+    # Remove changed files from the cache, since every link to them has the changed contents
+    for install_path, download_metadata in changed_links:
+        sha512: str = download_metadata['hashes']['sha512']
+        cached_path: str = cache.get_path(sha512)
+        if os.path.isfile(cached_path) and os.path.samefile(get_safe_path(install_path, download_metadata['path']), cached_path):
+            cache.discard(sha512)
+
+    # Remember the stat of each file placed from the cache, so it isn't hashed again next time
+    def record_verified(install_path: str, download_metadata: dict) -> None:
+        stat: os.stat_result = os.stat(get_safe_path(install_path, download_metadata['path']))
+        if time.time() - stat.st_mtime < VERIFY_RECENT_MODIFICATION_TIME:
+            verify_caches[install_path].pop(download_metadata['path'], None)
+        else:
+            verify_caches[install_path][download_metadata['path']] = [stat.st_size, stat.st_mtime_ns, stat.st_ino, download_metadata['hashes']['sha512']]
+
+    # Link valid files to the cache, stopping if the drive can't link files
+    for install_path, download_metadata in valid_files:
+        path: str = get_safe_path(install_path, download_metadata['path'])
+        sha512: str = download_metadata['hashes']['sha512']
+        cached_path: str = cache.get_path(sha512)
+
+        # Skip files that are already linked. Reflinks have their own inode but keep the modification time of the cached file
+        if os.path.isfile(cached_path):
+            stat: os.stat_result = os.stat(path)
+            cached_stat: os.stat_result = os.stat(cached_path)
+            if os.path.samestat(stat, cached_stat) or (link_mode == 'reflink' and (stat.st_size, stat.st_mtime_ns) == (cached_stat.st_size, cached_stat.st_mtime_ns)):
+                continue
+        else:
+            cache.put(sha512, path)
+        if clone_file(cached_path, path, link_mode) == 'copy':
+            if print_logs:
+                print(f'Files can\'t be linked with link mode "{link_mode}" on this drive, so they weren\'t deduplicated.')
+            record_verified(install_path, download_metadata)
+            break
+        stats['files_linked'] += 1
+        stats['bytes_saved'] += download_metadata['fileSize']
+        record_verified(install_path, download_metadata)
+
+    # Restore changed files from a verified copy in the cache, downloading the ones that have none
+    if len(changed_links) > 0:
+        restore_sources: dict[str, str] = {}
+        missing_downloads_metadata: dict[str, dict] = {}
+        for install_path, download_metadata in changed_links:
+            sha512: str = download_metadata['hashes']['sha512']
+            cached_path: Optional[str] = cache.get(download_metadata)
+            if cached_path is not None:
+                restore_sources[sha512] = cached_path
+            else:
+                missing_downloads_metadata[sha512] = download_metadata
+        if len(missing_downloads_metadata) > 0:
+            if print_logs:
+                print(f'Downloading {len(missing_downloads_metadata)} changed files again...')
+
+            # Downloaded files are moved into the cache, so the download folder is empty afterwards
+            with tempfile.TemporaryDirectory(prefix='.soup_mrpack_', dir=INSTALLATIONS_DIR) as download_folder:
+                downloaded_files: dict[str, str] = download_files(list(missing_downloads_metadata.values()), download_folder, buffer_size=buffer_size, cache=cache, print_logs=print_logs, session=session)
+            for sha512, download_metadata in missing_downloads_metadata.items():
+                restore_sources[sha512] = downloaded_files[download_metadata['path']]
+        for install_path, download_metadata in changed_links:
+            if print_logs:
+                print(f'Restoring changed file {download_metadata["path"]} in {os.path.basename(install_path)}')
+            clone_file(restore_sources[download_metadata['hashes']['sha512']], get_safe_path(install_path, download_metadata['path']), link_mode)
+            stats['files_restored'] += 1
+            record_verified(install_path, download_metadata)
+
+    for install_path, entries in verify_caches.items():
+        write_verify_cache(install_path, entries)
+
+    if print_logs:
+        print(f'Linked {stats["files_linked"]} files, saving {stats["bytes_saved"] / (1024 * 1024):.2f} MiB.')
+        if stats['files_restored'] > 0:
+            print(f'Restored {stats["files_restored"]} hardlinked files that were changed after installing.')
+    return stats
+
 
 
 # MAIN
@@ -0,0 +1,109 @@
+# Extracts a generated modpack against the benchmark's stand-in server and checks that the output zip reads back intact, with and without raw zip member writes.
+
+# IMPORTS
+
+from zipfile import ZipFile, ZipInfo, ZIP_STORED
+from unittest import mock
+import modpack_extractor
+import benchmark
+import requests
+import unittest
+import tempfile
+import zlib
+import os
+
+
+
+# CONSTANTS
+
+STORED_OVERRIDES: dict[str, bytes] = {
+    'overrides/config/stored.txt': b'stored = true\n' * 4096,
+    'overrides/resourcepacks/stored.png': bytes(range(256)) * 64
+}
+
+
+
+# DEFINITIONS
+
+class ZipRoundTripTest(unittest.TestCase):
+    """
+    Extracts a modpack whose overrides are deflated, stored but deflated on the way, and stored as they are, and checks every member of the output zip.
+    """
+
+    def setUp(self) -> None:
+        self._folder: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory(prefix='soup_mrpack_test_')
+        self.folder: str = self._folder.name
+
+        # Generate modpack, adding stored overrides
+        self.filename: str = os.path.join(self.folder, 'roundtrip.mrpack')
+        self.files_folder: str = os.path.join(self.folder, 'files')
+        self.data: dict = benchmark.generate_modpack(self.filename, self.files_folder, file_count=8, file_size=64 * 1024, override_count=6, override_size=32 * 1024)
+        with ZipFile(self.filename, 'a') as zf:
+            for name, data in STORED_OVERRIDES.items():
+                zinfo: ZipInfo = ZipInfo(name, date_time=(2024, 1, 1, 0, 0, 0))
+                zinfo.compress_type = ZIP_STORED
+                zf.writestr(zinfo, data)
+
+        # Collect the expected contents of the output zip
+        self.expected: dict[str, bytes] = {}
+        for download_metadata in self.data['files']:
+            with open(os.path.join(self.files_folder, os.path.basename(download_metadata['path'])), 'rb') as f:
+                self.expected[download_metadata['path']] = f.read()
+        with ZipFile(self.filename, 'r') as zf:
+            for info in zf.infolist():
+                if info.filename.startswith('overrides/') and not info.is_dir():
+                    self.expected[info.filename.removeprefix('overrides/')] = zf.read(info)
+
+    def tearDown(self) -> None:
+        self._folder.cleanup()
+
+    def extract(self) -> str:
+        """
+        Extracts the modpack into a new folder.
+
+        :return: The path to the output zip file.
+        :rtype: str
+        """
+
+        output_folder: str = tempfile.mkdtemp(dir=self.folder)
+        host_stats: modpack_extractor.HostStats = modpack_extractor.HostStats(os.path.join(self.folder, modpack_extractor.HOST_STATS_FILENAME))
+        with benchmark.StandInServer(self.files_folder) as server:
+            session: requests.Session = server.create_session()
+            try:
+                return modpack_extractor.extract_modpack(self.filename, output_folder, wait_for_user=False, print_logs=False, session=session, host_stats=host_stats)[0]
+            finally:
+                session.close()
+
+    def check_output(self, output_filename: str) -> None:
+        """
+        Checks that the output zip passes testzip, and that every member has the expected contents and CRC.
+
+        :param output_filename: The path to the output zip file.
+        :type output_filename: str
+        :rtype: None
+        """
+
+        with ZipFile(output_filename, 'r') as zf:
+            self.assertIsNone(zf.testzip())
+            infos: dict[str, ZipInfo] = {info.filename: info for info in zf.infolist()}
+            self.assertEqual(set(infos), set(self.expected))
+            for name, data in self.expected.items():
+                self.assertEqual(infos[name].CRC, zlib.crc32(data), name)
+                self.assertEqual(infos[name].file_size, len(data), name)
+                self.assertEqual(zf.read(name), data, name)
+            self.assertEqual(infos['config/stored.txt'].compress_type, modpack_extractor.get_compress_type('config/stored.txt'))
+            self.assertEqual(infos['resourcepacks/stored.png'].compress_type, ZIP_STORED)
+
+    def test_raw_writes(self) -> None:
+        self.check_output(self.extract())
+
+    def test_streamed_fallback(self) -> None:
+        with mock.patch.object(modpack_extractor, 'can_write_raw_zip_member', return_value=False):
+            self.check_output(self.extract())
+
+
+
+# MAIN
+
+if __name__ == '__main__':
+    unittest.main()